@@ -0,0 +1,287 @@
+"""
+Golden-output check and micro-benchmark for query_classifier
+
+The legacy_* functions below are the per-keyword implementations that
+query_classifier replaced, kept verbatim as the reference. The script
+classifies a fixed corpus plus generated variants with both, fails on any
+difference, then reports classifications per second.
+
+Usage:
+    python bench_classifier.py            # parity + gazetteer checks + benchmark
+    python bench_classifier.py 200000     # benchmark with N classifications
+"""
+import random
+import re
+import sys
+import time
+
+import query_classifier
+from query_classifier import KNOWN_COMPANIES, COMPANY_SUFFIXES
+
+# ============================================================================
+# LEGACY REFERENCE IMPLEMENTATION
+# ============================================================================
+
+def legacy_is_company_query(query: str) -> bool:
+    query_lower = query.lower()
+    if any(company in query_lower for company in KNOWN_COMPANIES):
+        return True
+    for suffix in COMPANY_SUFFIXES:
+        pattern = rf'\b[A-Z][a-zA-Z]*\s+{suffix}\b'
+        if re.search(pattern, query):
+            return True
+    strict_company_patterns = [
+        r'\bcompany\s+(?:named|called|about|info|information|details|contact)',
+        r'\b(?:working|career|job|apply|join)\s+at\s+[A-Z]',
+        r'\b[A-Z][a-zA-Z]+\s+(?:company|corporation|inc|llc|careers|jobs|hiring)',
+        r'\b(?:contact|email|phone|address)\s+(?:for|of)\s+[A-Z]',
+        r'\bcareer\s+(?:at|in|with)\s+[A-Z]',
+        r'\b(?:ceo|founder|headquarters)\s+(?:of|at)\s+[A-Z]',
+    ]
+    for pattern in strict_company_patterns:
+        if re.search(pattern, query):
+            return True
+    job_keywords = ['hiring', 'recruitment', 'intern', 'internship', 'placement', 'employer', 'salary', 'interview']
+    for keyword in job_keywords:
+        if keyword in query_lower:
+            words = query.split()
+            for i, word in enumerate(words):
+                if keyword in word.lower():
+                    for j in range(max(0, i-3), min(len(words), i+4)):
+                        if len(words[j]) > 2 and words[j][0].isupper():
+                            return True
+    return False
+
+def legacy_extract_company_name(query: str) -> str:
+    query_lower = query.lower()
+    for company in KNOWN_COMPANIES:
+        if company in query_lower:
+            return company.title()
+    patterns = [
+        r'(?:about|at|for|join|career at|working at)\s+([A-Z][a-zA-Z\s&]+?)(?:\s+company|\s+career|\s+job|\s+salary|$|\.)',
+        r'^([A-Z][a-zA-Z\s&]+?)(?:\s+company|\s+career|\s+job|\s+salary)',
+        r'([A-Z][a-zA-Z\s&]+?)\s+(?:inc|llc|ltd|limited|corp|technologies|tech)'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, query, re.IGNORECASE)
+        if match:
+            return match.group(1).strip()
+    words = query.split()
+    for word in words:
+        if len(word) > 2 and word[0].isupper():
+            return word
+    return "Company"
+
+def legacy_is_chat_query(query: str) -> bool:
+    query_lower = query.lower()
+    greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'greetings', 'howdy', 'sup', "what's up"]
+    if any(query_lower.startswith(g) for g in greetings):
+        return True
+    social = ['thank', 'thanks', 'bye', 'goodbye', 'see you', 'appreciate']
+    if any(word in query_lower for word in social):
+        return True
+    meta = ['help', 'how to use', 'what can you do', 'features', 'about you']
+    if any(phrase in query_lower for phrase in meta):
+        return True
+    simple_patterns = [
+        r'^who is (the )?(ceo|founder|president|owner) of',
+        r'^when (was|did) .{1,30} (founded|started|created|established)',
+        r'^where is .{1,30} (located|based|headquartered)',
+        r'^what (is|does) [A-Z]\w+ (do|make|sell)',
+        r'^how (many|much) (employees|people work|revenue)',
+    ]
+    for pattern in simple_patterns:
+        if re.search(pattern, query_lower):
+            return True
+    research_triggers = [
+        'tell me about', 'research', 'detailed', 'comprehensive',
+        'contact information', 'email', 'phone number', 'address',
+        'career opportunities', 'job openings', 'hiring',
+        'salary range', 'benefits', 'work culture',
+        'compare', 'analyze', 'latest trends', 'overview'
+    ]
+    if any(trigger in query_lower for trigger in research_triggers):
+        return False
+    word_count = len(query.split())
+    if word_count <= 8:
+        return True
+    return False
+
+def legacy_chat_intent(user_message: str):
+    """The keyword checks get_canned_chat_response used to run, reduced to the intent they picked"""
+    user_lower = user_message.lower()
+    if any(word in user_lower for word in ['hello', 'hi ', 'hey ', 'good morning', 'good afternoon']):
+        return 'greeting'
+    if any(word in user_lower for word in ['thank you', 'thanks', 'appreciate']):
+        return 'thanks'
+    if any(phrase in user_lower for phrase in ['help', 'what can you do', 'how do i', 'how to use']):
+        return 'help'
+    if legacy_is_company_query(user_message):
+        if any(keyword in user_lower for keyword in ['email', 'phone', 'contact', 'address', 'reach', 'call']):
+            return 'contact'
+        if any(keyword in user_lower for keyword in ['job', 'career', 'hiring', 'work at', 'salary', 'opening']):
+            return 'careers'
+    return None
+
+def legacy_classify(query: str) -> dict:
+    is_company = legacy_is_company_query(query)
+    return {
+        'type': 'company' if is_company else 'general',
+        'company': legacy_extract_company_name(query) if is_company else None,
+        'is_chat': legacy_is_chat_query(query),
+        'chat_intent': legacy_chat_intent(query),
+    }
+
+# ============================================================================
+# GOLDEN CORPUS
+# ============================================================================
+
+GOLDEN_QUERIES = [
+    "Amazon jobs for freshers",
+    "Tesla 2026 updates",
+    "Paytm careers for freshers",
+    "hello there",
+    "hi",
+    "Hey, what can you do?",
+    "thanks a lot!",
+    "who is the ceo of microsoft",
+    "when was Apple founded",
+    "where is infosys headquartered",
+    "what does Stripe do",
+    "how many employees does TCS have",
+    "Tell me about quantum computing breakthroughs in 2026",
+    "latest trends in generative AI for healthcare and diagnostics",
+    "Acme Technologies contact email",
+    "contact for Zoho",
+    "career at Freshworks",
+    "working at Razorpay as a backend engineer",
+    "Zerodha hiring interns in Bangalore",
+    "salary for Data Scientist at Swiggy",
+    "intelligence agencies in europe",
+    "shopify vs square for small business payments",
+    "Goldman Sachs and JP Morgan internship comparison",
+    "facebook meta rebrand history",
+    "x corp content moderation policy",
+    "Compare electric vehicle adoption in India and China with detailed analysis",
+    "email address of Oracle support",
+    "Bright Labs company details",
+    "company named Nimbus Cloud",
+    "CEO of Nykaa",
+    "ola electric scooter reviews",
+    "what's up",
+    "goodbye",
+    "how do I use the research feature",
+    "phone number for HDFC Bank customer care",
+    "I want a job",
+    "Interview questions for Google SDE",
+    "recruitment process at Deloitte",
+    "Best laptops under 50000",
+    "visa requirements for germany work permit",
+    "",
+    "   ",
+    "Inc",
+    "call center jobs near me",
+]
+
+# With the gazetteer on: (query, expected company_id or None)
+GAZETTEER_CASES = [
+    ("tomato soup recipe", None),
+    ("striped shirts", None),
+    ("squares and circles", None),
+    ("striped careers", None),
+    ("intelligence agencies in europe", None),
+    ("best apples for baking", None),
+    ("infosis", "infosys"),
+    ("zomatto careers", "zomato"),
+    ("byjus jobs for freshers", "byju"),
+    ("Stripe jobs", "stripe"),
+    ("shopify vs square for small business payments", "shopify"),
+]
+
+def generated_queries(count: int, seed: int = 7) -> list:
+    """Templated variants mixing known companies, unknown names, suffixes and keywords"""
+    rng = random.Random(seed)
+    names = [c.title() for c in KNOWN_COMPANIES] + ["Zerodha", "Razorpay", "Nimbus", "Freshworks", "Acme", "Quantiphi"]
+    templates = [
+        "{name} careers for freshers", "{name} {suffix} contact email", "tell me about {name}",
+        "who is the ceo of {lname}", "is {name} hiring interns", "{lname} salary range for engineers",
+        "hello, any news on {name}?", "thanks for the {name} info", "overview of {lname} work culture",
+        "what does {name} do", "jobs at {name}", "{name} vs {other} benefits comparison",
+        "where is {lname} located", "help me research {name}", "{lname}", "latest {lname} news today",
+    ]
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        queries.append(rng.choice(templates).format(
+            name=name, lname=name.lower(), other=rng.choice(names), suffix=rng.choice(COMPANY_SUFFIXES)
+        ))
+    return queries
+
+def check_parity(queries: list) -> int:
+    """Compare against the legacy functions with the gazetteer off (it deliberately recognises more)"""
+    query_classifier.use_gazetteer(False)
+    mismatches = 0
+    for query in queries:
+        expected = legacy_classify(query)
+        actual = {key: value for key, value in query_classifier.classify(query).items() if key in expected}
+        if expected != actual:
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"❌ {query!r}\n   legacy:   {expected}\n   compiled: {actual}")
+    query_classifier.use_gazetteer(True)
+    return mismatches
+
+def check_gazetteer() -> int:
+    """Golden company ids with the gazetteer on, including misspellings and everyday words it must not match"""
+    query_classifier.use_gazetteer(True)
+    mismatches = 0
+    for query, expected in GAZETTEER_CASES:
+        actual = query_classifier.classify(query)['company_id']
+        if actual != expected:
+            mismatches += 1
+            print(f"❌ {query!r}\n   expected: {expected}\n   got:      {actual}")
+    return mismatches
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark(queries: list, iterations: int):
+    uncached = query_classifier._classify.__wrapped__
+    timings = {}
+    for label, fn in [("legacy", legacy_classify), ("compiled", uncached), ("compiled+cache", query_classifier.classify)]:
+        query_classifier.use_gazetteer(label != "compiled")
+        started = time.perf_counter()
+        for i in range(iterations):
+            fn(queries[i % len(queries)])
+        elapsed = time.perf_counter() - started
+        timings[label] = iterations / elapsed
+        print(f"⏱️  {label:15s} {timings[label]:>12,.0f} classifications/s")
+    print(f"⚡ compiled speedup: {timings['compiled'] / timings['legacy']:.1f}x (uncached)")
+
+    query_classifier.use_gazetteer(True)
+    started = time.perf_counter()
+    for i in range(iterations):
+        uncached(queries[i % len(queries)])
+    rate = iterations / (time.perf_counter() - started)
+    print(f"📇 compiled + gazetteer ({query_classifier.get_gazetteer().alias_count:,} aliases) {rate:>10,.0f} classifications/s uncached")
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    corpus = GOLDEN_QUERIES + generated_queries(5000)
+
+    print(f"\n🔎 Parity check on {len(corpus):,} queries...")
+    failures = check_parity(corpus)
+    if failures:
+        print(f"❌ {failures} queries classified differently\n")
+        sys.exit(1)
+    print("✅ Compiled classifier matches the legacy functions\n")
+
+    print(f"📇 Gazetteer check on {len(GAZETTEER_CASES)} queries...")
+    failures = check_gazetteer()
+    if failures:
+        print(f"❌ {failures} queries resolved to the wrong company\n")
+        sys.exit(1)
+    print("✅ Gazetteer resolves the golden companies\n")
+
+    benchmark(corpus, iterations)
@@ -0,0 +1,73 @@
+"""
+Golden-output check and micro-benchmark for text_utils.dedupe_search_sets
+
+Runs a fixed set of search-result sets through the deduplicator, fails on
+any difference from the expected output, then reports sets per second on
+generated SerpAPI-shaped results.
+
+Usage:
+    python bench_dedup.py            # golden check + benchmark
+    python bench_dedup.py 5000       # benchmark with N dedupe calls
+"""
+import random
+import sys
+import time
+
+from text_utils import SEARCH_FAILED_PREFIX, SEARCH_TIMED_OUT, dedupe_search_sets
+
+SNIPPET = ("Infosys has 400,000 followers on LinkedIn and is a global leader in next-generation "
+           "digital services and consulting across more than 50 countries")
+
+# (input sets, expected output sets, expected duplicate count)
+GOLDEN_CASES = [
+    # Failure placeholders pass through, even when several sets failed the same way
+    ([SEARCH_TIMED_OUT, SEARCH_TIMED_OUT, str(["Infosys is hiring"])],
+     [SEARCH_TIMED_OUT, SEARCH_TIMED_OUT, "- Infosys is hiring"], 0),
+    ([f"{SEARCH_FAILED_PREFIX}429", f"{SEARCH_FAILED_PREFIX}429", ""],
+     [f"{SEARCH_FAILED_PREFIX}429", f"{SEARCH_FAILED_PREFIX}429", ""], 0),
+    # Exact copies across sets, ignoring case and punctuation
+    ([str(["Founded in 1981.", "Based in Bengaluru"]), str(["founded in 1981", "Listed on NSE"])],
+     ["- Founded in 1981.\n- Based in Bengaluru", "- Listed on NSE"], 1),
+    # One edited word in a full-length snippet is a near duplicate
+    ([str([SNIPPET]), str([SNIPPET.replace("400,000", "400,001")])],
+     [f"- {SNIPPET}", ""], 1),
+    # Plain-text answer boxes are split into lines
+    (["Infosys CEO: Salil Parekh\nInfosys CEO: Salil Parekh"], ["- Infosys CEO: Salil Parekh"], 1),
+]
+
+def check_golden() -> int:
+    failures = 0
+    for sets, expected, expected_duplicates in GOLDEN_CASES:
+        actual, stats = dedupe_search_sets(sets)
+        if actual != expected or stats['duplicates'] != expected_duplicates:
+            failures += 1
+            print(f"❌ {sets!r}\n   expected: {expected} ({expected_duplicates} duplicates)\n"
+                  f"   got:      {actual} ({stats['duplicates']} duplicates)")
+    return failures
+
+def generated_sets(count: int, seed: int = 7) -> list:
+    """Groups of 7 result sets (one company's targeted queries) with overlapping snippets"""
+    rng = random.Random(seed)
+    words = SNIPPET.split() + ["hiring", "salary", "culture", "office", "engineers", "benefits", "revenue"]
+    pool = [" ".join(rng.choice(words) for _ in range(rng.randint(12, 30))) for _ in range(200)]
+    return [[str(rng.sample(pool, 10)) for _ in range(7)] for _ in range(count)]
+
+def benchmark(groups: list, iterations: int):
+    started = time.perf_counter()
+    duplicates = 0
+    for i in range(iterations):
+        duplicates += dedupe_search_sets(groups[i % len(groups)])[1]['duplicates']
+    rate = iterations / (time.perf_counter() - started)
+    print(f"⏱️  {rate:,.0f} research prompts/s (7 sets x 10 snippets), {duplicates / iterations:.1f} duplicates each")
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print(f"\n🔎 Golden check on {len(GOLDEN_CASES)} cases...")
+    failures = check_golden()
+    if failures:
+        print(f"❌ {failures} cases deduplicated differently\n")
+        sys.exit(1)
+    print("✅ Deduplication matches the golden output\n")
+
+    benchmark(generated_sets(200), iterations)
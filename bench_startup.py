@@ -0,0 +1,99 @@
+"""
+Import-time benchmark for the InfoFetch AI backend modules
+
+Imports each module in a fresh interpreter under `python -X importtime`,
+from an empty working directory, and checks that:
+  - the median cumulative import time stays inside IMPORT_BUDGET_MS
+  - importing creates no files (no database, no cache) and prints nothing
+
+Exits non-zero on any regression, so it can gate CI or a pre-deploy step.
+
+Usage:
+    python bench_startup.py            # 5 runs per module
+    python bench_startup.py 10         # 10 runs per module
+"""
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Median cumulative import time allowed per module, in milliseconds. Before
+# the lazy start-up rework serp took ~2,100 ms (langchain_openai + clients).
+IMPORT_BUDGET_MS = {
+    'query_classifier': 60,
+    'cache_utils': 60,
+    'db_utils': 80,
+    'razorpay_handler': 80,
+    'chat_context': 120,
+    'serp': 300,
+}
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(\S+)\s*$")
+
+def measure_import(module: str, workdir: str) -> dict:
+    """One cold import in a new interpreter: cumulative ms, stdout, files left behind"""
+    env = dict(os.environ, PYTHONPATH=BASE_DIR, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=workdir, env=env, capture_output=True, text=True
+    )
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match and match.group(2) == module:
+            cumulative_us = int(match.group(1))
+    return {
+        'ok': proc.returncode == 0 and cumulative_us is not None,
+        'ms': (cumulative_us or 0) / 1000,
+        'stdout': proc.stdout.strip(),
+        'stderr': proc.stderr if proc.returncode else "",
+        'files': sorted(os.listdir(workdir)),
+    }
+
+def run_benchmark(runs: int = 5) -> bool:
+    print("\n" + "="*70)
+    print(f"⏱️  IMPORT-TIME BENCHMARK - {runs} cold imports per module")
+    print("="*70 + "\n")
+
+    passed = True
+    for module, budget_ms in IMPORT_BUDGET_MS.items():
+        timings = []
+        problems = []
+        for _ in range(runs):
+            workdir = tempfile.mkdtemp(prefix="infofetch_startup_")
+            try:
+                result = measure_import(module, workdir)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            if not result['ok']:
+                problems.append(f"import failed:\n{result['stderr'][-800:]}")
+                break
+            timings.append(result['ms'])
+            if result['files']:
+                problems.append(f"created files on import: {', '.join(result['files'])}")
+            if result['stdout']:
+                problems.append(f"printed on import: {result['stdout'].splitlines()[0][:60]!r}")
+
+        median_ms = statistics.median(timings) if timings else float('inf')
+        if median_ms > budget_ms:
+            problems.append(f"over budget ({median_ms:.0f} ms > {budget_ms} ms)")
+
+        marker = "✅" if not problems else "❌"
+        print(f"{marker} {module:<18} {median_ms:8.1f} ms  (budget {budget_ms} ms)")
+        for problem in dict.fromkeys(problems):
+            print(f"   ⚠️ {problem}")
+        passed = passed and not problems
+
+    print("\n" + "="*70)
+    print("✅ ALL MODULES WITHIN BUDGET" if passed else "❌ IMPORT-TIME REGRESSION")
+    print("="*70 + "\n")
+    return passed
+
+if __name__ == "__main__":
+    run_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sys.exit(0 if run_benchmark(run_count) else 1)
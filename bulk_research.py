@@ -0,0 +1,349 @@
+"""
+Bulk research for InfoFetch AI
+
+Runs a list of companies / topics (CSV, NDJSON or one query per line)
+through the research pipeline:
+  1. classify every query in one pass and dedupe by canonical company id
+     (or normalized query text for general research)
+  2. research the unique items with bounded concurrency
+  3. append each finished item to an NDJSON checkpoint, so a rerun with
+     the same checkpoint resumes where the last one stopped
+  4. export the results as NDJSON or CSV and report throughput
+
+Usage:
+    python bulk_research.py companies.csv --out results.ndjson [--concurrency 4] [--csv results.csv]
+"""
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from cache_utils import normalize_key
+from db_utils import result_summary_columns
+from query_classifier import classify
+from rate_limit import lane
+from telemetry import get_logger
+
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "4"))
+BULK_MAX_QUERIES = int(os.getenv("BULK_MAX_QUERIES", "500"))
+BULK_RUNS_DIR = os.getenv("BULK_RUNS_DIR", "bulk_runs")
+# Finished runs kept in memory for get_bulk_run; older ones live only in their checkpoint
+BULK_KEEP_FINISHED_RUNS = int(os.getenv("BULK_KEEP_FINISHED_RUNS", "20"))
+
+log = get_logger("bulk")
+
+# Column names accepted for the query in CSV / NDJSON input
+QUERY_FIELDS = ('query', 'company', 'topic', 'name')
+
+EXPORT_COLUMNS = ['query', 'type', 'company', 'status', 'confidence', 'title', 'summary', 'duplicates', 'seconds']
+
+# ============================================================================
+# INPUT
+# ============================================================================
+
+def _query_from_record(record: Dict) -> str:
+    lowered = {str(k).strip().lower(): v for k, v in record.items()}
+    for field in QUERY_FIELDS:
+        if lowered.get(field):
+            return str(lowered[field])
+    return ""
+
+def read_queries(text: str, filename: str = "") -> List[str]:
+    """
+    Queries from uploaded text. NDJSON (.ndjson / .jsonl, or lines starting
+    with '{') and CSV (.csv; a 'query'/'company'/'topic'/'name' column, else
+    the first column) are parsed; anything else is one query per line.
+    """
+    name = filename.lower()
+    lines = [line for line in text.splitlines() if line.strip()]
+    queries = []
+
+    if name.endswith(('.ndjson', '.jsonl')) or (lines and lines[0].lstrip().startswith('{')):
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            queries.append(_query_from_record(record) if isinstance(record, dict) else str(record))
+    elif name.endswith('.csv'):
+        rows = list(csv.reader(io.StringIO(text)))
+        if rows:
+            header = [cell.strip().lower() for cell in rows[0]]
+            column = next((header.index(f) for f in QUERY_FIELDS if f in header), None)
+            body = rows[1:] if column is not None else rows
+            column = column or 0
+            queries = [row[column] for row in body if len(row) > column]
+    else:
+        queries = lines
+
+    return [q.strip() for q in queries if q and q.strip()][:BULK_MAX_QUERIES]
+
+# ============================================================================
+# PLANNING
+# ============================================================================
+
+def bulk_key(route: Dict, query: str) -> str:
+    """Dedupe key: canonical company id for company queries, normalized text otherwise"""
+    if route['type'] == 'company':
+        return f"company:{route['company_id']}"
+    return f"general:{normalize_key(query)}"
+
+def plan_bulk(queries: List[str]) -> List[Dict]:
+    """Classify every query and collapse duplicates; first spelling of each key wins"""
+    items = {}
+    for query in queries:
+        route = classify(query)
+        key = bulk_key(route, query)
+        if key in items:
+            items[key]['duplicates'].append(query)
+            continue
+        items[key] = {
+            'key': key,
+            'query': query,
+            'type': route['type'],
+            'company': route['company'],
+            'duplicates': [],
+        }
+    return list(items.values())
+
+def checkpoint_path_for(items: List[Dict], prefix: str = "bulk") -> str:
+    """Checkpoint file named after the set of keys, so re-submitting the same list resumes it"""
+    digest = hashlib.sha256("\n".join(sorted(i['key'] for i in items)).encode('utf-8')).hexdigest()[:16]
+    return os.path.join(BULK_RUNS_DIR, f"{prefix}-{digest}.ndjson")
+
+# ============================================================================
+# CHECKPOINT
+# ============================================================================
+
+def load_checkpoint(path: str) -> Dict[str, Dict]:
+    """Latest record per key; a line cut short by a crash is ignored"""
+    records = {}
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records[record['key']] = record
+    return records
+
+def _append_record(path: str, record: Dict, lock: threading.Lock):
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+# ============================================================================
+# RUN
+# ============================================================================
+
+def _research_item(item: Dict) -> Dict:
+    from serp import run_research_agent
+
+    started = time.monotonic()
+    try:
+        # Bulk items queue behind interactive research for the upstream APIs
+        with lane('background'):
+            result = run_research_agent(item['query'])
+        status = 'failed' if result.get('error') else 'done'
+    except Exception as e:
+        result = {'error': str(e)}
+        status = 'failed'
+    return dict(item, status=status, result=result, seconds=round(time.monotonic() - started, 2))
+
+def run_bulk(items: List[Dict], checkpoint_path: str, concurrency: int = BULK_CONCURRENCY,
+             on_progress: Optional[Callable[[Dict, int, int], None]] = None,
+             allow_next: Optional[Callable[[Dict], bool]] = None) -> Dict:
+    """
+    Research every item not already 'done' in the checkpoint, concurrency at
+    a time. on_progress(record, finished, total) is called per item;
+    allow_next(item) can veto an item before it starts (e.g. quota).
+    Returns a summary with throughput.
+    """
+    os.makedirs(os.path.dirname(checkpoint_path) or ".", exist_ok=True)
+    previous = load_checkpoint(checkpoint_path)
+    pending = [i for i in items if previous.get(i['key'], {}).get('status') != 'done']
+    resumed = len(items) - len(pending)
+    total = len(items)
+    finished = resumed
+    counts = {'done': resumed, 'failed': 0, 'skipped': 0}
+    lock = threading.Lock()
+
+    if resumed:
+        log.info(f"♻️ Resuming: {resumed}/{total} already done in {checkpoint_path}")
+
+    started = time.monotonic()
+
+    def guarded(item: Dict) -> Dict:
+        if allow_next is not None and not allow_next(item):
+            return dict(item, status='skipped', result={'error': 'Skipped (daily search limit reached)'}, seconds=0)
+        return _research_item(item)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="bulk-research") as pool:
+        futures = [pool.submit(guarded, item) for item in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            finished += 1
+            counts[record['status']] += 1
+            if record['status'] != 'skipped':
+                _append_record(checkpoint_path, record, lock)
+            if on_progress is not None:
+                on_progress(record, finished, total)
+
+    elapsed = time.monotonic() - started
+    researched = counts['done'] - resumed + counts['failed']
+    return {
+        'total': total,
+        'resumed': resumed,
+        'done': counts['done'],
+        'failed': counts['failed'],
+        'skipped': counts['skipped'],
+        'elapsed_seconds': round(elapsed, 2),
+        'concurrency': concurrency,
+        'per_minute': round(researched / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        'checkpoint': checkpoint_path,
+    }
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def export_row(record: Dict) -> Dict:
+    result = record.get('result') or {}
+    _, title, summary = result_summary_columns(result)
+    return {
+        'query': record['query'],
+        'type': record['type'],
+        'company': record.get('company') or '',
+        'status': record['status'],
+        'confidence': result.get('confidence', ''),
+        'title': title,
+        'summary': summary or result.get('error', ''),
+        'duplicates': " | ".join(record.get('duplicates', [])),
+        'seconds': record.get('seconds', ''),
+    }
+
+def export_results(items: List[Dict], checkpoint_path: str, fmt: str = 'ndjson') -> str:
+    """Results in input order as NDJSON (full results) or CSV (one summary row per query)"""
+    records = load_checkpoint(checkpoint_path)
+    ordered = [records[i['key']] for i in items if i['key'] in records]
+
+    if fmt == 'csv':
+        out = io.StringIO()
+        writer = csv.DictWriter(out, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for record in ordered:
+            writer.writerow(export_row(record))
+        return out.getvalue()
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in ordered)
+
+# ============================================================================
+# BACKGROUND RUNS (front.py Bulk page)
+# ============================================================================
+
+# run_id -> progress shared with the page; the checkpoint file is the durable copy
+_runs: Dict[str, Dict] = {}
+_runs_lock = threading.Lock()
+
+def _evict_finished_runs():
+    """Drop all but the newest BULK_KEEP_FINISHED_RUNS finished runs. Caller holds _runs_lock."""
+    finished = sorted((state['finished_at'], run_id) for run_id, state in _runs.items() if state['finished'])
+    for _, run_id in finished[:max(len(finished) - BULK_KEEP_FINISHED_RUNS, 0)]:
+        del _runs[run_id]
+
+def start_bulk_run(items: List[Dict], checkpoint_path: str, concurrency: int = BULK_CONCURRENCY,
+                   allow_next: Optional[Callable[[Dict], bool]] = None) -> str:
+    """Run in a background thread; returns a run id for get_bulk_run. One run per checkpoint at a time."""
+    run_id = os.path.basename(checkpoint_path)
+    with _runs_lock:
+        existing = _runs.get(run_id)
+        if existing is not None and not existing['finished']:
+            return run_id
+        state = {'total': len(items), 'finished_count': 0, 'rows': [], 'finished': False,
+                 'finished_at': None, 'summary': None}
+        _runs[run_id] = state
+        _evict_finished_runs()
+
+    def on_progress(record: Dict, finished: int, total: int):
+        with _runs_lock:
+            state['finished_count'] = finished
+            state['rows'].append(export_row(record))
+
+    def worker():
+        try:
+            summary = run_bulk(items, checkpoint_path, concurrency, on_progress, allow_next)
+        except Exception as e:
+            log.error(f"❌ Bulk run {run_id} failed: {e}")
+            summary = {'error': str(e)}
+        with _runs_lock:
+            state['summary'] = summary
+            state['finished'] = True
+            state['finished_at'] = time.monotonic()
+            _evict_finished_runs()
+
+    threading.Thread(target=worker, name=f"bulk-{run_id}", daemon=True).start()
+    return run_id
+
+def get_bulk_run(run_id: str) -> Optional[Dict]:
+    with _runs_lock:
+        state = _runs.get(run_id)
+        if state is None:
+            return None
+        return dict(state, rows=list(state['rows']))
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk company / topic research")
+    parser.add_argument("input", help="CSV, NDJSON or text file with one query per line")
+    parser.add_argument("--out", help="NDJSON results file (also the resume checkpoint)")
+    parser.add_argument("--csv", help="also write a CSV summary here")
+    parser.add_argument("--concurrency", type=int, default=BULK_CONCURRENCY)
+    args = parser.parse_args(argv)
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        queries = read_queries(f.read(), args.input)
+    items = plan_bulk(queries)
+    checkpoint = args.out or checkpoint_path_for(items)
+
+    print("\n" + "="*70)
+    print(f"📦 BULK RESEARCH - {len(queries)} queries, {len(items)} unique, concurrency {args.concurrency}")
+    print("="*70 + "\n")
+
+    from serp import init_backend
+    init_backend()
+
+    def on_progress(record: Dict, finished: int, total: int):
+        marker = {'done': '✅', 'failed': '❌', 'skipped': '⏭️'}[record['status']]
+        print(f"{marker} [{finished}/{total}] {record['query']} ({record['seconds']}s)")
+
+    summary = run_bulk(items, checkpoint, args.concurrency, on_progress)
+
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as f:
+            f.write(export_results(items, checkpoint, 'csv'))
+
+    print("\n" + "="*70)
+    print(f"📊 {summary['done']}/{summary['total']} done, {summary['failed']} failed, "
+          f"{summary['resumed']} resumed from checkpoint")
+    print(f"⚡ {summary['per_minute']} queries/min at concurrency {summary['concurrency']} "
+          f"({summary['elapsed_seconds']}s)")
+    print(f"💾 Results: {checkpoint}" + (f", {args.csv}" if args.csv else ""))
+    print("="*70 + "\n")
+    return 0 if summary['failed'] == 0 else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Two-tier result cache for InfoFetch AI
+
+Tier 1 is an in-process LRU (fast, per worker), tier 2 is a SQLite table
+that survives Streamlit restarts and is shared by every worker on the
+machine. Entries are content-addressed on the normalized key text.
+
+SingleFlight sits in front of the upstream call for cache misses: while a
+key is being computed, identical requests wait for that one computation
+instead of starting their own.
+"""
+import sqlite3
+import json
+import hashlib
+import threading
+import time
+import re
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from telemetry import get_logger
+
+log = get_logger("cache")
+
+CACHE_DB_PATH = "infofetch_cache.db"
+
+def normalize_key(text: str) -> str:
+    """Lower-case and collapse whitespace so trivially different queries share an entry"""
+    return re.sub(r'\s+', ' ', str(text).strip().lower())
+
+def hash_key(text: str) -> str:
+    """Content address for a normalized key"""
+    return hashlib.sha256(normalize_key(text).encode('utf-8')).hexdigest()
+
+
+class TieredCache:
+    """LRU memory tier in front of a SQLite disk tier, with per-entry TTL"""
+
+    def __init__(self, namespace: str, ttl_seconds: int = 24 * 3600,
+                 max_memory_entries: int = 256, max_disk_entries: int = 5000,
+                 db_path: str = CACHE_DB_PATH):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.db_path = db_path
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes_since_prune = 0
+        self._counters = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'sets': 0, 'evictions': 0}
+        # The disk table is created on first use, so constructing a cache at import is free
+        self._disk_ready = False
+
+    # ------------------------------------------------------------------
+    # Disk tier
+    # ------------------------------------------------------------------
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            if not self._disk_ready:
+                self._init_disk(conn)
+        return conn
+
+    def _init_disk(self, conn: sqlite3.Connection):
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            ''')
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_entries_access ON cache_entries(namespace, last_access)")
+            conn.commit()
+            self._disk_ready = True
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Cache disk tier unavailable ({self.namespace}): {e}")
+
+    def _disk_get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        try:
+            conn = self._conn()
+            row = conn.execute(
+                "SELECT value, created_at, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] <= time.time():
+                conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                conn.commit()
+                return None
+            conn.execute(
+                "UPDATE cache_entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                (time.time(), self.namespace, key)
+            )
+            conn.commit()
+            return json.loads(row[0]), row[1], row[2]
+        except (sqlite3.Error, ValueError) as e:
+            log.warning(f"⚠️ Cache read error ({self.namespace}): {e}")
+            return None
+
+    def _disk_set(self, key: str, value: Any, created_at: float, expires_at: float):
+        try:
+            conn = self._conn()
+            conn.execute(
+                """INSERT OR REPLACE INTO cache_entries
+                (namespace, key, value, created_at, expires_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (self.namespace, key, json.dumps(value, ensure_ascii=False, default=str),
+                 created_at, expires_at, created_at)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Cache write error ({self.namespace}): {e}")
+            return
+
+        # Pruning needs a COUNT(*), so only do it every few writes
+        self._writes_since_prune += 1
+        if self._writes_since_prune >= 50:
+            self._writes_since_prune = 0
+            self._prune_disk()
+
+    def _prune_disk(self):
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time()))
+            count = conn.execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+            overflow = count - self.max_disk_entries
+            if overflow > 0:
+                conn.execute(
+                    """DELETE FROM cache_entries WHERE namespace = ? AND key IN (
+                        SELECT key FROM cache_entries WHERE namespace = ?
+                        ORDER BY last_access ASC LIMIT ?)""",
+                    (self.namespace, self.namespace, overflow)
+                )
+                with self._lock:
+                    self._counters['evictions'] += overflow
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Cache prune error ({self.namespace}): {e}")
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_entry(self, text: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, age_seconds) for a live entry, or None"""
+        key = hash_key(text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._counters['memory_hits'] += 1
+                    return value, now - created_at
+                del self._memory[key]
+
+        disk_entry = self._disk_get(key)
+        if disk_entry is None:
+            with self._lock:
+                self._counters['misses'] += 1
+            return None
+
+        value, created_at, expires_at = disk_entry
+        with self._lock:
+            self._counters['disk_hits'] += 1
+            self._memory_put(key, value, created_at, expires_at)
+        return value, now - created_at
+
+    def get(self, text: str) -> Optional[Any]:
+        """Return the cached value or None"""
+        entry = self.get_entry(text)
+        return entry[0] if entry is not None else None
+
+    def set(self, text: str, value: Any, ttl_seconds: Optional[int] = None):
+        """Store a JSON-serialisable value under the normalized key"""
+        key = hash_key(text)
+        created_at = time.time()
+        expires_at = created_at + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+
+        with self._lock:
+            self._counters['sets'] += 1
+            self._memory_put(key, value, created_at, expires_at)
+        self._disk_set(key, value, created_at, expires_at)
+
+    def _memory_put(self, key: str, value: Any, created_at: float, expires_at: float):
+        # Caller holds self._lock
+        self._memory[key] = (value, created_at, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._counters['evictions'] += 1
+
+    def invalidate(self, text: str):
+        """Drop one entry from both tiers"""
+        key = hash_key(text)
+        with self._lock:
+            self._memory.pop(key, None)
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Cache invalidate error ({self.namespace}): {e}")
+
+    def clear(self):
+        """Drop every entry in this namespace"""
+        with self._lock:
+            self._memory.clear()
+        try:
+            conn = self._conn()
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+            conn.commit()
+        except sqlite3.Error as e:
+            log.warning(f"⚠️ Cache clear error ({self.namespace}): {e}")
+
+    def stats(self) -> Dict:
+        """Hit/miss counters plus current memory size"""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['memory_entries'] = len(self._memory)
+        lookups = counters['memory_hits'] + counters['disk_hits'] + counters['misses']
+        counters['hit_rate'] = round((counters['memory_hits'] + counters['disk_hits']) / lookups, 3) if lookups else 0.0
+        return counters
+
+
+# ============================================================================
+# SINGLE-FLIGHT
+# ============================================================================
+
+class Flight:
+    """One in-flight computation; followers block in wait() until the leader finishes"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """The leader's result; re-raises its exception. TimeoutError if it is not done in time."""
+        if not self._done.wait(timeout):
+            raise TimeoutError("in-flight computation did not finish in time")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same normalized key onto one execution"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[str, Flight] = {}
+        self._lock = threading.Lock()
+        self._counters = {'executions': 0, 'coalesced': 0, 'failures': 0}
+
+    def begin(self, key: str) -> Tuple[Flight, bool]:
+        """
+        Join the flight for key, starting one if none is running. Returns
+        (flight, is_leader); the leader must call finish() exactly once.
+        """
+        key = normalize_key(key)
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self._counters['coalesced'] += 1
+                return flight, False
+            flight = Flight()
+            self._flights[key] = flight
+            self._counters['executions'] += 1
+            return flight, True
+
+    def finish(self, key: str, flight: Flight, result: Any = None, error: Optional[BaseException] = None):
+        """Publish the leader's outcome and let the next request for key start a new flight"""
+        flight.result = result
+        flight.error = error
+        with self._lock:
+            if self._flights.get(normalize_key(key)) is flight:
+                del self._flights[normalize_key(key)]
+            if error is not None:
+                self._counters['failures'] += 1
+        flight._done.set()
+
+    def do(self, key: str, fn, *args, **kwargs) -> Tuple[Any, bool]:
+        """Run fn(*args, **kwargs) once per concurrent key; returns (result, shared)"""
+        flight, leader = self.begin(key)
+        if not leader:
+            return flight.wait(), True
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.finish(key, flight, error=e)
+            raise
+        self.finish(key, flight, result)
+        return result, False
+
+    def stats(self) -> Dict:
+        """Executions, coalesced (upstream calls saved), failures and keys currently in flight"""
+        with self._lock:
+            counters = dict(self._counters)
+            counters['in_flight'] = len(self._flights)
+        requests = counters['executions'] + counters['coalesced']
+        counters['saved_rate'] = round(counters['coalesced'] / requests, 3) if requests else 0.0
+        return counters
@@ -0,0 +1,110 @@
+"""
+Token-budgeted chat context for InfoFetch AI
+
+The chatbot prompt is built from the newest turns that fit in
+CHAT_CONTEXT_TOKENS plus a persisted rolling summary of everything older,
+so prompt size and latency stay flat however long a conversation gets.
+"""
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+
+from db_utils import get_chat_history, get_chat_summary, save_chat_summary
+from telemetry import get_logger
+from text_utils import count_tokens
+
+log = get_logger("chat")
+
+# Prompt tokens available for the summary plus recent turns
+CHAT_CONTEXT_TOKENS = int(os.getenv("CHAT_CONTEXT_TOKENS", "1200"))
+# Messages read from the database per page, and folded into the summary per call
+CHAT_TAIL_MESSAGES = int(os.getenv("CHAT_TAIL_MESSAGES", "40"))
+# Overflowing turns must add up to this much before the summary is rebuilt
+SUMMARY_BATCH_TOKENS = int(os.getenv("CHAT_SUMMARY_BATCH_TOKENS", "400"))
+# Role and separator tokens the chat format adds to every message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def message_tokens(message: Dict) -> int:
+    return count_tokens(message.get('content', '')) + MESSAGE_OVERHEAD_TOKENS
+
+def pack_turns(turns: List[Dict], budget: int = CHAT_CONTEXT_TOKENS) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Split turns (oldest first) into (packed, overflow): packed is the newest
+    contiguous run that fits in budget, overflow is everything before it.
+    """
+    used = 0
+    start = len(turns)
+    for i in range(len(turns) - 1, -1, -1):
+        cost = message_tokens(turns[i])
+        if used + cost > budget:
+            break
+        used += cost
+        start = i
+    return turns[start:], turns[:start]
+
+def _recent_window(user_id: int, after_id: int, budget: int) -> Tuple[List[Dict], bool]:
+    """
+    Newest turns after after_id that fit in budget, read a page at a time.
+    Returns (turns, overflowed): overflowed is True when older turns were left out.
+    """
+    window = []
+    used = 0
+    before_id = None
+    while True:
+        page = get_chat_history(user_id, limit=CHAT_TAIL_MESSAGES, after_id=after_id, before_id=before_id)
+        packed, overflow = pack_turns(page, budget - used)
+        window = packed + window
+        used += sum(message_tokens(t) for t in packed)
+        if overflow:
+            return window, True
+        if len(page) < CHAT_TAIL_MESSAGES:
+            return window, False
+        before_id = page[0]['id']
+
+def load_chat_context(user_id: Optional[int]) -> Dict:
+    """
+    Summary plus the newest turns not yet folded into it, packed under the
+    budget that is left once the summary is counted.
+    Returns {'summary', 'covered_until_id', 'turns', 'overflowed', 'tokens'}.
+    """
+    if not user_id:
+        return {'summary': '', 'covered_until_id': 0, 'turns': [], 'overflowed': False, 'tokens': 0}
+
+    summary = get_chat_summary(user_id)
+    summary_tokens = count_tokens(summary['summary'])
+    turns, overflowed = _recent_window(user_id, summary['covered_until_id'],
+                                       max(CHAT_CONTEXT_TOKENS - summary_tokens, 0))
+    return {
+        'summary': summary['summary'],
+        'covered_until_id': summary['covered_until_id'],
+        'turns': turns,
+        'overflowed': overflowed,
+        'tokens': summary_tokens + sum(message_tokens(t) for t in turns)
+    }
+
+def refresh_summary(user_id: int, summarizer: Callable[[str, List[Dict]], str]) -> bool:
+    """
+    Fold every turn between the summary and the packed window into the
+    rolling summary, CHAT_TAIL_MESSAGES turns per summarizer call.
+    summarizer(previous_summary, turns) returns the new summary text.
+    Returns True when a new summary was saved.
+    """
+    context = load_chat_context(user_id)
+    if not context['overflowed']:
+        return False
+    before_id = context['turns'][0]['id'] if context['turns'] else None
+    overflow = get_chat_history(user_id, limit=-1, after_id=context['covered_until_id'], before_id=before_id)
+    if not overflow or sum(message_tokens(t) for t in overflow) < SUMMARY_BATCH_TOKENS:
+        return False
+
+    summary = context['summary']
+    folded = 0
+    for start in range(0, len(overflow), CHAT_TAIL_MESSAGES):
+        batch = overflow[start:start + CHAT_TAIL_MESSAGES]
+        new_summary = summarizer(summary, batch)
+        if not new_summary or not save_chat_summary(user_id, new_summary.strip(), batch[-1]['id']):
+            break
+        summary = new_summary.strip()
+        folded += len(batch)
+    if folded:
+        log.info(f"🧾 Chat summary updated for user {user_id} ({folded} turns folded in)")
+    return folded > 0
@@ -2,47 +2,172 @@ import sqlite3
 import json
 from datetime import datetime
 from typing import Dict, List, Any, Optional
+from contextlib import contextmanager
 import hashlib
 import os
+import threading
+import zlib
+
+from telemetry import get_logger, traced
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+log = get_logger("db")
 
 DB_PATH = "infofetch_ai.db"
 
-def init_db():
-    """Initialize database with all required tables - IMPROVED VERSION"""
-    conn = sqlite3.connect(DB_PATH)
+# ============================================================================
+# CONNECTION MANAGEMENT
+# ============================================================================
+
+# Each thread keeps one open connection instead of paying connect/close on
+# every helper call. WAL lets readers run alongside the single writer, so
+# concurrent sessions stop queueing behind each other's reads.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",      # 16 MB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=30000",
+)
+
+_local = threading.local()
+
+def _open_connection(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_thread_connection() -> sqlite3.Connection:
+    """Return this thread's connection to DB_PATH, opening it on first use"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.db_path != DB_PATH:
+        if conn is not None:
+            conn.close()
+        conn = _open_connection(DB_PATH)
+        _local.conn = conn
+        _local.db_path = DB_PATH
+        _local.depth = 0
+    return conn
+
+@contextmanager
+def get_db(write: bool = False):
+    """
+    Yield the thread's connection inside a transaction. Commits on success,
+    rolls back on any exception (BaseException included). Nested uses join the outer transaction.
+    Pass write=True to take the write lock up front (BEGIN IMMEDIATE).
+    """
+    conn = get_thread_connection()
+    outermost = _local.depth == 0
+    if outermost and write and not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    _local.depth += 1
+    committed = False
+    try:
+        yield conn
+        if outermost:
+            conn.commit()
+        committed = True
+    finally:
+        # Also on KeyboardInterrupt, GeneratorExit and Streamlit's rerun/stop
+        # exceptions, so the thread's depth and write lock are never left held
+        _local.depth -= 1
+        if outermost and not committed:
+            conn.rollback()
+
+def close_thread_connection():
+    """Close this thread's connection (worker shutdown, tests)"""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+# ============================================================================
+# CHANGE HOOKS
+# ============================================================================
+
+# Read caches above the database (front.py's st.cache_data wrappers) register
+# here and are told after a committed write, so they can drop what changed.
+# Topics: 'feedback', 'plan' and 'stats'; callbacks receive the user_id (or None).
+_change_hooks: Dict[str, Dict[str, Any]] = {}
+
+def register_change_hook(topic: str, name: str, callback):
+    """Add or replace (by name) a callback for topic; safe to repeat on every rerun"""
+    _change_hooks.setdefault(topic, {})[name] = callback
+
+def notify_change(topic: str, user_id: Optional[int] = None):
+    for name, callback in list(_change_hooks.get(topic, {}).items()):
+        try:
+            callback(user_id)
+        except Exception as e:
+            log.warning(f"⚠️ Change hook {name} failed for {topic}: {e}")
+
+# ============================================================================
+# RESULT PAYLOAD ENCODING
+# ============================================================================
+
+# Full research results are stored compressed in search_payloads; the history
+# list only needs the small columns copied onto search_history.
+PAYLOAD_CODEC = 'zstd' if zstandard is not None else 'zlib'
+ZSTD_LEVEL = 9
+SUMMARY_PREVIEW_CHARS = 300
+
+def encode_result(result: Dict) -> tuple:
+    """Compact JSON, compressed; returns (codec, payload bytes)"""
+    raw = json.dumps(result, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+    if PAYLOAD_CODEC == 'zstd':
+        return 'zstd', zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return 'zlib', zlib.compress(raw, 9)
+
+def decode_result(codec: str, payload: bytes) -> Dict:
+    """Inverse of encode_result for any codec that may be on disk"""
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read this search result")
+        raw = zstandard.ZstdDecompressor().decompress(payload)
+    elif codec == 'zlib':
+        raw = zlib.decompress(payload)
+    else:
+        raw = payload.encode('utf-8') if isinstance(payload, str) else payload
+    return json.loads(raw)
+
+def result_summary_columns(result: Dict) -> tuple:
+    """(query_type, topic, summary_preview) for the history list"""
+    query_type = result.get('query_type') or 'general'
+    topic = result.get('company_name') or result.get('topic') or ''
+    summary = result.get('summary') or ''
+    if not summary and isinstance(result.get('basic_info'), dict):
+        summary = result['basic_info'].get('description') or ''
+    return query_type, str(topic), str(summary)[:SUMMARY_PREVIEW_CHARS]
+
+# ============================================================================
+# SCHEMA MIGRATIONS
+# ============================================================================
+
+# The schema version lives in SQLite's PRAGMA user_version. Each step runs
+# once, in order, inside the same write transaction that bumps the version,
+# so a crash mid-step leaves the database on the previous version.
+
+def _migrate_baseline_schema(conn: sqlite3.Connection):
+    """Tables as they existed before versioning, including users.plan"""
     cursor = conn.cursor()
     
-    print(f"\n{'='*70}")
-    print("🔧 INITIALIZING DATABASE")
-    print(f"{'='*70}\n")
-    
-    # Check if users table exists
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-    users_exists = cursor.fetchone() is not None
-    
-    if users_exists:
-        print("✓ Users table exists - checking for 'plan' column...")
-        
-        # Check if 'plan' column exists
+    if cursor.fetchone() is not None:
         cursor.execute("PRAGMA table_info(users)")
         columns = [column[1] for column in cursor.fetchall()]
-        
         if 'plan' not in columns:
-            print("🔄 Adding 'plan' column (migration)...")
-            try:
-                cursor.execute("ALTER TABLE users ADD COLUMN plan TEXT DEFAULT 'Free'")
-                cursor.execute("UPDATE users SET plan = 'Free' WHERE plan IS NULL")
-                conn.commit()
-                print("✅ Migration complete - 'plan' column added!")
-            except Exception as e:
-                print(f"⚠️ Migration warning: {e}")
-        else:
-            print("✓ 'plan' column already exists")
+            log.info("🔄 Adding 'plan' column to users table...")
+            cursor.execute("ALTER TABLE users ADD COLUMN plan TEXT DEFAULT 'Free'")
+            cursor.execute("UPDATE users SET plan = 'Free' WHERE plan IS NULL")
     else:
-        print("📋 Creating users table from scratch...")
-        # Users table with plan column
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
+            CREATE TABLE users (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 username TEXT UNIQUE NOT NULL,
                 password_hash TEXT NOT NULL,
@@ -53,7 +178,6 @@ def init_db():
                 is_active BOOLEAN DEFAULT 1
             )
         ''')
-        print("✅ Users table created!")
     
     # Search history table
     cursor.execute('''
@@ -98,7 +222,7 @@ def init_db():
         )
     ''')
     
-    # 🆕 Feedback table
+    # Feedback table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS feedback (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -117,13 +241,197 @@ def init_db():
             FOREIGN KEY (user_id) REFERENCES users(id)
         )
     ''')
+
+def _migrate_hot_query_indexes(conn: sqlite3.Connection):
+    """Composite indexes for the per-user history, payment and testimonial queries"""
+    # get_user_history / get_user_stats: WHERE user_id = ? ORDER BY timestamp
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_user_ts ON search_history(user_id, timestamp)")
+    # get_chat_history: WHERE user_id = ? ORDER BY timestamp
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_chat_history_user_ts ON chat_history(user_id, timestamp)")
+    # get_user_payments: WHERE user_id = ? ORDER BY created_at DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_payment_history_user_created ON payment_history(user_id, created_at)")
+    # complete_payment: WHERE razorpay_order_id = ?
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_payment_history_order ON payment_history(razorpay_order_id)")
+    # get_public_feedback: WHERE is_public = 1 AND rating >= 4 ORDER BY rating DESC, created_at DESC
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_feedback_public_rating ON feedback(is_public, rating, created_at)")
+
+# Numeric value of each confidence label, summed in user_stats.confidence_sum
+CONFIDENCE_SCORES = {'high': 3, 'medium': 2, 'low': 1}
+
+def confidence_score(confidence: Optional[str]) -> int:
+    return CONFIDENCE_SCORES.get(str(confidence).lower(), 2)
+
+def _migrate_user_stats(conn: sqlite3.Connection):
+    """Per-user counters kept up to date by the write helpers, backfilled from history"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_stats (
+            user_id INTEGER PRIMARY KEY,
+            total_searches INTEGER NOT NULL DEFAULT 0,
+            total_chats INTEGER NOT NULL DEFAULT 0,
+            confidence_sum INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    conn.execute('''
+        INSERT OR REPLACE INTO user_stats (user_id, total_searches, total_chats, confidence_sum)
+        SELECT u.user_id,
+               COALESCE(s.searches, 0),
+               COALESCE(c.chats, 0),
+               COALESCE(s.confidence_sum, 0)
+        FROM (SELECT user_id FROM search_history UNION SELECT user_id FROM chat_history) u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS searches,
+                   SUM(CASE
+                       WHEN confidence = 'high' THEN 3
+                       WHEN confidence = 'medium' THEN 2
+                       WHEN confidence = 'low' THEN 1
+                       ELSE 2
+                   END) AS confidence_sum
+            FROM search_history GROUP BY user_id
+        ) s ON s.user_id = u.user_id
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS chats FROM chat_history GROUP BY user_id
+        ) c ON c.user_id = u.user_id
+    ''')
+
+def _migrate_search_quota(conn: sqlite3.Connection):
+    """One row per user per day; the primary key makes the quota check a point lookup"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS search_quota (
+            user_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            used INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, day)
+        ) WITHOUT ROWID
+    ''')
+
+def _migrate_split_search_payloads(conn: sqlite3.Connection):
+    """
+    Replace search_history.result_json with hot summary columns plus a
+    compressed payload in search_payloads. Rows are rewritten in place,
+    keeping their ids so user_stats and open links stay valid.
+    """
+    conn.execute('''
+        CREATE TABLE search_history_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            query TEXT NOT NULL,
+            query_type TEXT NOT NULL DEFAULT 'general',
+            topic TEXT,
+            summary_preview TEXT,
+            confidence TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS search_payloads (
+            search_id INTEGER PRIMARY KEY,
+            codec TEXT NOT NULL,
+            payload BLOB NOT NULL
+        )
+    ''')
+    
+    rows = conn.execute(
+        "SELECT id, user_id, query, result_json, confidence, timestamp FROM search_history ORDER BY id"
+    )
+    for search_id, user_id, query, result_json, confidence, timestamp in rows:
+        try:
+            result = json.loads(result_json)
+        except (TypeError, ValueError):
+            result = {"error": "Failed to parse result"}
+        if not isinstance(result, dict):
+            result = {"error": "Failed to parse result"}
+        conn.execute(
+            """INSERT INTO search_history_new
+            (id, user_id, query, query_type, topic, summary_preview, confidence, timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (search_id, user_id, query, *result_summary_columns(result), confidence, timestamp)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO search_payloads (search_id, codec, payload) VALUES (?, ?, ?)",
+            (search_id, *encode_result(result))
+        )
+    
+    conn.execute("DROP TABLE search_history")
+    conn.execute("ALTER TABLE search_history_new RENAME TO search_history")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_search_history_user_ts ON search_history(user_id, timestamp)")
+
+def _migrate_chat_summaries(conn: sqlite3.Connection):
+    """Rolling summary of the chat turns that no longer fit in the prompt budget"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS chat_summaries (
+            user_id INTEGER PRIMARY KEY,
+            summary TEXT NOT NULL DEFAULT '',
+            covered_until_id INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+def _migrate_research_jobs(conn: sqlite3.Connection):
+    """Background research jobs; the result itself is saved to search_history"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS research_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            query TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            stage TEXT NOT NULL DEFAULT '',
+            search_id INTEGER,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_research_jobs_user ON research_jobs(user_id, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_research_jobs_status ON research_jobs(status)")
+
+MIGRATIONS = [
+    (1, "Baseline schema", _migrate_baseline_schema),
+    (2, "Indexes for history, chat, payment and feedback queries", _migrate_hot_query_indexes),
+    (3, "user_stats counters table", _migrate_user_stats),
+    (4, "search_quota daily usage table", _migrate_search_quota),
+    (5, "Split search_history into summary columns and compressed payloads", _migrate_split_search_payloads),
+    (6, "chat_summaries table for rolling chat context", _migrate_chat_summaries),
+    (7, "research_jobs table for background research", _migrate_research_jobs),
+]
+
+def latest_schema_version() -> int:
+    return MIGRATIONS[-1][0]
+
+def get_schema_version() -> int:
+    """Current PRAGMA user_version of the database"""
+    with get_db() as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def run_migrations(target_version: Optional[int] = None) -> int:
+    """Apply every pending migration up to target_version (default: latest); returns the new version"""
+    target = latest_schema_version() if target_version is None else target_version
+    
+    # The write lock is held for the whole run, so two workers starting at
+    # once cannot both apply the same step.
+    with get_db(write=True) as conn:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, description, step in MIGRATIONS:
+            if version <= current or version > target:
+                continue
+            log.info(f"🔄 Migration {version}: {description}")
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            current = version
+    
+    return current
+
+def init_db():
+    """Initialize database by bringing the schema up to the latest version"""
+    log.info("🔧 INITIALIZING DATABASE")
     
-    conn.commit()
-    conn.close()
+    version = run_migrations()
     
-    print(f"{'='*70}")
-    print("✅ DATABASE INITIALIZED SUCCESSFULLY")
-    print(f"{'='*70}\n")
+    log.info(f"✅ DATABASE INITIALIZED SUCCESSFULLY (schema v{version})")
 
 def hash_password(password: str) -> str:
     """Hash password using SHA-256"""
@@ -144,155 +452,124 @@ def create_demo_accounts():
         ("executive", "exec2024", "executive@infofetch.ai")
     ]
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    print("👥 Creating demo accounts...")
+    log.info("👥 Creating demo accounts...")
     created_count = 0
     
-    for username, password, email in accounts:
-        try:
-            password_hash = hash_password(password)
-            cursor.execute(
-                "INSERT OR IGNORE INTO users (username, password_hash, email, plan) VALUES (?, ?, ?, ?)",
-                (username, password_hash, email, 'Free')
-            )
-            if cursor.rowcount > 0:
-                created_count += 1
-        except Exception as e:
-            print(f"   ⚠️ Error creating account {username}: {e}")
-    
-    conn.commit()
-    conn.close()
+    with get_db(write=True) as conn:
+        cursor = conn.cursor()
+        for username, password, email in accounts:
+            try:
+                password_hash = hash_password(password)
+                cursor.execute(
+                    "INSERT OR IGNORE INTO users (username, password_hash, email, plan) VALUES (?, ?, ?, ?)",
+                    (username, password_hash, email, 'Free')
+                )
+                if cursor.rowcount > 0:
+                    created_count += 1
+            except Exception as e:
+                log.warning(f"⚠️ Error creating account {username}: {e}")
     
     if created_count > 0:
-        print(f"✅ Created {created_count} new demo accounts")
+        log.info(f"✅ Created {created_count} new demo accounts")
     else:
-        print(f"✓ All {len(accounts)} demo accounts already exist")
+        log.info(f"✓ All {len(accounts)} demo accounts already exist")
 
 def verify_user(username: str, password: str) -> Optional[int]:
     """Verify user credentials and return user_id if valid"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     password_hash = hash_password(password)
-    cursor.execute(
-        "SELECT id FROM users WHERE username = ? AND password_hash = ? AND is_active = 1",
-        (username, password_hash)
-    )
     
-    result = cursor.fetchone()
-    if result:
-        user_id = result[0]
-        # Update last login
-        cursor.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user_id,))
-        conn.commit()
-        conn.close()
-        return user_id
+    with get_db() as conn:
+        result = conn.execute(
+            "SELECT id FROM users WHERE username = ? AND password_hash = ? AND is_active = 1",
+            (username, password_hash)
+        ).fetchone()
+        
+        if result:
+            user_id = result[0]
+            # Update last login
+            conn.execute("UPDATE users SET last_login = CURRENT_TIMESTAMP WHERE id = ?", (user_id,))
+            return user_id
     
-    conn.close()
     return None
 
 def get_user_plan(user_id: int) -> str:
     """Get user's current plan"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("SELECT plan FROM users WHERE id = ?", (user_id,))
-        result = cursor.fetchone()
-        conn.close()
-        
+        with get_db() as conn:
+            result = conn.execute("SELECT plan FROM users WHERE id = ?", (user_id,)).fetchone()
         return result[0] if result else 'Free'
     except sqlite3.OperationalError as e:
         # Handle case where 'plan' column doesn't exist
-        print(f"⚠️ Database error in get_user_plan: {e}")
-        conn.close()
+        log.warning(f"⚠️ Database error in get_user_plan: {e}")
         return 'Free'
 
 def update_user_plan(user_id: int, plan: str) -> bool:
     """Update user's plan after successful payment"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("UPDATE users SET plan = ? WHERE id = ?", (plan, user_id))
-        conn.commit()
-        conn.close()
+        with get_db(write=True) as conn:
+            conn.execute("UPDATE users SET plan = ? WHERE id = ?", (plan, user_id))
+        notify_change('plan', user_id)
         return True
     except Exception as e:
-        print(f"Error updating plan: {e}")
-        conn.close()
+        log.error(f"Error updating plan: {e}")
         return False
 
 def create_payment_order(user_id: int, plan_name: str, amount: int, order_id: str) -> bool:
     """Create a payment order record"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute(
-            """INSERT INTO payment_history 
-            (user_id, razorpay_order_id, plan_name, amount, status) 
-            VALUES (?, ?, ?, ?, 'pending')""",
-            (user_id, order_id, plan_name, amount)
-        )
-        conn.commit()
-        conn.close()
+        with get_db(write=True) as conn:
+            conn.execute(
+                """INSERT INTO payment_history 
+                (user_id, razorpay_order_id, plan_name, amount, status) 
+                VALUES (?, ?, ?, ?, 'pending')""",
+                (user_id, order_id, plan_name, amount)
+            )
         return True
     except Exception as e:
-        print(f"Error creating payment order: {e}")
-        conn.close()
+        log.error(f"Error creating payment order: {e}")
         return False
 
 def complete_payment(order_id: str, payment_id: str, signature: str) -> bool:
     """Mark payment as completed and update user plan"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        # Update payment record
-        cursor.execute(
-            """UPDATE payment_history 
-            SET razorpay_payment_id = ?, razorpay_signature = ?, 
-                status = 'completed', completed_at = CURRENT_TIMESTAMP
-            WHERE razorpay_order_id = ?""",
-            (payment_id, signature, order_id)
-        )
-        
-        # Get user_id and plan from payment
-        cursor.execute(
-            "SELECT user_id, plan_name FROM payment_history WHERE razorpay_order_id = ?",
-            (order_id,)
-        )
-        result = cursor.fetchone()
-        
+        with get_db(write=True) as conn:
+            # Update payment record
+            conn.execute(
+                """UPDATE payment_history 
+                SET razorpay_payment_id = ?, razorpay_signature = ?, 
+                    status = 'completed', completed_at = CURRENT_TIMESTAMP
+                WHERE razorpay_order_id = ?""",
+                (payment_id, signature, order_id)
+            )
+            
+            # Get user_id and plan from payment
+            result = conn.execute(
+                "SELECT user_id, plan_name FROM payment_history WHERE razorpay_order_id = ?",
+                (order_id,)
+            ).fetchone()
+            
+            if result:
+                user_id, plan_name = result
+                # Update user plan
+                conn.execute("UPDATE users SET plan = ? WHERE id = ?", (plan_name, user_id))
         if result:
-            user_id, plan_name = result
-            # Update user plan
-            cursor.execute("UPDATE users SET plan = ? WHERE id = ?", (plan_name, user_id))
-        
-        conn.commit()
-        conn.close()
+            notify_change('plan', result[0])
         return True
     except Exception as e:
-        print(f"Error completing payment: {e}")
-        conn.close()
+        log.error(f"Error completing payment: {e}")
         return False
 
 def get_user_payments(user_id: int) -> List[Dict]:
     """Get user's payment history"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        """SELECT plan_name, amount, currency, status, created_at, completed_at 
-        FROM payment_history WHERE user_id = ? ORDER BY created_at DESC LIMIT 10""",
-        (user_id,)
-    )
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT plan_name, amount, currency, status, created_at, completed_at 
+            FROM payment_history WHERE user_id = ? ORDER BY created_at DESC LIMIT 10""",
+            (user_id,)
+        ).fetchall()
     
     payments = []
-    for row in cursor.fetchall():
+    for row in rows:
         payments.append({
             'plan': row[0],
             'amount': row[1],
@@ -302,125 +579,206 @@ def get_user_payments(user_id: int) -> List[Dict]:
             'completed': row[5]
         })
     
-    conn.close()
     return payments
 
+def _bump_user_stats(conn: sqlite3.Connection, user_id: int, searches: int = 0,
+                    chats: int = 0, confidence: int = 0):
+    """Apply deltas to a user's counters inside the caller's transaction"""
+    conn.execute(
+        """INSERT INTO user_stats (user_id, total_searches, total_chats, confidence_sum)
+        VALUES (?, MAX(?, 0), MAX(?, 0), MAX(?, 0))
+        ON CONFLICT(user_id) DO UPDATE SET
+            total_searches = MAX(total_searches + ?, 0),
+            total_chats = MAX(total_chats + ?, 0),
+            confidence_sum = MAX(confidence_sum + ?, 0)""",
+        (user_id, searches, chats, confidence, searches, chats, confidence)
+    )
+
 def save_search_history(user_id: int, query: str, result: Dict) -> bool:
     """Save search history to database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+    return save_search_result(user_id, query, result) is not None
+
+@traced('db_save_search')
+def save_search_result(user_id: int, query: str, result: Dict) -> Optional[int]:
+    """Save a research result to the user's history; returns the new search id (None on error)"""
     try:
-        result_json = json.dumps(result, ensure_ascii=False, default=str)
         confidence = result.get('confidence', 'medium')
+        query_type, topic, summary_preview = result_summary_columns(result)
+        codec, payload = encode_result(result)
         
-        cursor.execute(
-            "INSERT INTO search_history (user_id, query, result_json, confidence) VALUES (?, ?, ?, ?)",
-            (user_id, query, result_json, confidence)
-        )
-        conn.commit()
-        conn.close()
-        return True
+        with get_db(write=True) as conn:
+            cursor = conn.execute(
+                """INSERT INTO search_history
+                (user_id, query, query_type, topic, summary_preview, confidence)
+                VALUES (?, ?, ?, ?, ?, ?)""",
+                (user_id, query, query_type, topic, summary_preview, confidence)
+            )
+            conn.execute(
+                "INSERT INTO search_payloads (search_id, codec, payload) VALUES (?, ?, ?)",
+                (cursor.lastrowid, codec, payload)
+            )
+            _bump_user_stats(conn, user_id, searches=1, confidence=confidence_score(confidence))
+            search_id = cursor.lastrowid
+        notify_change('stats', user_id)
+        return search_id
     except Exception as e:
-        print(f"Error saving search: {e}")
-        conn.close()
-        return False
+        log.error(f"Error saving search: {e}")
+        return None
+
+HISTORY_COLUMNS = "id, query, query_type, topic, summary_preview, confidence, timestamp"
+
+def _history_row(row) -> Dict:
+    return {
+        'id': row[0],
+        'query': row[1],
+        'query_type': row[2] or 'general',
+        'topic': row[3] or '',
+        'summary_preview': row[4] or '',
+        'confidence': row[5] or 'medium',
+        'timestamp': row[6]
+    }
 
 def get_user_history(user_id: int, limit: int = 50) -> List[Dict]:
-    """Get user's search history"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    """Get user's search history (summary columns only; see get_search_result)"""
+    with get_db() as conn:
+        rows = conn.execute(
+            f"""SELECT {HISTORY_COLUMNS} FROM search_history
+            WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?""",
+            (user_id, limit)
+        ).fetchall()
     
-    cursor.execute(
-        "SELECT id, query, result_json, confidence, timestamp FROM search_history WHERE user_id = ? ORDER BY timestamp DESC LIMIT ?",
-        (user_id, limit)
-    )
+    return [_history_row(row) for row in rows]
+
+def get_user_history_page(user_id: int, cursor: Optional[tuple] = None, page_size: int = 15) -> Dict:
+    """
+    One page of history, newest first. cursor is the (timestamp, id) of the
+    last row already shown; the query seeks straight to it on
+    idx_search_history_user_ts instead of OFFSET-scanning older pages.
+    Returns {'items', 'next_cursor'} where next_cursor is None on the last page.
+    """
+    with get_db() as conn:
+        if cursor is None:
+            rows = conn.execute(
+                f"""SELECT {HISTORY_COLUMNS} FROM search_history
+                WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?""",
+                (user_id, page_size + 1)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                f"""SELECT {HISTORY_COLUMNS} FROM search_history
+                WHERE user_id = ? AND (timestamp, id) < (?, ?)
+                ORDER BY timestamp DESC, id DESC LIMIT ?""",
+                (user_id, cursor[0], cursor[1], page_size + 1)
+            ).fetchall()
     
-    results = []
-    for row in cursor.fetchall():
-        try:
-            result = json.loads(row[2])
-        except:
-            result = {"error": "Failed to parse result"}
-        
-        results.append({
-            'id': row[0],
-            'query': row[1],
-            'result': result,
-            'confidence': row[3] or 'medium',
-            'timestamp': row[4]
-        })
+    items = [_history_row(row) for row in rows[:page_size]]
+    has_more = len(rows) > page_size
+    return {
+        'items': items,
+        'next_cursor': (items[-1]['timestamp'], items[-1]['id']) if has_more and items else None
+    }
+
+def get_search_result(search_id: int, user_id: Optional[int] = None) -> Optional[Dict]:
+    """Load and decompress the full result for one history entry"""
+    sql = """SELECT p.codec, p.payload FROM search_payloads p
+        JOIN search_history h ON h.id = p.search_id WHERE p.search_id = ?"""
+    params = [search_id]
+    if user_id is not None:
+        sql += " AND h.user_id = ?"
+        params.append(user_id)
     
-    conn.close()
-    return results
+    with get_db() as conn:
+        row = conn.execute(sql, params).fetchone()
+    if row is None:
+        return None
+    try:
+        return decode_result(row[0], row[1])
+    except Exception as e:
+        log.error(f"Error decoding search result {search_id}: {e}")
+        return {"error": "Failed to parse result"}
 
+@traced('db_save_chat')
 def save_chat_message(user_id: int, role: str, content: str) -> bool:
     """Save chat message to database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute(
-            "INSERT INTO chat_history (user_id, role, content) VALUES (?, ?, ?)",
-            (user_id, role, content)
-        )
-        conn.commit()
-        conn.close()
+        with get_db(write=True) as conn:
+            conn.execute(
+                "INSERT INTO chat_history (user_id, role, content) VALUES (?, ?, ?)",
+                (user_id, role, content)
+            )
+            _bump_user_stats(conn, user_id, chats=1)
+        notify_change('stats', user_id)
         return True
     except Exception as e:
-        print(f"Error saving chat message: {e}")
-        conn.close()
+        log.error(f"Error saving chat message: {e}")
         return False
 
-def get_chat_history(user_id: int, limit: int = 100) -> List[Dict]:
-    """Get user's chat history"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute(
-        "SELECT role, content, timestamp FROM chat_history WHERE user_id = ? ORDER BY timestamp ASC LIMIT ?",
-        (user_id, limit)
-    )
+def get_chat_history(user_id: int, limit: int = 100, after_id: int = 0,
+                     before_id: Optional[int] = None) -> List[Dict]:
+    """Get the user's most recent chat messages (oldest first), optionally only ids in (after_id, before_id)"""
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT id, role, content, timestamp FROM (
+                SELECT id, role, content, timestamp FROM chat_history
+                WHERE user_id = ? AND id > ? AND (? IS NULL OR id < ?)
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+            ) ORDER BY timestamp ASC, id ASC""",
+            (user_id, after_id, before_id, before_id, limit)
+        ).fetchall()
     
     history = []
-    for row in cursor.fetchall():
+    for row in rows:
         history.append({
-            'role': row[0],
-            'content': row[1],
-            'timestamp': row[2]
+            'id': row[0],
+            'role': row[1],
+            'content': row[2],
+            'timestamp': row[3]
         })
     
-    conn.close()
     return history
 
+def get_chat_summary(user_id: int) -> Dict:
+    """Rolling summary of older chat turns: {'summary', 'covered_until_id'}"""
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT summary, covered_until_id FROM chat_summaries WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
+    if row is None:
+        return {'summary': '', 'covered_until_id': 0}
+    return {'summary': row[0], 'covered_until_id': row[1]}
+
+def save_chat_summary(user_id: int, summary: str, covered_until_id: int) -> bool:
+    """Store a new rolling summary; ignored if a newer one was saved meanwhile"""
+    try:
+        with get_db(write=True) as conn:
+            conn.execute(
+                """INSERT INTO chat_summaries (user_id, summary, covered_until_id, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    summary = excluded.summary,
+                    covered_until_id = excluded.covered_until_id,
+                    updated_at = excluded.updated_at
+                WHERE excluded.covered_until_id > chat_summaries.covered_until_id""",
+                (user_id, summary, covered_until_id)
+            )
+        return True
+    except Exception as e:
+        log.error(f"Error saving chat summary: {e}")
+        return False
+
 def get_user_stats(user_id: int) -> Dict:
-    """Get user statistics"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+    """Get user statistics (one primary-key lookup on user_stats)"""
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT total_searches, total_chats, confidence_sum FROM user_stats WHERE user_id = ?",
+            (user_id,)
+        ).fetchone()
     
-    # Total searches
-    cursor.execute("SELECT COUNT(*) FROM search_history WHERE user_id = ?", (user_id,))
-    total_searches = cursor.fetchone()[0]
-    
-    # Total chat messages
-    cursor.execute("SELECT COUNT(*) FROM chat_history WHERE user_id = ?", (user_id,))
-    total_chats = cursor.fetchone()[0]
-    
-    # Average confidence
-    cursor.execute("""
-        SELECT AVG(CASE 
-            WHEN confidence = 'high' THEN 3 
-            WHEN confidence = 'medium' THEN 2 
-            WHEN confidence = 'low' THEN 1 
-            ELSE 2
-        END) FROM search_history WHERE user_id = ?
-    """, (user_id,))
-    
-    avg_conf = cursor.fetchone()[0] or 2.0
+    total_searches, total_chats, confidence_sum = row if row else (0, 0, 0)
+    avg_conf = confidence_sum / total_searches if total_searches else 2.0
     avg_confidence = "High" if avg_conf >= 2.5 else "Medium" if avg_conf >= 1.5 else "Low"
     
-    conn.close()
-    
     return {
         'total_searches': total_searches,
         'total_chats': total_chats,
@@ -429,48 +787,195 @@ def get_user_stats(user_id: int) -> Dict:
 
 def clear_user_history(user_id: int) -> bool:
     """Clear all user history (searches and chats)"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("DELETE FROM search_history WHERE user_id = ?", (user_id,))
-        cursor.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        with get_db(write=True) as conn:
+            conn.execute(
+                "DELETE FROM search_payloads WHERE search_id IN (SELECT id FROM search_history WHERE user_id = ?)",
+                (user_id,)
+            )
+            conn.execute("DELETE FROM search_history WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM chat_summaries WHERE user_id = ?", (user_id,))
+            conn.execute(
+                "UPDATE user_stats SET total_searches = 0, total_chats = 0, confidence_sum = 0 WHERE user_id = ?",
+                (user_id,)
+            )
+        notify_change('stats', user_id)
         return True
     except Exception as e:
-        print(f"Error clearing history: {e}")
-        conn.close()
+        log.error(f"Error clearing history: {e}")
         return False
 
 def delete_search_item(search_id: int) -> bool:
     """Delete a specific search item"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("DELETE FROM search_history WHERE id = ?", (search_id,))
-        conn.commit()
-        conn.close()
+        with get_db(write=True) as conn:
+            row = conn.execute("SELECT user_id, confidence FROM search_history WHERE id = ?", (search_id,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM search_payloads WHERE search_id = ?", (search_id,))
+                conn.execute("DELETE FROM search_history WHERE id = ?", (search_id,))
+                _bump_user_stats(conn, row[0], searches=-1, confidence=-confidence_score(row[1]))
+        if row:
+            notify_change('stats', row[0])
         return True
     except Exception as e:
-        print(f"Error deleting search: {e}")
-        conn.close()
+        log.error(f"Error deleting search: {e}")
         return False
 
 def clear_chat_history(user_id: int) -> bool:
     """Clear only chat history for a user"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
-        conn.commit()
-        conn.close()
+        with get_db(write=True) as conn:
+            conn.execute("DELETE FROM chat_history WHERE user_id = ?", (user_id,))
+            conn.execute("DELETE FROM chat_summaries WHERE user_id = ?", (user_id,))
+            conn.execute("UPDATE user_stats SET total_chats = 0 WHERE user_id = ?", (user_id,))
+        notify_change('stats', user_id)
         return True
     except Exception as e:
-        print(f"Error clearing chat history: {e}")
-        conn.close()
+        log.error(f"Error clearing chat history: {e}")
+        return False
+
+# ============================================================================
+# RESEARCH JOBS
+# ============================================================================
+
+# status: queued -> running -> done | failed. jobs.py owns the transitions.
+RESEARCH_JOB_COLUMNS = "id, user_id, query, status, stage, search_id, error, created_at, started_at, finished_at"
+
+def _research_job_row(row) -> Dict:
+    return dict(zip(RESEARCH_JOB_COLUMNS.split(", "), row))
+
+def create_research_job(user_id: int, query: str) -> int:
+    with get_db(write=True) as conn:
+        cursor = conn.execute(
+            "INSERT INTO research_jobs (user_id, query) VALUES (?, ?)", (user_id, query)
+        )
+        return cursor.lastrowid
+
+def update_research_job(job_id: int, **fields) -> bool:
+    """Set status / stage / search_id / error; started_at and finished_at follow the status"""
+    allowed = {'status', 'stage', 'search_id', 'error'}
+    assignments = [f"{name} = ?" for name in fields if name in allowed]
+    params = [value for name, value in fields.items() if name in allowed]
+    status = fields.get('status')
+    if status == 'running':
+        assignments.append("started_at = CURRENT_TIMESTAMP")
+    elif status in ('done', 'failed'):
+        assignments.append("finished_at = CURRENT_TIMESTAMP")
+    if not assignments:
+        return False
+    try:
+        with get_db(write=True) as conn:
+            conn.execute(f"UPDATE research_jobs SET {', '.join(assignments)} WHERE id = ?", params + [job_id])
+        return True
+    except Exception as e:
+        log.error(f"Error updating research job {job_id}: {e}")
+        return False
+
+def get_research_job(job_id: int, user_id: Optional[int] = None) -> Optional[Dict]:
+    sql = f"SELECT {RESEARCH_JOB_COLUMNS} FROM research_jobs WHERE id = ?"
+    params = [job_id]
+    if user_id is not None:
+        sql += " AND user_id = ?"
+        params.append(user_id)
+    with get_db() as conn:
+        row = conn.execute(sql, params).fetchone()
+    return _research_job_row(row) if row else None
+
+def get_user_research_jobs(user_id: int, active_only: bool = False, limit: int = 10) -> List[Dict]:
+    """The user's newest jobs first"""
+    sql = f"SELECT {RESEARCH_JOB_COLUMNS} FROM research_jobs WHERE user_id = ?"
+    if active_only:
+        sql += " AND status IN ('queued', 'running')"
+    sql += " ORDER BY id DESC LIMIT ?"
+    with get_db() as conn:
+        rows = conn.execute(sql, (user_id, limit)).fetchall()
+    return [_research_job_row(row) for row in rows]
+
+def get_unfinished_research_jobs() -> List[Dict]:
+    """Jobs left queued or running by a previous process, oldest first"""
+    with get_db() as conn:
+        rows = conn.execute(
+            f"SELECT {RESEARCH_JOB_COLUMNS} FROM research_jobs WHERE status IN ('queued', 'running') ORDER BY id"
+        ).fetchall()
+    return [_research_job_row(row) for row in rows]
+
+# ============================================================================
+# SEARCH QUOTAS
+# ============================================================================
+
+# Searches allowed per calendar day; None means unlimited
+PLAN_DAILY_LIMITS = {'Free': 10, 'Plus': 100, 'Premium': None}
+
+def get_plan_limit(plan: str) -> Optional[int]:
+    return PLAN_DAILY_LIMITS.get(plan, PLAN_DAILY_LIMITS['Free'])
+
+def quota_day() -> str:
+    return datetime.now().strftime('%Y-%m-%d')
+
+def get_search_quota(user_id: int, plan: str) -> Dict:
+    """Today's usage for display: {'used', 'limit', 'remaining'}"""
+    limit = get_plan_limit(plan)
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT used FROM search_quota WHERE user_id = ? AND day = ?",
+            (user_id, quota_day())
+        ).fetchone()
+    used = row[0] if row else 0
+    return {
+        'used': used,
+        'limit': limit,
+        'remaining': None if limit is None else max(limit - used, 0)
+    }
+
+def consume_search_quota(user_id: int, plan: str) -> Dict:
+    """
+    Atomically reserve one search for today. The increment only happens
+    while used < limit, under the write lock, so two tabs racing for the
+    last search cannot both get it. Returns {'allowed', 'used', 'limit'}.
+    """
+    limit = get_plan_limit(plan)
+    day = quota_day()
+    try:
+        with get_db(write=True) as conn:
+            if limit is None:
+                cursor = conn.execute(
+                    """INSERT INTO search_quota (user_id, day, used) VALUES (?, ?, 1)
+                    ON CONFLICT(user_id, day) DO UPDATE SET used = used + 1""",
+                    (user_id, day)
+                )
+            elif limit <= 0:
+                cursor = None
+            else:
+                cursor = conn.execute(
+                    """INSERT INTO search_quota (user_id, day, used) VALUES (?, ?, 1)
+                    ON CONFLICT(user_id, day) DO UPDATE SET used = used + 1 WHERE used < ?""",
+                    (user_id, day, limit)
+                )
+            row = conn.execute(
+                "SELECT used FROM search_quota WHERE user_id = ? AND day = ?",
+                (user_id, day)
+            ).fetchone()
+        return {
+            'allowed': cursor is not None and cursor.rowcount == 1,
+            'used': row[0] if row else 0,
+            'limit': limit
+        }
+    except Exception as e:
+        log.error(f"Error consuming search quota: {e}")
+        return {'allowed': False, 'used': 0, 'limit': limit}
+
+def release_search_quota(user_id: int) -> bool:
+    """Give back one of today's searches (a run that failed and saved nothing); never goes below 0"""
+    try:
+        with get_db(write=True) as conn:
+            conn.execute(
+                "UPDATE search_quota SET used = used - 1 WHERE user_id = ? AND day = ? AND used > 0",
+                (user_id, quota_day())
+            )
+        return True
+    except Exception as e:
+        log.error(f"Error releasing search quota: {e}")
         return False
 
 # ============================================================================
@@ -481,42 +986,36 @@ def save_feedback(user_id: int, username: str, rating: int, category: str,
                   feedback_text: str, ai_understanding: str, accuracy: int, 
                   speed: int, ui: int, feature_requests: str, is_public: bool = True) -> bool:
     """Save user feedback to database"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            INSERT INTO feedback 
-            (user_id, username, rating, category, feedback_text, ai_understanding, 
-             accuracy_score, speed_score, ui_score, feature_requests, is_public)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, username, rating, category, feedback_text, ai_understanding,
-              accuracy, speed, ui, feature_requests, is_public))
+        with get_db(write=True) as conn:
+            conn.execute('''
+                INSERT INTO feedback 
+                (user_id, username, rating, category, feedback_text, ai_understanding, 
+                 accuracy_score, speed_score, ui_score, feature_requests, is_public)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (user_id, username, rating, category, feedback_text, ai_understanding,
+                  accuracy, speed, ui, feature_requests, is_public))
+        notify_change('feedback', user_id)
         
-        conn.commit()
-        conn.close()
-        print(f"✅ Feedback saved from user {username}")
+        log.info(f"✅ Feedback saved from user {username}")
         return True
     except Exception as e:
-        print(f"❌ Error saving feedback: {e}")
-        conn.close()
+        log.error(f"❌ Error saving feedback: {e}")
         return False
 
 def get_public_feedback(limit: int = 6) -> List[Dict]:
     """Get public positive feedback for landing page (4+ star reviews)"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT username, rating, feedback_text, created_at 
-        FROM feedback 
-        WHERE is_public = 1 AND rating >= 4
-        ORDER BY rating DESC, created_at DESC 
-        LIMIT ?
-    ''', (limit,))
+    with get_db() as conn:
+        rows = conn.execute('''
+            SELECT username, rating, feedback_text, created_at 
+            FROM feedback 
+            WHERE is_public = 1 AND rating >= 4
+            ORDER BY rating DESC, created_at DESC 
+            LIMIT ?
+        ''', (limit,)).fetchall()
     
     reviews = []
-    for row in cursor.fetchall():
+    for row in rows:
         reviews.append({
             'username': row[0],
             'rating': row[1],
@@ -524,67 +1023,72 @@ def get_public_feedback(limit: int = 6) -> List[Dict]:
             'date': row[3]
         })
     
-    conn.close()
     return reviews
 
 def get_user_feedback_stats(user_id: int) -> Dict:
     """Get feedback statistics for a specific user"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Total feedback count
-    cursor.execute('SELECT COUNT(*) FROM feedback WHERE user_id = ?', (user_id,))
-    total = cursor.fetchone()[0]
+    with get_db() as conn:
+        # Total feedback count and average rating
+        total, avg_rating = conn.execute(
+            'SELECT COUNT(*), AVG(rating) FROM feedback WHERE user_id = ?', (user_id,)
+        ).fetchone()
     
-    # Average rating
-    cursor.execute('SELECT AVG(rating) FROM feedback WHERE user_id = ?', (user_id,))
-    avg_rating = cursor.fetchone()[0] or 0
-    
-    conn.close()
     return {
         'total_feedback': total,
-        'avg_rating': round(avg_rating, 1)
+        'avg_rating': round(avg_rating or 0, 1)
     }
 
 def get_all_feedback_summary() -> Dict:
     """Get platform-wide feedback summary for analytics"""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Total feedback
-    cursor.execute('SELECT COUNT(*) FROM feedback')
-    total = cursor.fetchone()[0]
-    
-    # Average rating
-    cursor.execute('SELECT AVG(rating) FROM feedback')
-    avg_rating = cursor.fetchone()[0] or 0
-    
-    # Average scores
-    cursor.execute('SELECT AVG(accuracy_score), AVG(speed_score), AVG(ui_score) FROM feedback')
-    scores = cursor.fetchone()
-    
-    # Category breakdown
-    cursor.execute('''
-        SELECT category, COUNT(*) 
-        FROM feedback 
-        GROUP BY category 
-        ORDER BY COUNT(*) DESC
-    ''')
-    categories = {row[0]: row[1] for row in cursor.fetchall()}
-    
-    conn.close()
+    with get_db() as conn:
+        cursor = conn.cursor()
+        
+        # Total feedback, average rating and average scores in one pass
+        cursor.execute('''
+            SELECT COUNT(*), AVG(rating), AVG(accuracy_score), AVG(speed_score), AVG(ui_score)
+            FROM feedback
+        ''')
+        total, avg_rating, *scores = cursor.fetchone()
+        
+        # Category breakdown
+        cursor.execute('''
+            SELECT category, COUNT(*) 
+            FROM feedback 
+            GROUP BY category 
+            ORDER BY COUNT(*) DESC
+        ''')
+        categories = {row[0]: row[1] for row in cursor.fetchall()}
     
     return {
         'total_feedback': total,
-        'avg_rating': round(avg_rating, 1),
+        'avg_rating': round(avg_rating or 0, 1),
         'avg_accuracy': round(scores[0] or 0, 1),
         'avg_speed': round(scores[1] or 0, 1),
         'avg_ui': round(scores[2] or 0, 1),
         'category_breakdown': categories
     }
 
-# Auto-initialize database on import
-print("\n🚀 Loading db_utils module...")
-init_db()
-create_demo_accounts()
-print()
\ No newline at end of file
+# ============================================================================
+# BOOTSTRAP
+# ============================================================================
+
+# Importing db_utils touches no database; the app calls bootstrap_db() once
+# (front.py does it from a st.cache_resource hook) before the first query.
+_bootstrapped_paths = set()
+_bootstrap_lock = threading.Lock()
+
+def bootstrap_db() -> bool:
+    """
+    Migrate the schema and create the demo accounts, once per process and
+    database file. Safe to call from any thread, any number of times.
+    Returns True when this call did the work.
+    """
+    if DB_PATH in _bootstrapped_paths:
+        return False
+    with _bootstrap_lock:
+        if DB_PATH in _bootstrapped_paths:
+            return False
+        init_db()
+        create_demo_accounts()
+        _bootstrapped_paths.add(DB_PATH)
+    return True
\ No newline at end of file
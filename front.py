@@ -14,761 +14,37 @@ import time
 import sys
 import os
 from datetime import datetime
+from streamlit.errors import StreamlitAPIException
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import custom modules
-from serp import run_research_agent, get_chat_response, OPENAI_AVAILABLE, SERPAPI_AVAILABLE, display_company_results
+from serp import stream_chat_response, schedule_chat_summary, init_backend, OPENAI_AVAILABLE, SERPAPI_AVAILABLE, display_company_results
+from serp import coalescing_stats, search_cache, research_cache, peek_research_cache
 from db_utils import *
-from razorpay_handler import create_razorpay_order, RAZORPAY_AVAILABLE, PLAN_PRICING
+from chat_context import load_chat_context
+from razorpay_handler import create_razorpay_order, razorpay_available, PLAN_PRICING
+from theme import theme_html, logo_html, plan_badge_html, nudge_html
+from jobs import submit_research, poll_research_job, recover_research_jobs
+from bulk_research import read_queries, plan_bulk, checkpoint_path_for, start_bulk_run, get_bulk_run, export_results
+from rate_limit import rate_limit_stats
+from telemetry import metrics_snapshot, recent_traces, export_metrics, get_log_level, set_log_level
+
+@st.cache_resource(show_spinner=False)
+def start_backend() -> dict:
+    """Once per server process: database bootstrap now, API clients warmed in the background"""
+    status = init_backend(background=True)
+    recover_research_jobs()
+    return status
+
+start_backend()
 
 # ============================================================================
-# PREMIUM PROFESSIONAL CSS - BOARD-READY DESIGN
+# PREMIUM PROFESSIONAL THEME - BOARD-READY DESIGN
 # ============================================================================
 
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800;900&family=Space+Grotesk:wght@400;500;600;700&display=swap');
-
-/* ============================================================================
-   STREAMLIT LAYOUT OVERRIDES
-   ============================================================================ */
-.main > div {
-    padding-top: 0rem !important;
-}
-
-.main .block-container {
-    padding-top: 0rem !important;
-    padding-bottom: 0rem !important;
-}
-
-section[data-testid="stVerticalBlock"] > div {
-    gap: 0rem !important;
-}
-
-/* ============================================================================
-   GLOBAL PREMIUM THEME
-   ============================================================================ */
-* {
-    margin: 0;
-    padding: 0;
-    box-sizing: border-box;
-}
-
-html, body, .stApp {
-    background: linear-gradient(135deg, #0f172a 0%, #1e293b 50%, #0f172a 100%) !important;
-    font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    color: #f1f5f9;
-}
-
-/* Remove Streamlit branding */
-#MainMenu, footer, header, .stDeployButton, 
-[data-testid="stToolbar"], [data-testid="stDecoration"] {
-    display: none !important;
-}
-
-.stApp > header {
-    background-color: transparent !important;
-}
-
-/* ============================================================================
-   PROFESSIONAL NAVIGATION
-   ============================================================================ */
-.logo-text {
-    font-family: 'Space Grotesk', sans-serif;
-    font-size: 1.75rem;
-    font-weight: 700;
-    background: linear-gradient(135deg, #3b82f6 0%, #06b6d4 100%);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    letter-spacing: -0.5px;
-}
-
-/* ============================================================================
-   HERO SECTION WITH BACKGROUND IMAGE
-   ============================================================================ */
-.hero-with-image {
-    position: relative;
-    min-height: 600px;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    overflow: hidden;
-    margin-bottom: 4rem;
-}
-
-.hero-background {
-    position: absolute;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 100%;
-    background: linear-gradient(135deg, rgba(15, 23, 42, 0.50) 0%, rgba(30, 41, 59, 0.55) 100%),
-                url('https://images.unsplash.com/photo-1451187580459-43490279c0fa?w=1920&q=80') center/cover;
-    z-index: 1;
-    filter: brightness(0.9);
-}
-
-.hero-background::after {
-    content: '';
-    position: absolute;
-    top: 0;
-    left: 0;
-    width: 100%;
-    height: 100%;
-    background: radial-gradient(ellipse at center, transparent 0%, rgba(15, 23, 42, 0.4) 100%);
-    z-index: 2;
-}
-
-.hero-content-overlay {
-    position: relative;
-    z-index: 10;
-    text-align: center;
-    padding: 4rem 2rem;
-    max-width: 1000px;
-}
-
-.badge-professional {
-    display: inline-flex;
-    align-items: center;
-    gap: 0.5rem;
-    padding: 0.6rem 1.2rem;
-    background: rgba(59, 130, 246, 0.15);
-    border: 1px solid rgba(59, 130, 246, 0.3);
-    border-radius: 50px;
-    color: #93c5fd;
-    font-size: 0.875rem;
-    font-weight: 600;
-    margin-bottom: 2rem;
-    letter-spacing: 0.5px;
-}
-
-.hero-title-pro {
-    font-family: 'Space Grotesk', sans-serif;
-    font-size: 3.5rem;
-    font-weight: 700;
-    line-height: 1.15;
-    margin-bottom: 1.5rem;
-    background: linear-gradient(135deg, #ffffff 0%, #93c5fd 100%);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-    letter-spacing: -1.5px;
-}
-
-.hero-subtitle-pro {
-    font-size: 1.15rem;
-    color: #cbd5e1;
-    line-height: 1.7;
-    max-width: 600px;
-    margin: 0 auto 2.5rem;
-    font-weight: 400;
-    text-align: center;
-}
-
-/* ============================================================================
-   MODERN FEATURE CARDS
-   ============================================================================ */
-.features-container-pro {
-    max-width: 1200px;
-    margin: 4rem auto;
-    padding: 0 2rem;
-}
-
-.section-title-pro {
-    font-family: 'Space Grotesk', sans-serif;
-    font-size: 2.25rem;
-    font-weight: 700;
-    text-align: center;
-    margin-bottom: 1rem;
-    background: linear-gradient(135deg, #ffffff 0%, #93c5fd 100%);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-}
-
-.section-desc-pro {
-    text-align: center;
-    color: #94a3b8;
-    font-size: 1rem;
-    margin-bottom: 3rem;
-}
-
-.feature-grid-pro {
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-    gap: 1.5rem;
-    margin-top: 2rem;
-}
-
-.feature-card-pro {
-    background: rgba(30, 41, 59, 0.6);
-    border: 1px solid rgba(59, 130, 246, 0.15);
-    border-radius: 16px;
-    padding: 2rem;
-    transition: all 0.3s ease;
-    backdrop-filter: blur(10px);
-}
-
-.feature-card-pro:hover {
-    transform: translateY(-5px);
-    border-color: rgba(59, 130, 246, 0.4);
-    box-shadow: 0 12px 48px rgba(59, 130, 246, 0.15);
-}
-
-.feature-icon-pro {
-    font-size: 2.5rem;
-    margin-bottom: 1rem;
-    display: block;
-}
-
-.feature-title-pro {
-    font-family: 'Space Grotesk', sans-serif;
-    font-size: 1.25rem;
-    font-weight: 600;
-    color: #f1f5f9;
-    margin-bottom: 0.75rem;
-}
-
-.feature-desc-pro {
-    color: #cbd5e1;
-    line-height: 1.6;
-    font-size: 0.95rem;
-}
-
-/* ============================================================================
-   PROFESSIONAL STATS SECTION
-   ============================================================================ */
-.stats-container-pro {
-    max-width: 1000px;
-    margin: 4rem auto;
-    padding: 3rem 2rem;
-    background: rgba(30, 41, 59, 0.4);
-    border-radius: 20px;
-    border: 1px solid rgba(59, 130, 246, 0.1);
-}
-
-.stats-grid-pro {
-    display: grid;
-    grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-    gap: 2rem;
-    text-align: center;
-}
-
-.stat-number-pro {
-    font-family: 'Space Grotesk', sans-serif;
-    font-size: 2.5rem;
-    font-weight: 700;
-    color: #3b82f6;
-    margin-bottom: 0.5rem;
-}
-
-.stat-label-pro {
-    color: #94a3b8;
-    font-size: 0.95rem;
-    font-weight: 500;
-}
-
-/* ============================================================================
-   REVIEWS SECTION - LANDING PAGE
-   ============================================================================ */
-.reviews-section {
-    max-width: 1200px;
-    margin: 5rem auto 3rem;
-    padding: 0 2rem;
-}
-
-.review-card-landing {
-    background: rgba(15, 23, 42, 0.8);
-    border: 1px solid rgba(59, 130, 246, 0.2);
-    border-radius: 20px;
-    padding: 2rem;
-    height: 100%;
-    min-height: 260px;
-    position: relative;
-    transition: all 0.35s ease;
-    backdrop-filter: blur(12px);
-    overflow: hidden;
-}
-
-.review-card-landing::before {
-    content: '"';
-    position: absolute;
-    top: -10px;
-    left: 20px;
-    font-size: 7rem;
-    color: rgba(59, 130, 246, 0.08);
-    font-family: Georgia, serif;
-    line-height: 1;
-    pointer-events: none;
-}
-
-.review-card-landing:hover {
-    transform: translateY(-6px);
-    border-color: rgba(59, 130, 246, 0.45);
-    box-shadow: 0 16px 48px rgba(59, 130, 246, 0.18);
-}
-
-.review-avatar {
-    width: 48px;
-    height: 48px;
-    border-radius: 50%;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    font-size: 1.4rem;
-    font-weight: 700;
-    margin-bottom: 1rem;
-    flex-shrink: 0;
-}
-
-.review-header-row {
-    display: flex;
-    align-items: center;
-    gap: 1rem;
-    margin-bottom: 1rem;
-}
-
-.review-meta {
-    flex: 1;
-}
-
-.review-name {
-    font-family: 'Space Grotesk', sans-serif;
-    font-weight: 600;
-    font-size: 1rem;
-    color: #f1f5f9;
-    margin-bottom: 0.15rem;
-}
-
-.review-role {
-    font-size: 0.78rem;
-    color: #64748b;
-    font-weight: 400;
-}
-
-.review-stars {
-    font-size: 0.9rem;
-    letter-spacing: 1px;
-    margin-bottom: 0.85rem;
-}
-
-.review-text-landing {
-    color: #cbd5e1;
-    line-height: 1.7;
-    font-size: 0.93rem;
-    font-style: italic;
-}
-
-.review-date-badge {
-    display: inline-block;
-    margin-top: 1rem;
-    padding: 0.2rem 0.75rem;
-    background: rgba(59, 130, 246, 0.1);
-    border-radius: 20px;
-    font-size: 0.75rem;
-    color: #3b82f6;
-    font-weight: 500;
-}
-
-/* ============================================================================
-   FEEDBACK PAGE STYLES
-   ============================================================================ */
-.feedback-hero {
-    background: linear-gradient(135deg, rgba(59, 130, 246, 0.15) 0%, rgba(6, 182, 212, 0.1) 100%);
-    border: 1px solid rgba(59, 130, 246, 0.2);
-    border-radius: 24px;
-    padding: 3rem 2rem;
-    text-align: center;
-    margin-bottom: 2.5rem;
-}
-
-.feedback-section-card {
-    background: rgba(30, 41, 59, 0.5);
-    border: 1px solid rgba(59, 130, 246, 0.12);
-    border-radius: 18px;
-    padding: 2rem;
-    margin-bottom: 1.5rem;
-    backdrop-filter: blur(8px);
-}
-
-.feedback-section-title {
-    font-family: 'Space Grotesk', sans-serif;
-    font-size: 1.1rem;
-    font-weight: 600;
-    color: #93c5fd;
-    margin-bottom: 1.25rem;
-    display: flex;
-    align-items: center;
-    gap: 0.5rem;
-}
-
-.emoji-rating-container {
-    display: flex;
-    gap: 1rem;
-    justify-content: center;
-    flex-wrap: wrap;
-    padding: 0.5rem;
-}
-
-.emoji-rating-btn {
-    display: flex;
-    flex-direction: column;
-    align-items: center;
-    padding: 1rem 1.25rem;
-    background: rgba(30, 41, 59, 0.8);
-    border: 2px solid rgba(59, 130, 246, 0.15);
-    border-radius: 16px;
-    cursor: pointer;
-    transition: all 0.2s ease;
-    min-width: 80px;
-}
-
-.emoji-rating-btn:hover {
-    border-color: rgba(59, 130, 246, 0.5);
-    background: rgba(59, 130, 246, 0.1);
-    transform: scale(1.08);
-}
-
-.emoji-rating-btn.selected {
-    border-color: #3b82f6;
-    background: rgba(59, 130, 246, 0.2);
-    box-shadow: 0 0 20px rgba(59, 130, 246, 0.3);
-}
-
-.pulse-dot {
-    display: inline-block;
-    width: 10px;
-    height: 10px;
-    border-radius: 50%;
-    background: #22c55e;
-    animation: pulse 2s infinite;
-    margin-right: 8px;
-}
-
-@keyframes pulse {
-    0% { box-shadow: 0 0 0 0 rgba(34, 197, 94, 0.4); }
-    70% { box-shadow: 0 0 0 8px rgba(34, 197, 94, 0); }
-    100% { box-shadow: 0 0 0 0 rgba(34, 197, 94, 0); }
-}
-
-.progress-bar-container {
-    background: rgba(30, 41, 59, 0.8);
-    border-radius: 10px;
-    height: 8px;
-    overflow: hidden;
-    margin-top: 0.5rem;
-}
-
-.progress-bar-fill {
-    height: 100%;
-    border-radius: 10px;
-    background: linear-gradient(90deg, #3b82f6, #06b6d4);
-    transition: width 0.5s ease;
-}
-
-.tag-chip {
-    display: inline-block;
-    padding: 0.35rem 0.85rem;
-    border-radius: 20px;
-    font-size: 0.82rem;
-    font-weight: 500;
-    cursor: pointer;
-    transition: all 0.2s;
-    border: 1px solid transparent;
-    margin: 0.2rem;
-}
-
-.tag-chip-default {
-    background: rgba(30, 41, 59, 0.9);
-    border-color: rgba(59, 130, 246, 0.2);
-    color: #94a3b8;
-}
-
-.tag-chip-selected {
-    background: rgba(59, 130, 246, 0.2);
-    border-color: #3b82f6;
-    color: #93c5fd;
-}
-
-.submit-feedback-btn {
-    background: linear-gradient(135deg, #3b82f6, #06b6d4) !important;
-    color: white !important;
-    border: none !important;
-    padding: 1rem 3rem !important;
-    border-radius: 14px !important;
-    font-size: 1.1rem !important;
-    font-weight: 700 !important;
-    width: 100%;
-    cursor: pointer;
-    box-shadow: 0 8px 24px rgba(59, 130, 246, 0.35) !important;
-    transition: all 0.3s ease !important;
-}
-
-.success-feedback-banner {
-    background: linear-gradient(135deg, rgba(34, 197, 94, 0.2), rgba(16, 185, 129, 0.15));
-    border: 1px solid rgba(34, 197, 94, 0.4);
-    border-radius: 20px;
-    padding: 3rem 2rem;
-    text-align: center;
-}
-
-/* ============================================================================
-   PROFESSIONAL BUTTONS
-   ============================================================================ */
-.stButton > button {
-    background: linear-gradient(135deg, #3b82f6, #2563eb) !important;
-    color: #fff !important;
-    border-radius: 10px !important;
-    font-weight: 600 !important;
-    font-family: 'Inter', sans-serif !important;
-    border: none !important;
-    padding: 0.6rem 0.5rem !important;
-    transition: all 0.7s cubic-bezier(0.25, 0.46, 0.45, 0.94) !important;
-    box-shadow: 0 4px 14px rgba(59, 130, 246, 0.25) !important;
-    font-size: 0.85rem !important;
-    white-space: nowrap !important;
-    cursor: pointer !important;
-    will-change: transform, box-shadow !important;
-}
-
-.stButton > button:hover {
-    transform: translateY(-3px) scale(1.05) !important;
-    box-shadow: 0 10px 32px rgba(59, 130, 246, 0.55), 
-                0 5px 15px rgba(59, 130, 246, 0.3) !important;
-    background: linear-gradient(135deg, #4a8ef6, #2d6beb) !important;
-    filter: brightness(1.06) saturate(1.1) !important;
-}
-
-.stButton > button:active {
-    transform: translateY(-1px) scale(1.02) !important;
-    transition: all 0.1s ease !important;
-}
-            
-/* ============================================================================
-   PROFESSIONAL INPUTS
-   ============================================================================ */
-.stTextInput > div > div > input,
-.stTextArea > div > div > textarea {
-    background: rgba(30, 41, 59, 0.7) !important;
-    border: 1px solid rgba(59, 130, 246, 0.2) !important;
-    border-radius: 10px !important;
-    color: #f1f5f9 !important;
-    font-family: 'Inter', sans-serif !important;
-    font-size: 0.85rem !important;
-    white-space: nowrap !important;
-    padding: 0.875rem 1rem !important;
-}
-
-.stTextInput > div > div > input:focus,
-.stTextArea > div > div > textarea:focus {
-    border-color: #3b82f6 !important;
-    box-shadow: 0 0 0 3px rgba(59, 130, 246, 0.15) !important;
-}
-
-/* Slider styling */
-.stSlider > div > div > div {
-    color: #3b82f6 !important;
-}
-
-/* Radio and checkbox */
-.stRadio > div {
-    gap: 0.5rem !important;
-}
-
-.stRadio label, .stCheckbox label {
-    color: #cbd5e1 !important;
-    font-size: 0.85rem !important;
-    white-space: nowrap !important;
-}
-
-/* Select box */
-.stSelectbox > div > div {
-    background: rgba(30, 41, 59, 0.7) !important;
-    border: 1px solid rgba(59, 130, 246, 0.2) !important;
-    border-radius: 10px !important;
-    color: #f1f5f9 !important;
-}
-
-/* ============================================================================
-   PROFESSIONAL ALERTS
-   ============================================================================ */
-.stSuccess {
-    background: rgba(34, 197, 94, 0.1) !important;
-    border-left: 4px solid #22c55e !important;
-    border-radius: 10px !important;
-    color: #86efac !important;
-}
-
-.stError {
-    background: rgba(239, 68, 68, 0.1) !important;
-    border-left: 4px solid #ef4444 !important;
-    border-radius: 10px !important;
-    color: #fca5a5 !important;
-}
-
-.stWarning {
-    background: rgba(245, 158, 11, 0.1) !important;
-    border-left: 4px solid #f59e0b !important;
-    border-radius: 10px !important;
-    color: #fcd34d !important;
-}
-
-.stInfo {
-    background: rgba(59, 130, 246, 0.1) !important;
-    border-left: 4px solid #3b82f6 !important;
-    border-radius: 10px !important;
-    color: #93c5fd !important;
-}
-
-/* ============================================================================
-   PROFESSIONAL METRICS
-   ============================================================================ */
-[data-testid="stMetricValue"] {
-    font-family: 'Space Grotesk', sans-serif !important;
-    font-size: 2rem !important;
-    color: #3b82f6 !important;
-    font-weight: 700;
-}
-
-[data-testid="stMetricLabel"] {
-    font-family: 'Inter', sans-serif !important;
-    color: #94a3b8 !important;
-    font-weight: 500;
-    font-size: 0.875rem;
-}
-
-/* ============================================================================
-   PROFESSIONAL CONTAINERS
-   ============================================================================ */
-.professional-card {
-    background: rgba(30, 41, 59, 0.6);
-    border: 1px solid rgba(59, 130, 246, 0.15);
-    border-radius: 16px;
-    padding: 2rem;
-    margin: 1.5rem 0;
-    box-shadow: 0 4px 24px rgba(0, 0, 0, 0.2);
-    backdrop-filter: blur(10px);
-}
-
-.main-content-pro {
-    max-width: 1400px;
-    margin: 2rem auto;
-    padding: 0 2rem;
-}
-
-.page-title-pro {
-    font-family: 'Space Grotesk', sans-serif;
-    font-size: 2.5rem;
-    font-weight: 700;
-    text-align: center;
-    margin-bottom: 1rem;
-    background: linear-gradient(135deg, #3b82f6, #06b6d4);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-}
-
-.page-subtitle-pro {
-    text-align: center;
-    color: #94a3b8;
-    font-size: 1rem;
-    margin-bottom: 2.5rem;
-}
-
-/* ============================================================================
-   PAYMENT MODAL STYLES
-   ============================================================================ */
-.payment-modal {
-    background: rgba(15, 23, 42, 0.98);
-    border: 2px solid rgba(59, 130, 246, 0.3);
-    border-radius: 20px;
-    padding: 2.5rem;
-    box-shadow: 0 20px 60px rgba(0, 0, 0, 0.5);
-    max-width: 500px;
-    margin: 2rem auto;
-}
-
-.payment-header {
-    text-align: center;
-    margin-bottom: 2rem;
-}
-
-.payment-amount {
-    font-size: 3rem;
-    font-weight: 700;
-    color: #3b82f6;
-    font-family: 'Space Grotesk', sans-serif;
-}
-
-.payment-plan-name {
-    font-size: 1.5rem;
-    color: #93c5fd;
-    margin-top: 0.5rem;
-}
-
-.payment-features {
-    background: rgba(59, 130, 246, 0.1);
-    border-radius: 12px;
-    padding: 1.5rem;
-    margin: 1.5rem 0;
-}
-
-.payment-feature {
-    display: flex;
-    align-items: center;
-    gap: 0.75rem;
-    margin: 0.75rem 0;
-    color: #cbd5e1;
-}
-
-/* ============================================================================
-   FOOTER
-   ============================================================================ */
-.footer-pro {
-    text-align: center;
-    padding: 3rem 2rem 2rem;
-    margin-top: 5rem;
-    border-top: 1px solid rgba(59, 130, 246, 0.15);
-    color: #64748b;
-    font-size: 0.875rem;
-}
-
-/* ============================================================================
-   RESPONSIVE DESIGN
-   ============================================================================ */
-@media (max-width: 768px) {
-    .hero-title-pro {
-        font-size: 2.25rem;
-    }
-    
-    .hero-subtitle-pro {
-        font-size: 1rem;
-    }
-    
-    .feature-grid-pro {
-        grid-template-columns: 1fr;
-    }
-}
-
-/* ============================================================================
-   SCROLLBAR
-   ============================================================================ */
-::-webkit-scrollbar {
-    width: 10px;
-}
-
-::-webkit-scrollbar-track {
-    background: #1e293b;
-}
-
-::-webkit-scrollbar-thumb {
-    background: linear-gradient(180deg, #3b82f6, #2563eb);
-    border-radius: 5px;
-}
-
-::-webkit-scrollbar-thumb:hover {
-    background: linear-gradient(180deg, #2563eb, #1d4ed8);
-}
-</style>
-""", unsafe_allow_html=True)
+# The stylesheet is static/theme.css, served once and linked by content hash (theme.py)
+st.markdown(theme_html(st.get_option("server.enableStaticServing")), unsafe_allow_html=True)
 
 # ============================================================================
 # SESSION STATE INITIALIZATION
@@ -788,6 +64,14 @@ if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
 if 'research_results' not in st.session_state:
     st.session_state.research_results = None
+if 'research_job' not in st.session_state:
+    st.session_state.research_job = None
+if 'bulk_run' not in st.session_state:
+    st.session_state.bulk_run = None
+if 'bulk_items' not in st.session_state:
+    st.session_state.bulk_items = None
+if 'bulk_result' not in st.session_state:
+    st.session_state.bulk_result = None
 if 'show_login_modal' not in st.session_state:
     st.session_state.show_login_modal = False
 if 'show_payment_modal' not in st.session_state:
@@ -798,10 +82,47 @@ if 'payment_order' not in st.session_state:
     st.session_state.payment_order = None
 if 'feedback_submitted' not in st.session_state:
     st.session_state.feedback_submitted = False
+if 'history_cursors' not in st.session_state:
+    st.session_state.history_cursors = [None]
+if 'history_selected' not in st.session_state:
+    st.session_state.history_selected = None
+
+# ============================================================================
+# CACHED READS
+# ============================================================================
+
+# front.py re-runs top to bottom on every interaction; these reads are shared
+# across sessions and only go back to SQLite after a TTL or when db_utils
+# reports a write through register_change_hook.
+CACHE_TTL_SECONDS = 600
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, show_spinner=False)
+def cached_public_feedback(limit: int = 6) -> list:
+    return get_public_feedback(limit)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=10000, show_spinner=False)
+def cached_user_plan(user_id: int) -> str:
+    return get_user_plan(user_id)
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=10000, show_spinner=False)
+def cached_user_stats(user_id: int) -> dict:
+    return get_user_stats(user_id)
+
+def _clear_for_user(cached_func):
+    def hook(user_id):
+        if user_id is None:
+            cached_func.clear()
+        else:
+            cached_func.clear(user_id)
+    return hook
+
+register_change_hook('feedback', 'front.public_feedback', lambda user_id: cached_public_feedback.clear())
+register_change_hook('plan', 'front.user_plan', _clear_for_user(cached_user_plan))
+register_change_hook('stats', 'front.user_stats', _clear_for_user(cached_user_stats))
 
 # Sync user plan from database on login
 if st.session_state.loggedin and st.session_state.userid:
-    current_plan = get_user_plan(st.session_state.userid)
+    current_plan = cached_user_plan(st.session_state.userid)
     if current_plan != st.session_state.user_plan:
         st.session_state.user_plan = current_plan
 
@@ -811,12 +132,12 @@ if st.session_state.loggedin and st.session_state.userid:
 
 def render_professional_navbar():
     """Render professional navigation bar"""
-    st.markdown('<div style="margin-top: -2rem;"></div>', unsafe_allow_html=True)
+    st.markdown(nudge_html(), unsafe_allow_html=True)
     
     col_logo, col_space, col_signin = st.columns([3, 6, 1.2])
     
     with col_logo:
-        st.markdown('<div style="padding: 0.5rem 0;"><span style="font-size: 1.75rem;">🔍</span> <span class="logo-text">InfoFetch AI</span></div>', unsafe_allow_html=True)
+        st.markdown(logo_html(), unsafe_allow_html=True)
     
     with col_signin:
         if st.button("Sign In", key="landing_signin", use_container_width=True):
@@ -948,7 +269,7 @@ def render_customer_reviews():
     """Render beautiful customer reviews section on the landing page"""
 
     # Fetch from DB, fallback to curated defaults
-    db_reviews = get_public_feedback(6)
+    db_reviews = cached_public_feedback(6)
 
     default_reviews = [
         {
@@ -1124,9 +445,12 @@ def render_login_modal():
                         st.session_state.loggedin = True
                         st.session_state.userid = user_id
                         st.session_state.username = username
-                        st.session_state.user_plan = get_user_plan(user_id)
+                        st.session_state.user_plan = cached_user_plan(user_id)
                         st.session_state.show_login_modal = False
                         st.session_state.chat_history = get_chat_history(user_id)
+                        # Research started before a reload keeps running; show it again
+                        active_jobs = get_user_research_jobs(user_id, active_only=True, limit=1)
+                        st.session_state.research_job = active_jobs[0]['id'] if active_jobs else None
                         time.sleep(1)
                         st.rerun()
                     else:
@@ -1146,12 +470,15 @@ def render_login_modal():
 
 def render_app_navbar():
     """Render app navigation when logged in — includes Feedback tab"""
-    st.markdown('<div style="margin-top: -2rem;"></div>', unsafe_allow_html=True)
+    st.markdown(nudge_html(), unsafe_allow_html=True)
     
-    col1, col2, col3, col4, col5, col6, col7, col8, col9 = st.columns([2.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.2])
+    admin = is_admin()
+    cols = st.columns([2.0] + [1.0] * (9 if admin else 8) + [1.2])
+    col1, col2, col3, col4, col5, col6, col7, col8 = cols[:8]
+    col9, col10 = cols[-2], cols[-1]
     
     with col1:
-        st.markdown('<div style="padding: 1rem 0;"><span style="font-size: 1.9rem;">🔍</span> <span class="logo-text" style="font-size:1.8rem;">InfoFetch AI</span></div>', unsafe_allow_html=True)    
+        st.markdown(logo_html("lg"), unsafe_allow_html=True)
     with col2:
         if st.button("Research", key="nav_home", use_container_width=True):
             st.session_state.page = "Home"
@@ -1168,51 +495,55 @@ def render_app_navbar():
             st.rerun()
     
     with col5:
+        if st.button("Bulk", key="nav_bulk", use_container_width=True):
+            st.session_state.page = "Bulk"
+            st.rerun()
+
+    with col6:
         if st.button("Plans", key="nav_upgrade", use_container_width=True):
             st.session_state.page = "Upgrade"
             st.rerun()
 
-    with col6:
+    with col7:
         if st.button("Feedback", key="nav_feedback", use_container_width=True):
             st.session_state.page = "Feedback"
             st.session_state.feedback_submitted = False
             st.rerun()
     
-    with col7:
+    with col8:
         if st.button("About", key="nav_about", use_container_width=True):
             st.session_state.page = "About"
             st.rerun()
 
-    with col8:
+    if admin:
+        with cols[8]:
+            if st.button("Admin", key="nav_admin", use_container_width=True):
+                st.session_state.page = "Admin"
+                st.rerun()
+
+    with col9:
         if st.button("Logout", key="nav_logout", use_container_width=True):
             st.session_state.clear()
             st.rerun()
     
-    with col9:
-        plan_badge_color = {
-            'Free': 'rgba(100, 116, 139, 0.3)',
-            'Plus': 'rgba(245, 158, 11, 0.3)',
-            'Premium': 'rgba(168, 85, 247, 0.3)'
-        }
-        plan_text_color = {
-            'Free': '#94a3b8',
-            'Plus': '#fbbf24',
-            'Premium': '#c084fc'
-        }
-        current_plan = st.session_state.user_plan
-        st.markdown(f'<div style="padding: 0.75rem 1rem; background: {plan_badge_color.get(current_plan, "rgba(59, 130, 246, 0.15)")}; border: 1px solid rgba(59, 130, 246, 0.3); border-radius: 8px; color: {plan_text_color.get(current_plan, "#93c5fd")}; font-weight: 500; text-align: center;">👤 {st.session_state.username} ({current_plan})</div>', unsafe_allow_html=True)
+    with col10:
+        st.markdown(plan_badge_html(st.session_state.username, st.session_state.user_plan), unsafe_allow_html=True)
 
 # ============================================================================
 # APP PAGES (LOGGED IN STATE)
 # ============================================================================
 
+def current_user_stats() -> dict:
+    """Counters for the logged-in user (cached until the user's next write)"""
+    return cached_user_stats(st.session_state.userid)
+
 def home_page():
     """Research page"""
     st.markdown('<div class="main-content-pro">', unsafe_allow_html=True)
     st.markdown('<h1 class="page-title-pro">Research Hub</h1>', unsafe_allow_html=True)
     
     if st.session_state.userid:
-        stats = get_user_stats(st.session_state.userid)
+        stats = current_user_stats()
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("🔍 Total Searches", stats['total_searches'])
@@ -1222,12 +553,9 @@ def home_page():
             st.metric("⭐ Avg Confidence", stats['avg_confidence'])
         st.markdown("<div style='margin: 2rem 0;'></div>", unsafe_allow_html=True)
     
-    daily_limits = {'Free': 10, 'Plus': 100, 'Premium': 999999}
-    current_limit = daily_limits[st.session_state.user_plan]
-    
     if st.session_state.userid and st.session_state.user_plan == 'Free':
-        searches_today = get_user_stats(st.session_state.userid)['total_searches'] % current_limit
-        st.warning(f"⚠️ Free Plan: {searches_today}/{current_limit} searches used today.")
+        quota = get_search_quota(st.session_state.userid, st.session_state.user_plan)
+        st.warning(f"⚠️ Free Plan: {quota['used']}/{quota['limit']} searches used today.")
     
     st.markdown("### 🔎 Intelligent Research Engine")
     st.info("💡 **Try**: Paytm careers for freshers •")
@@ -1251,28 +579,50 @@ def home_page():
     
     if research_btn and query:
         if st.session_state.userid:
-            searches_today = get_user_stats(st.session_state.userid)['total_searches'] % current_limit
-            if searches_today >= current_limit and st.session_state.user_plan != 'Premium':
-                st.error(f"❌ Daily limit reached ({current_limit} searches). Please upgrade!")
+            quota = consume_search_quota(st.session_state.userid, st.session_state.user_plan)
+            if not quota['allowed']:
+                st.error(f"❌ Daily limit reached ({quota['limit']} searches). Please upgrade!")
             else:
-                with st.spinner("🔬 Analyzing data sources..."):
-                    result = run_research_agent(query)
-                    if save_search_history(st.session_state.userid, query, result):
-                        st.session_state.research_results = result
-                        st.success("✅ Research completed!")
-                    else:
-                        st.warning("⚠️ Research completed but not saved")
-                        st.session_state.research_results = result
+                # Runs on the jobs worker pool and is saved to history there
+                st.session_state.research_job = submit_research(st.session_state.userid, query)
+                st.session_state.research_results = None
     
-    if st.session_state.research_results:
-        result = st.session_state.research_results
-        is_company_displayed = display_company_results(result, st)
-        if not is_company_displayed:
-            display_general_results(result)
+    if st.session_state.research_job:
+        research_job_pane()
+    elif st.session_state.research_results:
+        render_research_results(st.session_state.research_results)
     
     st.markdown('</div>', unsafe_allow_html=True)
 
-def display_general_results(result):
+JOB_POLL_SECONDS = 1.0
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def research_job_pane():
+    """Live progress of the session's research job; only rendered (and polling) while one is tracked"""
+    job = poll_research_job(st.session_state.research_job, st.session_state.userid)
+    if job is not None and job['status'] in ('queued', 'running'):
+        st.info(f"{job['stage_label']} · {job['query']}")
+        # Each section appears as soon as the model has finished it
+        if job['partial']:
+            render_research_results(job['partial'], streaming=True)
+        return
+
+    st.session_state.research_job = None
+    if job is not None and job['status'] == 'done':
+        st.session_state.research_results = job['result']
+        st.toast("Research completed!", icon="✅")
+    else:
+        st.toast(f"Research failed: {job['error'] if job else 'job not found'}", icon="❌")
+    # Full rerun: the counters above change and this pane stops polling
+    st.rerun()
+
+def render_research_results(result, streaming=False):
+    """Render a (possibly still streaming) research result"""
+    is_company_displayed = display_company_results(result, st)
+    if not is_company_displayed:
+        display_general_results(result, streaming=streaming)
+
+def display_general_results(result, streaming=False):
     """Display general research results"""
     st.markdown('<div class="professional-card">', unsafe_allow_html=True)
     st.markdown("### 📊 RESEARCH RESULTS")
@@ -1298,7 +648,7 @@ def display_general_results(result):
         for i, source in enumerate(result.get('sources', [])[:10], 1):
             st.code(f"{i}. {source}", language="")
     
-    if st.session_state.user_plan in ['Plus', 'Premium']:
+    if st.session_state.user_plan in ['Plus', 'Premium'] and not streaming:
         st.download_button(
             "📥 Download JSON Report",
             data=json.dumps(result, indent=2),
@@ -1312,7 +662,23 @@ def chat_page():
     st.markdown('<div class="main-content-pro">', unsafe_allow_html=True)
     st.markdown('<h1 class="page-title-pro">💬 AI Assistant</h1>', unsafe_allow_html=True)
     st.markdown('<p class="page-subtitle-pro">Ask me anything about companies, jobs, or research</p>', unsafe_allow_html=True)
-    
+    chat_pane()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+# The chat, history and plans panes are fragments: their own buttons and
+# inputs rerun only the pane, not the navbar, stylesheet link and the rest of
+# the script. Confirmations are toasts, which outlive the rerun without sleeping.
+
+def rerun_pane():
+    """Rerun only the current fragment, or the whole app when the fragment is running inside a full run"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+@st.fragment
+def chat_pane():
+    """Messages, input and clear button"""
     if st.session_state.chat_history:
         for msg in st.session_state.chat_history[-20:]:
             if msg['role'] == 'user':
@@ -1327,30 +693,81 @@ def chat_page():
     user_input = st.chat_input("Type your message...")
     
     if user_input:
+        # Recent turns under the token budget plus the summary of older ones
+        context = load_chat_context(st.session_state.userid)
         st.session_state.chat_history.append({"role": "user", "content": user_input})
         save_chat_message(st.session_state.userid, "user", user_input)
-        with st.spinner("🤔 Thinking..."):
-            response = get_chat_response(user_input, st.session_state.chat_history)
+        with st.chat_message("user", avatar="👤"):
+            st.markdown(user_input)
+        with st.chat_message("assistant", avatar="🤖"):
+            response = st.write_stream(stream_chat_response(user_input, context['turns'], context['summary']))
+        # Persist only once the stream has completed
         st.session_state.chat_history.append({"role": "assistant", "content": response})
         save_chat_message(st.session_state.userid, "assistant", response)
-        st.rerun()
+        schedule_chat_summary(st.session_state.userid)
+        rerun_pane()
     
     if st.button("🗑️ Clear Chat History"):
         if clear_chat_history(st.session_state.userid):
             st.session_state.chat_history = []
-            st.success("Chat cleared!")
-            time.sleep(0.5)
-            st.rerun()
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+            st.toast("Chat cleared!", icon="🗑️")
+            rerun_pane()
+
+HISTORY_PAGE_SIZE = 15
+
+def render_history_details(search):
+    """Preview and actions for the open history row"""
+    with st.container(border=True):
+        st.write(f"**📅 Date:** {search['timestamp']} | **⭐ Confidence:** {search['confidence'].title()}")
+        if search['summary_preview']:
+            st.write(search['summary_preview'] + "...")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("👁️ View", key=f"view{search['id']}", use_container_width=True):
+                # The full result is only decompressed when it is opened
+                result = get_search_result(search['id'], st.session_state.userid)
+                if result is None:
+                    st.error("❌ This search is no longer available")
+                else:
+                    st.session_state.research_results = result
+                    st.session_state.page = "Home"
+                    st.rerun()
+        with col2:
+            if st.button("🔄 Re-search", key=f"re{search['id']}", use_container_width=True):
+                quota = consume_search_quota(st.session_state.userid, st.session_state.user_plan)
+                if not quota['allowed']:
+                    st.error(f"❌ Daily limit reached ({quota['limit']} searches). Please upgrade!")
+                else:
+                    # A fresh cached result is shown straight away; otherwise run it as a job
+                    cached = peek_research_cache(search['query'])
+                    if cached is not None and save_search_result(st.session_state.userid, search['query'], cached):
+                        st.session_state.research_results = cached
+                        st.toast("Served from cache", icon="⚡")
+                    else:
+                        st.session_state.research_job = submit_research(st.session_state.userid, search['query'])
+                        st.session_state.research_results = None
+                    st.session_state.history_cursors = [None]
+                    st.session_state.page = "Home"
+                    st.rerun()
+        with col3:
+            if st.button("🗑️ Delete", key=f"del{search['id']}", use_container_width=True):
+                if delete_search_item(search['id']):
+                    st.session_state.history_selected = None
+                    st.toast("Deleted!", icon="🗑️")
+                    rerun_pane()
 
 def history_page():
     """History page"""
     st.markdown('<div class="main-content-pro">', unsafe_allow_html=True)
     st.markdown('<h1 class="page-title-pro">📚 Research History</h1>', unsafe_allow_html=True)
-    
+    history_pane()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+def history_pane():
+    """Counters, the current history page and its actions"""
     if st.session_state.userid:
-        stats = get_user_stats(st.session_state.userid)
+        stats = current_user_stats()
         col1, col2, col3 = st.columns(3)
         with col1:
             st.metric("Total Searches", stats['total_searches'])
@@ -1360,40 +777,48 @@ def history_page():
             st.metric("Avg Confidence", stats['avg_confidence'])
         st.markdown("<div style='margin: 2rem 0;'></div>", unsafe_allow_html=True)
     
-    searches = get_user_history(st.session_state.userid) if st.session_state.userid else []
+    # history_cursors[i] is the keyset cursor that starts page i (None = newest)
+    cursors = st.session_state.history_cursors
+    page = get_user_history_page(st.session_state.userid, cursors[-1], HISTORY_PAGE_SIZE) if st.session_state.userid else {'items': [], 'next_cursor': None}
+    searches = page['items']
     
     if searches:
-        st.markdown("### 🔍 Recent Searches")
-        for search in searches[:15]:
-            query_type = search['result'].get('query_type', 'general')
-            query_icon = "🏢" if query_type == 'company' else "🔍"
-            with st.expander(f"{query_icon} {search['query'][:80]}... ({search['confidence'].title()})"):
-                st.write(f"**📅 Date:** {search['timestamp']} | **⭐ Confidence:** {search['confidence'].title()}")
-                if search['result'].get('summary'):
-                    st.write(search['result']['summary'][:300] + "...")
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    if st.button("👁️ View", key=f"view{search['id']}", use_container_width=True):
-                        st.session_state.research_results = search['result']
-                        st.session_state.page = "Home"
-                        st.rerun()
-                with col2:
-                    if st.button("🔄 Re-search", key=f"re{search['id']}", use_container_width=True):
-                        st.info("Copy the query to search again!")
-                with col3:
-                    if st.button("🗑️ Delete", key=f"del{search['id']}", use_container_width=True):
-                        if delete_search_item(search['id']):
-                            st.success("Deleted!")
-                            st.rerun()
+        st.markdown(f"### 🔍 Recent Searches · Page {len(cursors)}")
+        for search in searches:
+            query_icon = "🏢" if search['query_type'] == 'company' else "🔍"
+            is_open = st.session_state.history_selected == search['id']
+            label = f"{'▾' if is_open else '▸'} {query_icon} {search['query'][:80]} ({search['confidence'].title()})"
+            if st.button(label, key=f"row{search['id']}", use_container_width=True):
+                st.session_state.history_selected = None if is_open else search['id']
+                rerun_pane()
+            # Only the open row renders its preview and action buttons
+            if is_open:
+                render_history_details(search)
+        
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            if st.button("⬅️ Newer", use_container_width=True, disabled=len(cursors) == 1):
+                cursors.pop()
+                st.session_state.history_selected = None
+                rerun_pane()
+        with col3:
+            if st.button("Older ➡️", use_container_width=True, disabled=page['next_cursor'] is None):
+                cursors.append(page['next_cursor'])
+                st.session_state.history_selected = None
+                rerun_pane()
+        
         if st.button("🧹 Clear All History"):
             if clear_user_history(st.session_state.userid):
-                st.success("History cleared!")
-                time.sleep(0.5)
-                st.rerun()
+                st.session_state.history_cursors = [None]
+                st.session_state.history_selected = None
+                st.toast("History cleared!", icon="🧹")
+                rerun_pane()
+    elif len(cursors) > 1:
+        # The last entries on this page were deleted; step back
+        cursors.pop()
+        st.rerun()
     else:
         st.info("🚀 No search history yet! Try the Research feature.")
-    
-    st.markdown('</div>', unsafe_allow_html=True)
 
 
 # ============================================================================
@@ -1669,13 +1094,13 @@ def render_payment_modal(plan_name: str, amount: int, display_amount: str):
             if order:
                 st.session_state.payment_order = order
                 create_payment_order(st.session_state.userid, plan_name, amount, order['order_id'])
-                st.rerun()
+                rerun_pane()
             else:
                 st.error("❌ Payment system unavailable. Please contact support.")
         if st.button("← Back to Plans", key="back_to_plans", use_container_width=True):
             st.session_state.show_payment_modal = False
             st.session_state.selected_plan = None
-            st.rerun()
+            rerun_pane()
 
 def render_razorpay_checkout():
     order = st.session_state.payment_order
@@ -1717,25 +1142,30 @@ def render_razorpay_checkout():
             st.session_state.user_plan = order['plan_name']
             st.session_state.show_payment_modal = False
             st.session_state.payment_order = None
-            st.success(f"🎉 Successfully upgraded to {order['plan_name']}!")
-            time.sleep(2)
+            st.toast(f"Successfully upgraded to {order['plan_name']}!", icon="🎉")
+            # The plan badge lives in the navbar, outside the fragment
             st.rerun()
         if st.button("❌ Cancel Payment", key="cancel_payment", use_container_width=True):
             st.session_state.show_payment_modal = False
             st.session_state.payment_order = None
-            st.rerun()
+            rerun_pane()
 
 def upgrade_page():
     st.markdown('<div class="main-content-pro">', unsafe_allow_html=True)
     st.markdown('<h1 class="page-title-pro">⭐ Choose Your Plan</h1>', unsafe_allow_html=True)
     st.markdown('<p class="page-subtitle-pro">Select the perfect plan for your research needs</p>', unsafe_allow_html=True)
+    plans_pane()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+@st.fragment
+def plans_pane():
+    """Plan cards and the checkout steps"""
     if st.session_state.show_payment_modal and st.session_state.selected_plan:
         if st.session_state.payment_order:
             render_razorpay_checkout()
         else:
             plan_info = PLAN_PRICING[st.session_state.selected_plan]
             render_payment_modal(st.session_state.selected_plan, plan_info['amount'], plan_info['display'])
-        st.markdown('</div>', unsafe_allow_html=True)
         return
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
@@ -1752,17 +1182,17 @@ def upgrade_page():
             if st.button("Switch to Free", key="free_btn", use_container_width=True):
                 update_user_plan(st.session_state.userid, 'Free')
                 st.session_state.user_plan = 'Free'
-                st.success("✅ Switched to Free plan!")
-                time.sleep(0.5); st.rerun()
+                st.toast("Switched to Free plan!", icon="✅")
+                st.rerun()
     with col2:
         st.markdown("### ⭐ Plus"); st.markdown("#### ₹19/mo"); st.markdown("_Most Popular_")
         st.markdown("✓ 100 searches per day\n✓ Advanced insights\n✓ Priority response\n✓ Export to PDF/Excel")
         if st.session_state.user_plan == 'Plus':
             st.button("✓ Current Plan", key="plus_current", use_container_width=True, disabled=True)
         else:
-            if RAZORPAY_AVAILABLE:
+            if razorpay_available():
                 if st.button("💳 Upgrade to Plus", key="plus_btn", use_container_width=True, type="primary"):
-                    st.session_state.selected_plan = 'Plus'; st.session_state.show_payment_modal = True; st.rerun()
+                    st.session_state.selected_plan = 'Plus'; st.session_state.show_payment_modal = True; rerun_pane()
             else:
                 st.warning("⚠️ Payment system unavailable"); st.info("Contact: support@infofetch.ai")
     with col3:
@@ -1771,9 +1201,9 @@ def upgrade_page():
         if st.session_state.user_plan == 'Premium':
             st.button("✓ Current Plan", key="premium_current", use_container_width=True, disabled=True)
         else:
-            if RAZORPAY_AVAILABLE:
+            if razorpay_available():
                 if st.button("💳 Upgrade to Premium", key="premium_btn", use_container_width=True, type="primary"):
-                    st.session_state.selected_plan = 'Premium'; st.session_state.show_payment_modal = True; st.rerun()
+                    st.session_state.selected_plan = 'Premium'; st.session_state.show_payment_modal = True; rerun_pane()
             else:
                 st.warning("⚠️ Payment system unavailable"); st.info("Contact: support@infofetch.ai")
     st.success("💯 **30-Day Money-Back Guarantee** • Cancel anytime • Secure Payment via Razorpay")
@@ -1786,8 +1216,178 @@ def upgrade_page():
                 st.markdown(f"{status_emoji} **{payment['plan']}** - {payment['currency']} {payment['amount']/100:.2f} - {payment['created']}")
         else:
             st.info("No payment history yet")
+
+# ============================================================================
+# BULK RESEARCH PAGE
+# ============================================================================
+
+def bulk_page():
+    st.markdown('<div class="main-content-pro">', unsafe_allow_html=True)
+    st.markdown('<h1 class="page-title-pro">📦 Bulk Research</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle-pro">Upload a list of companies or topics and research them in one go</p>', unsafe_allow_html=True)
+
+    if st.session_state.bulk_result is not None:
+        bulk_results_view()
+    elif st.session_state.bulk_run is None:
+        uploaded = st.file_uploader("CSV, NDJSON or one query per line", type=["csv", "ndjson", "jsonl", "txt"])
+        pasted = st.text_area("…or paste queries, one per line", height=150)
+        if uploaded is not None:
+            queries = read_queries(uploaded.getvalue().decode("utf-8", errors="replace"), uploaded.name)
+        else:
+            queries = read_queries(pasted)
+
+        if queries:
+            items = plan_bulk(queries)
+            companies = sum(1 for item in items if item['type'] == 'company')
+            st.info(f"📋 {len(queries)} queries → {len(items)} unique ({companies} companies, "
+                    f"{len(items) - companies} topics). Each unique query uses one search from your daily quota.")
+            if st.button("🚀 Start Bulk Research", type="primary"):
+                user_id, plan = st.session_state.userid, st.session_state.user_plan
+                checkpoint = checkpoint_path_for(items, prefix=f"user{user_id}")
+                st.session_state.bulk_items = items
+                st.session_state.bulk_run = start_bulk_run(
+                    items, checkpoint,
+                    allow_next=lambda item: consume_search_quota(user_id, plan)['allowed']
+                )
+                st.rerun()
+    else:
+        bulk_progress_pane()
+
     st.markdown('</div>', unsafe_allow_html=True)
 
+def _bulk_rows_table(rows: list):
+    if rows:
+        st.dataframe([{k: row[k] for k in ('status', 'query', 'title', 'confidence', 'seconds')} for row in rows],
+                     use_container_width=True, hide_index=True)
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def bulk_progress_pane():
+    """Per-row progress of the session's bulk run; hands over to bulk_results_view once it finishes"""
+    run = get_bulk_run(st.session_state.bulk_run)
+    if run is None:
+        st.session_state.bulk_run = None
+        st.rerun()
+
+    if run['finished']:
+        # Build the exports once; the results view does not poll
+        summary = run['summary'] or {}
+        exports = {}
+        if not summary.get('error'):
+            items = st.session_state.bulk_items
+            exports = {fmt: export_results(items, summary['checkpoint'], fmt) for fmt in ('ndjson', 'csv')}
+        st.session_state.bulk_result = {'summary': summary, 'rows': run['rows'], 'exports': exports}
+        st.session_state.bulk_run = None
+        st.rerun()
+
+    st.progress(run['finished_count'] / max(run['total'], 1),
+                text=f"{run['finished_count']}/{run['total']} researched")
+    _bulk_rows_table(run['rows'])
+
+def bulk_results_view():
+    """Summary, per-row table and downloads of the session's finished bulk run"""
+    result = st.session_state.bulk_result
+    summary = result['summary']
+    if summary.get('error'):
+        st.error(f"❌ Bulk run stopped: {summary['error']}")
+    else:
+        st.success(f"✅ {summary['done']}/{summary['total']} done · {summary['failed']} failed · "
+                   f"{summary['skipped']} skipped · {summary['per_minute']} queries/min")
+    _bulk_rows_table(result['rows'])
+    if result['exports']:
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📥 Download NDJSON", data=result['exports']['ndjson'],
+                               file_name="bulk_research.ndjson", mime="application/x-ndjson", use_container_width=True)
+        with col2:
+            st.download_button("📥 Download CSV", data=result['exports']['csv'],
+                               file_name="bulk_research.csv", mime="text/csv", use_container_width=True)
+    if st.button("🔁 New Bulk Run"):
+        st.session_state.bulk_result = None
+        st.session_state.bulk_items = None
+        st.rerun()
+
+# ============================================================================
+# ADMIN PAGE (PIPELINE METRICS)
+# ============================================================================
+
+# Usernames that see the Admin page
+# No admins unless configured: the built-in demo account must not see metrics and traces
+ADMIN_USERNAMES = {name.strip() for name in os.getenv("ADMIN_USERNAMES", "").split(",") if name.strip()}
+ADMIN_REFRESH_SECONDS = 5.0
+LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR"]
+
+def is_admin() -> bool:
+    return st.session_state.loggedin and st.session_state.username in ADMIN_USERNAMES
+
+def admin_page():
+    st.markdown('<div class="main-content-pro">', unsafe_allow_html=True)
+    st.markdown('<h1 class="page-title-pro">🛠️ Admin</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle-pro">Latency per pipeline stage, upstream limits and recent traces</p>', unsafe_allow_html=True)
+
+    if not is_admin():
+        st.error("❌ Admins only.")
+        st.markdown('</div>', unsafe_allow_html=True)
+        return
+
+    current = get_log_level()
+    level = st.selectbox("Log level", LOG_LEVELS, index=LOG_LEVELS.index(current) if current in LOG_LEVELS else 1)
+    if level != current:
+        set_log_level(level)
+        st.toast(f"Log level set to {level}")
+
+    admin_metrics_pane()
+    st.markdown('</div>', unsafe_allow_html=True)
+
+def _admin_export_sections() -> dict:
+    return {
+        'rate_limits': rate_limit_stats(),
+        'coalescing': coalescing_stats(),
+        'caches': {'search': search_cache.stats(), 'research': research_cache.stats()},
+    }
+
+@st.fragment(run_every=ADMIN_REFRESH_SECONDS)
+def admin_metrics_pane():
+    snapshot = metrics_snapshot()
+    extra = _admin_export_sections()
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("In flight", snapshot['in_flight'])
+    col2.metric("Research runs", snapshot['stages'].get('research', {}).get('count', 0))
+    col3.metric("Uptime", f"{snapshot['uptime_seconds'] // 60} min")
+
+    st.subheader("⏱️ Stages")
+    if snapshot['stages']:
+        st.dataframe([dict(stage=stage, **stats) for stage, stats in snapshot['stages'].items()],
+                     use_container_width=True, hide_index=True)
+    else:
+        st.info("No spans recorded yet.")
+
+    st.subheader("🚦 Upstream rate limits")
+    limits = extra['rate_limits']
+    if limits:
+        st.dataframe([{k: v for k, v in dict(upstream=name, **stats).items() if k != 'lanes'}
+                      for name, stats in limits.items()], use_container_width=True, hide_index=True)
+    else:
+        st.info("No upstream calls yet.")
+
+    st.subheader("🔗 Coalescing and caches")
+    st.dataframe([dict(name=f"{name} single-flight", **stats) for name, stats in extra['coalescing'].items()],
+                 use_container_width=True, hide_index=True)
+    st.dataframe([dict(name=f"{name} cache", **stats) for name, stats in extra['caches'].items()],
+                 use_container_width=True, hide_index=True)
+
+    st.subheader("🧵 Recent traces")
+    for trace in recent_traces(limit=10):
+        marker = "❌" if trace['error'] else "✅"
+        with st.expander(f"{marker} {trace['root']} · {trace['ms']} ms · {trace['started']}"):
+            st.dataframe([{'stage': e['stage'], 'parent': e['parent'], 'start_ms': e['offset_ms'], 'ms': e['ms'],
+                           'error': e['error'], 'attrs': json.dumps(e['attrs'], default=str)}
+                          for e in trace['spans']], use_container_width=True, hide_index=True)
+
+    st.download_button("📥 Export metrics (JSON)", data=export_metrics(extra),
+                       file_name=f"infofetch_metrics_{datetime.now():%Y%m%d_%H%M%S}.json",
+                       mime="application/json")
+
 def about_page():
     st.markdown('<div class="main-content-pro">', unsafe_allow_html=True)
     st.markdown('<h1 class="page-title-pro">ℹ️ About InfoFetch AI</h1>', unsafe_allow_html=True)
@@ -1826,7 +1426,7 @@ if st.session_state.show_login_modal:
 elif st.session_state.loggedin:
     st.markdown('<style>div.block-container{padding-top:0rem;}</style>', unsafe_allow_html=True)
     render_app_navbar()
-    st.markdown("<div style='margin-top: -3rem;'></div>", unsafe_allow_html=True)
+    st.markdown(nudge_html(large=True), unsafe_allow_html=True)
 
     if st.session_state.page == "Chat":
         chat_page()
@@ -1834,6 +1434,10 @@ elif st.session_state.loggedin:
         history_page()
     elif st.session_state.page == "Upgrade":
         upgrade_page()
+    elif st.session_state.page == "Bulk":
+        bulk_page()
+    elif st.session_state.page == "Admin":
+        admin_page()
     elif st.session_state.page == "About":
         about_page()
     elif st.session_state.page == "Feedback":
@@ -1844,20 +1448,17 @@ elif st.session_state.loggedin:
 else:
     st.markdown('<style>div.block-container{padding-top:0rem;}</style>', unsafe_allow_html=True)
     render_professional_navbar()
-    st.markdown('<div style="margin-top: -3rem;"></div>', unsafe_allow_html=True)
+    st.markdown(nudge_html(large=True), unsafe_allow_html=True)
     render_professional_hero()
     render_professional_features()
     render_professional_stats()
     render_customer_reviews()
 
-    st.markdown("""
+    st.markdown(f"""
     <div class="footer-pro">
-        <div style="margin-bottom: 1rem;">
-            <span style="font-size: 1.5rem;">🔍</span>
-            <span class="logo-text">InfoFetch AI</span>
-        </div>
+        {logo_html("footer")}
         <p>© 2026 InfoFetch AI. Enterprise Research Platform.</p>
-        <p style="margin-top: 0.5rem; color: #475569;">
+        <p class="footer-credits">
             Powered by OpenAI • SerpAPI • Streamlit • Razorpay
         </p>
     </div>
@@ -0,0 +1,430 @@
+"""
+Company gazetteer for InfoFetch AI
+
+Maps company names and aliases ("hcl tech", "tata consultancy services",
+"infosis") to one canonical company id. The index is a single binary file
+of fixed-size records sorted by key, searched in place through mmap, so a
+100k+ name gazetteer costs no load time and only the pages a lookup
+touches stay resident.
+
+Lookups:
+  - exact:  whole-word longest match of any alias inside the query, walking
+            the sorted keys like a trie (a word is only appended while some
+            alias still starts with the phrase so far)
+  - fuzzy:  edit distance <= 1 through a symmetric-delete index (every
+            one-word alias and each of its one-character deletions, also
+            sorted on disk)
+
+Build a large gazetteer from a TSV of "id<TAB>name<TAB>alias|alias|...":
+    python gazetteer.py build companies.tsv infofetch_gazetteer.bin
+and point GAZETTEER_PATH at the output. Without it the seed list below is
+used. `python gazetteer.py bench` times lookups on a synthetic 100k index.
+"""
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from telemetry import get_logger
+
+log = get_logger("gazetteer")
+
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", "infofetch_gazetteer.bin")
+
+# Fuzzy matching is only tried on words at least this long, so ordinary
+# words one edit away from a short company name ("apply" / "apple") are left alone
+FUZZY_MIN_LENGTH = 6
+# Longest alias, in words, considered when scanning a query
+MAX_ALIAS_WORDS = 6
+
+# Canonical id -> extra aliases; every KNOWN_COMPANIES entry is added as well
+SEED_ALIASES = {
+    'google': ['alphabet', 'google llc'],
+    'meta': ['facebook', 'meta platforms'],
+    'amazon': ['aws', 'amazon web services', 'amazon com'],
+    'microsoft': ['msft', 'microsoft corporation'],
+    'ibm': ['international business machines'],
+    'jpmorgan': ['jp morgan', 'jpmorgan', 'jp morgan chase', 'jpmorgan chase'],
+    'goldmansachs': ['goldman sachs', 'goldman'],
+    'xcorp': ['x corp', 'twitter'],
+    'tcs': ['tata consultancy services', 'tata consultancy'],
+    'hcltech': ['hcl', 'hcl tech', 'hcltech', 'hcl technologies'],
+    'techmahindra': ['tech mahindra'],
+    'ltimindtree': ['ltimindtree', 'lti mindtree', 'mindtree'],
+    'byju': ['byju', 'byjus', "byju's"],
+    'phonepe': ['phone pe'],
+    'hp': ['hewlett packard', 'hpe', 'hewlett packard enterprise'],
+    'capgemini': ['capgemini'],
+    'zoho': ['zoho', 'zoho corporation'],
+    'freshworks': ['freshworks', 'freshdesk'],
+    'zerodha': ['zerodha'],
+    'razorpay': ['razorpay'],
+    'nykaa': ['nykaa'],
+    'meesho': ['meesho'],
+    'hdfcbank': ['hdfc bank', 'hdfc'],
+    'icicibank': ['icici bank', 'icici'],
+    'relianceindustries': ['reliance industries', 'reliance jio'],
+    'kpmg': ['kpmg'],
+    'pwc': ['pwc', 'pricewaterhousecoopers'],
+    'ey': ['ernst and young', 'ernst & young', 'ernst young'],
+}
+
+SEED_NAMES = {
+    'jpmorgan': 'JP Morgan', 'goldmansachs': 'Goldman Sachs', 'xcorp': 'X Corp',
+    'tcs': 'TCS', 'ibm': 'IBM', 'hp': 'HP', 'hcltech': 'HCLTech',
+    'techmahindra': 'Tech Mahindra', 'ltimindtree': 'LTIMindtree', 'hdfcbank': 'HDFC Bank',
+    'icicibank': 'ICICI Bank', 'relianceindustries': 'Reliance Industries',
+    'kpmg': 'KPMG', 'pwc': 'PwC', 'ey': 'EY',
+}
+
+# Words that are never fuzzy-matched to a company
+FUZZY_STOPWORDS = {
+    'company', 'companies', 'career', 'careers', 'salary', 'salaries', 'hiring', 'openings',
+    'interview', 'internship', 'fresher', 'freshers', 'graduate', 'placement', 'employer',
+    'employees', 'revenue', 'industry', 'headquarters', 'founded', 'contact', 'address',
+    'office', 'location', 'culture', 'benefits', 'startup', 'engineer', 'engineers',
+    'developer', 'developers', 'analyst', 'manager', 'remote', 'latest', 'update', 'updates',
+    'trends', 'review', 'reviews', 'details', 'information', 'people', 'about', 'which',
+    'where', 'there', 'their', 'should', 'compare', 'between', 'market', 'markets', 'report',
+    'today', 'research', 'overview', 'technology', 'technologies', 'services', 'solutions',
+    # Everyday words one edit away from a seed alias
+    'tomato', 'striped', 'stripes', 'strike', 'strive', 'squares', 'squared', 'squire',
+    'apples', 'applet', 'oracles', 'slacks', 'goggle', 'googly', 'amazons', 'adobes',
+    'twitters', 'intels', 'teslas', 'paypals',
+}
+
+# ============================================================================
+# FILE FORMAT
+# ============================================================================
+
+MAGIC = b"IFGZ"
+VERSION = 1
+# magic, version, entity/alias/delete counts, section offsets
+HEADER = struct.Struct("<4sHxxIIIIIII")
+ENTITY = struct.Struct("<IHIH")     # id offset/len, display name offset/len
+ALIAS = struct.Struct("<IHI")       # key offset/len, entity index
+DELETE = struct.Struct("<IHI")      # key offset/len, alias index
+
+def normalize_name(text: str) -> str:
+    """Lower-case, apostrophes dropped, any other punctuation run becomes one space"""
+    text = str(text).lower().replace("'", "").replace("’", "")
+    return re.sub(r'[^a-z0-9&]+', ' ', text).strip()
+
+def company_slug(text: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '', str(text).lower())
+
+def _deletes(word: str) -> set:
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def build_index(entries: Iterable[Tuple[str, str, List[str]]]) -> bytes:
+    """Serialize (canonical_id, display_name, aliases) entries into the on-disk format"""
+    pool = bytearray()
+    offsets = {}
+
+    def intern(text: str) -> Tuple[int, int]:
+        data = text.encode('utf-8')
+        if data not in offsets:
+            offsets[data] = len(pool)
+            pool.extend(data)
+        return offsets[data], len(data)
+
+    entities = []
+    entity_index = {}
+    alias_to_entity = {}
+    for canonical_id, name, aliases in entries:
+        if canonical_id not in entity_index:
+            entity_index[canonical_id] = len(entities)
+            entities.append((canonical_id, name))
+        for alias in [name] + list(aliases):
+            key = normalize_name(alias)
+            # First entry wins for an alias shared by two companies
+            if key and key not in alias_to_entity:
+                alias_to_entity[key] = entity_index[canonical_id]
+
+    alias_keys = sorted(alias_to_entity, key=lambda k: k.encode('utf-8'))
+    deletes = {}
+    for alias_idx, key in enumerate(alias_keys):
+        # resolve() fuzzy-matches single query words, so only one-word aliases are indexed
+        if len(key) >= FUZZY_MIN_LENGTH and ' ' not in key:
+            for variant in _deletes(key):
+                deletes.setdefault(variant, []).append(alias_idx)
+    delete_keys = sorted(deletes, key=lambda k: k.encode('utf-8'))
+
+    entity_records = bytearray()
+    for canonical_id, name in entities:
+        entity_records += ENTITY.pack(*intern(canonical_id), *intern(name))
+    alias_records = bytearray()
+    for key in alias_keys:
+        alias_records += ALIAS.pack(*intern(key), alias_to_entity[key])
+    delete_records = bytearray()
+    for key in delete_keys:
+        for alias_idx in deletes[key]:
+            delete_records += DELETE.pack(*intern(key), alias_idx)
+    delete_count = len(delete_records) // DELETE.size
+
+    entities_off = HEADER.size
+    aliases_off = entities_off + len(entity_records)
+    deletes_off = aliases_off + len(alias_records)
+    strings_off = deletes_off + len(delete_records)
+    header = HEADER.pack(MAGIC, VERSION, len(entities), len(alias_keys), delete_count,
+                         entities_off, aliases_off, deletes_off, strings_off)
+    return bytes(header + entity_records + alias_records + delete_records + pool)
+
+def seed_entries() -> List[Tuple[str, str, List[str]]]:
+    """KNOWN_COMPANIES plus SEED_ALIASES as builder entries"""
+    from query_classifier import KNOWN_COMPANIES
+
+    entries = {}
+    for company in KNOWN_COMPANIES:
+        canonical_id = next((cid for cid, aliases in SEED_ALIASES.items() if company in aliases), company_slug(company))
+        entries.setdefault(canonical_id, set()).add(company)
+    for canonical_id, aliases in SEED_ALIASES.items():
+        entries.setdefault(canonical_id, set()).update(aliases)
+    return [
+        (canonical_id, SEED_NAMES.get(canonical_id, canonical_id.title()), sorted(aliases))
+        for canonical_id, aliases in entries.items()
+    ]
+
+def read_tsv(path: str) -> Iterable[Tuple[str, str, List[str]]]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) < 2 or not parts[0] or line.startswith('#'):
+                continue
+            aliases = [a for a in parts[2].split('|') if a] if len(parts) > 2 else []
+            yield parts[0], parts[1], aliases
+
+def build_gazetteer_file(tsv_path: str, out_path: str) -> Dict:
+    """Build the index from a TSV (seed entries included) and write it atomically"""
+    started = time.perf_counter()
+    data = build_index(list(seed_entries()) + list(read_tsv(tsv_path)))
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    gazetteer = Gazetteer(data)
+    return {
+        'entities': gazetteer.entity_count,
+        'aliases': gazetteer.alias_count,
+        'bytes': len(data),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+def _within_one_edit(a: str, b: str) -> int:
+    """Edit distance if it is 0 or 1, otherwise 2"""
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > 1:
+        return 2
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return 1 if a[i + 1:] == b[i + 1:] else 2
+    return 1 if a[i:] == b[i + 1:] else 2
+
+
+class Gazetteer:
+    """Read-only view over a built index (bytes or an mmap)"""
+
+    def __init__(self, buffer, source: str = "seed"):
+        self.buf = buffer
+        self.source = source
+        magic, version, self.entity_count, self.alias_count, self.delete_count, \
+            self.entities_off, self.aliases_off, self.deletes_off, self.strings_off = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a gazetteer index: {source}")
+
+    @classmethod
+    def from_file(cls, path: str) -> "Gazetteer":
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, source=path)
+
+    def _string(self, offset: int, length: int) -> bytes:
+        start = self.strings_off + offset
+        return self.buf[start:start + length]
+
+    def _alias_key(self, index: int) -> bytes:
+        offset, length, _ = ALIAS.unpack_from(self.buf, self.aliases_off + index * ALIAS.size)
+        return self._string(offset, length)
+
+    def _delete_key(self, index: int) -> bytes:
+        offset, length, _ = DELETE.unpack_from(self.buf, self.deletes_off + index * DELETE.size)
+        return self._string(offset, length)
+
+    def _lower_bound(self, key: bytes, count: int, key_at) -> int:
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _entity(self, alias_index: int, match: str, distance: int = 0) -> Dict:
+        key_off, key_len, entity_index = ALIAS.unpack_from(self.buf, self.aliases_off + alias_index * ALIAS.size)
+        id_off, id_len, name_off, name_len = ENTITY.unpack_from(self.buf, self.entities_off + entity_index * ENTITY.size)
+        return {
+            'id': self._string(id_off, id_len).decode('utf-8'),
+            'name': self._string(name_off, name_len).decode('utf-8'),
+            'alias': self._string(key_off, key_len).decode('utf-8'),
+            'match': match,
+            'distance': distance,
+        }
+
+    def _find_alias(self, key: str) -> Tuple[Optional[int], bool]:
+        """(alias index if key is an alias, whether any longer alias starts with key + ' ')"""
+        data = key.encode('utf-8')
+        index = self._lower_bound(data, self.alias_count, self._alias_key)
+        exact = index < self.alias_count and self._alias_key(index) == data
+        # Keys only contain [a-z0-9& ] and ' ' sorts first, so any "key ..."
+        # alias sits immediately after key itself
+        following = index + 1 if exact else index
+        extends = following < self.alias_count and self._alias_key(following).startswith(data + b' ')
+        return (index if exact else None), extends
+
+    def lookup(self, name: str) -> Optional[Dict]:
+        """Exact alias lookup for a whole name"""
+        key = normalize_name(name)
+        if not key:
+            return None
+        index, _ = self._find_alias(key)
+        return self._entity(index, 'exact') if index is not None else None
+
+    def find_in_text(self, text: str) -> Optional[Dict]:
+        """Longest whole-word alias occurring in text (earliest on ties)"""
+        words = normalize_name(text).split()
+        best = None
+        best_len = 0
+        for start in range(len(words)):
+            phrase = words[start]
+            for end in range(start, min(len(words), start + MAX_ALIAS_WORDS)):
+                if end > start:
+                    phrase = f"{phrase} {words[end]}"
+                index, extends = self._find_alias(phrase)
+                if index is not None and end - start + 1 > best_len:
+                    best, best_len = index, end - start + 1
+                if not extends:
+                    break
+        return self._entity(best, 'exact') if best is not None else None
+
+    def fuzzy_lookup(self, term: str) -> Optional[Dict]:
+        """Closest one-word alias within one edit of term (length >= FUZZY_MIN_LENGTH)"""
+        key = normalize_name(term)
+        if len(key) < FUZZY_MIN_LENGTH or key in FUZZY_STOPWORDS:
+            return None
+        best = None
+        for variant in _deletes(key):
+            data = variant.encode('utf-8')
+            index = self._lower_bound(data, self.delete_count, self._delete_key)
+            while index < self.delete_count and self._delete_key(index) == data:
+                _, _, alias_index = DELETE.unpack_from(self.buf, self.deletes_off + index * DELETE.size)
+                distance = _within_one_edit(key, self._alias_key(alias_index).decode('utf-8'))
+                if distance <= 1 and (best is None or (distance, alias_index) < best):
+                    best = (distance, alias_index)
+                index += 1
+        return self._entity(best[1], 'fuzzy', best[0]) if best is not None else None
+
+    def resolve(self, text: str, fuzzy: bool = True) -> Optional[Dict]:
+        """Exact longest match in text, else the first word that fuzzy-matches an alias"""
+        entity = self.find_in_text(text)
+        if entity is not None or not fuzzy:
+            return entity
+        for word in normalize_name(text).split():
+            entity = self.fuzzy_lookup(word)
+            if entity is not None:
+                return entity
+        return None
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer() -> Gazetteer:
+    """The process-wide gazetteer: GAZETTEER_PATH if it exists, else the seed list"""
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                try:
+                    if os.path.exists(GAZETTEER_PATH):
+                        _gazetteer = Gazetteer.from_file(GAZETTEER_PATH)
+                        log.info(f"📇 Gazetteer loaded: {_gazetteer.alias_count:,} aliases from {GAZETTEER_PATH}")
+                except (OSError, ValueError, struct.error) as e:
+                    log.warning(f"⚠️ Gazetteer file unusable, using seed list: {e}")
+                if _gazetteer is None:
+                    _gazetteer = Gazetteer(build_index(seed_entries()))
+    return _gazetteer
+
+def canonical_company_id(name: str) -> str:
+    """Gazetteer id for a company name, or a slug of the name if it is unknown"""
+    entity = get_gazetteer().lookup(name)
+    return entity['id'] if entity else company_slug(name)
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def _synthetic_entries(count: int):
+    import random
+    rng = random.Random(11)
+    syllables = ["ka", "zo", "ri", "ven", "tor", "lex", "mi", "qu", "an", "dra", "sol", "nex", "tri", "vo", "ber", "lin"]
+    suffixes = ["", " labs", " technologies", " systems", " finance", " health", " foods", " motors"]
+    for i in range(count):
+        base = ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        name = f"{base}{i}{rng.choice(suffixes)}"
+        yield f"syn{i}", name.title(), [base + str(i)]
+
+def benchmark(count: int = 100_000, lookups: int = 2000):
+    import tempfile
+    started = time.perf_counter()
+    data = build_index(list(seed_entries()) + list(_synthetic_entries(count)))
+    build_seconds = time.perf_counter() - started
+    path = os.path.join(tempfile.mkdtemp(prefix="infofetch_gaz_"), "bench.bin")
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    started = time.perf_counter()
+    gazetteer = Gazetteer.from_file(path)
+    open_ms = (time.perf_counter() - started) * 1000
+    print(f"\n📇 {gazetteer.entity_count:,} entities, {gazetteer.alias_count:,} aliases, "
+          f"{gazetteer.delete_count:,} delete keys, {len(data) / 1e6:.1f} MB "
+          f"(built in {build_seconds:.1f}s, opened in {open_ms:.2f} ms)")
+
+    samples = [
+        ("exact", "hcl tech jobs for freshers", gazetteer.resolve),
+        ("exact (synthetic)", "careers at " + next(_synthetic_entries(count))[1], gazetteer.resolve),
+        ("fuzzy", "infosis careers", gazetteer.resolve),
+        ("miss", "latest trends in generative ai for healthcare", gazetteer.resolve),
+    ]
+    for label, query, fn in samples:
+        result = fn(query)
+        started = time.perf_counter()
+        for _ in range(lookups):
+            fn(query)
+        us = (time.perf_counter() - started) * 1e6 / lookups
+        found = f"{result['name']} ({result['id']}, {result['match']})" if result else "no match"
+        print(f"   {label:18s} {us:8.1f} µs  {query!r} → {found}")
+    print()
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == "build":
+        stats = build_gazetteer_file(sys.argv[2], sys.argv[3])
+        print(f"✅ Built {sys.argv[3]}: {stats['entities']:,} entities, {stats['aliases']:,} aliases, "
+              f"{stats['bytes'] / 1e6:.1f} MB in {stats['seconds']}s")
+    elif len(sys.argv) >= 2 and sys.argv[1] == "bench":
+        benchmark(int(sys.argv[2]) if len(sys.argv) > 2 else 100_000)
+    else:
+        print(__doc__)
@@ -0,0 +1,137 @@
+"""
+Background research jobs for InfoFetch AI
+
+Research (searches plus an LLM call, often 20-60s) runs on a bounded worker
+pool instead of the Streamlit script thread. Each job is a research_jobs
+row; the finished result is saved to the user's history by the worker, so
+it is kept even if no session is watching any more.
+
+    job_id = submit_research(user_id, query)
+    poll_research_job(job_id, user_id)          # status, stage, partial / final result
+    wait_for_research_update(job_id, version)   # block until the job changes (subscribe)
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from db_utils import (
+    create_research_job, update_research_job, get_research_job,
+    get_unfinished_research_jobs, get_search_result, save_search_result, release_search_quota
+)
+from serp import stream_research_agent
+from telemetry import get_logger, traced
+
+log = get_logger("jobs")
+
+# Concurrent research pipelines per process; each also fans out onto
+# serp.search_executors, so this mostly bounds concurrent LLM calls.
+RESEARCH_WORKERS = int(os.getenv("RESEARCH_WORKERS", "4"))
+
+research_executor = ThreadPoolExecutor(max_workers=RESEARCH_WORKERS, thread_name_prefix="research-job")
+
+# In-memory view of running jobs: the latest streamed partial result and a
+# version counter bumped on every change. The database holds the durable state.
+_live: Dict[int, Dict] = {}
+_live_changed = threading.Condition()
+
+STAGE_LABELS = {
+    'queued': "⏳ Waiting for a research worker...",
+    'searching': "🔎 Searching the web...",
+    'analyzing': "🤖 Analyzing sources...",
+    'saving': "💾 Saving results...",
+}
+
+def _publish(job_id: int, **changes):
+    with _live_changed:
+        state = _live.setdefault(job_id, {'version': 0, 'partial': None, 'stage': 'queued'})
+        state.update(changes)
+        state['version'] += 1
+        _live_changed.notify_all()
+
+@traced('research_job')
+def _run_job(job_id: int, user_id: int, query: str):
+    update_research_job(job_id, status='running', stage='searching')
+    _publish(job_id, stage='searching')
+    try:
+        result = None
+        for count, result in enumerate(stream_research_agent(query)):
+            # The first item is yielded before the searches run, later ones
+            # as the LLM completes each field
+            if count == 1:
+                update_research_job(job_id, stage='analyzing')
+                _publish(job_id, stage='analyzing', partial=result)
+            else:
+                _publish(job_id, partial=result)
+
+        update_research_job(job_id, stage='saving')
+        _publish(job_id, stage='saving')
+        search_id = save_search_result(user_id, query, result) if result else None
+        if search_id is None:
+            update_research_job(job_id, status='failed', stage='', error="Result could not be saved")
+            # Only saved searches count towards the daily limit
+            release_search_quota(user_id)
+        else:
+            update_research_job(job_id, status='done', stage='', search_id=search_id)
+            log.info(f"✅ Research job {job_id} done (search {search_id})")
+    except Exception as e:
+        log.error(f"❌ Research job {job_id} failed: {e}")
+        update_research_job(job_id, status='failed', stage='', error=str(e))
+        release_search_quota(user_id)
+    finally:
+        # Watchers read the final state from the database from here on
+        with _live_changed:
+            state = _live.pop(job_id, None)
+            if state is not None:
+                _live_changed.notify_all()
+
+def submit_research(user_id: int, query: str) -> int:
+    """Queue a research run for the user; returns the job id"""
+    job_id = create_research_job(user_id, query)
+    _publish(job_id, stage='queued')
+    research_executor.submit(_run_job, job_id, user_id, query)
+    log.info(f"📥 Research job {job_id} queued: {query}")
+    return job_id
+
+def poll_research_job(job_id: int, user_id: Optional[int] = None) -> Optional[Dict]:
+    """
+    Current state of a job: the research_jobs row plus 'version', 'partial'
+    (latest streamed result while running) and 'result' (once done).
+    None if the job does not exist or belongs to another user.
+    """
+    job = get_research_job(job_id, user_id)
+    if job is None:
+        return None
+    with _live_changed:
+        live = dict(_live.get(job_id) or {})
+
+    job['version'] = live.get('version', -1)
+    job['partial'] = live.get('partial')
+    if live.get('stage') and job['status'] in ('queued', 'running'):
+        job['stage'] = live['stage']
+    job['stage_label'] = STAGE_LABELS.get(job['stage'], "")
+    job['result'] = get_search_result(job['search_id'], user_id) if job['status'] == 'done' else None
+    return job
+
+def wait_for_research_update(job_id: int, seen_version: int, timeout: float = 10.0) -> bool:
+    """
+    Block until the job's version moves past seen_version or it leaves the
+    live set (finished). Returns False on timeout.
+    """
+    def changed():
+        state = _live.get(job_id)
+        return state is None or state['version'] != seen_version
+
+    with _live_changed:
+        return _live_changed.wait_for(changed, timeout=timeout)
+
+def recover_research_jobs() -> int:
+    """Re-queue jobs a previous process left queued or running; returns how many"""
+    jobs = get_unfinished_research_jobs()
+    for job in jobs:
+        update_research_job(job['id'], status='queued', stage='queued')
+        _publish(job['id'], stage='queued')
+        research_executor.submit(_run_job, job['id'], job['user_id'], job['query'])
+    if jobs:
+        log.info(f"🔁 Re-queued {len(jobs)} unfinished research job(s)")
+    return len(jobs)
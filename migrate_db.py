@@ -1,60 +1,45 @@
 """
 Database Migration Script for InfoFetch AI
-Adds the 'plan' column to existing users table
+Applies pending schema migrations (see db_utils.MIGRATIONS) and can
+benchmark the effect of the query indexes on a synthetic history table.
+
+Usage:
+    python migrate_db.py                  # apply pending migrations
+    python migrate_db.py --status         # show current / latest schema version
+    python migrate_db.py --benchmark [N]  # index benchmark on N synthetic rows (default 1,000,000)
 """
 
-import sqlite3
 import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
 
-DB_PATH = "infofetch_ai.db"
+import db_utils
+from telemetry import configure_logging
 
 def migrate_database():
-    """Add missing 'plan' column to users table"""
-    
+    """Bring the database up to the latest schema version"""
+
     print("\n" + "="*70)
     print("🔧 DATABASE MIGRATION SCRIPT")
     print("="*70 + "\n")
-    
-    if not os.path.exists(DB_PATH):
-        print(f"❌ Database file not found: {DB_PATH}")
-        print("   The database will be created automatically when you run the app.")
-        return
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
+
     try:
-        # Check if 'plan' column exists
-        cursor.execute("PRAGMA table_info(users)")
-        columns = [column[1] for column in cursor.fetchall()]
-        
-        print(f"📊 Current columns in 'users' table: {columns}\n")
-        
-        if 'plan' in columns:
-            print("✅ 'plan' column already exists - no migration needed!")
+        before = db_utils.get_schema_version()
+        after = db_utils.run_migrations()
+
+        if after == before:
+            print(f"✅ Schema already at v{after} - no migration needed!\n")
         else:
-            print("🔄 Adding 'plan' column to users table...")
-            
-            # Add the 'plan' column with default value 'Free'
-            cursor.execute("ALTER TABLE users ADD COLUMN plan TEXT DEFAULT 'Free'")
-            
-            # Update all existing users to have 'Free' plan
-            cursor.execute("UPDATE users SET plan = 'Free' WHERE plan IS NULL")
-            
-            conn.commit()
-            
-            print("✅ Successfully added 'plan' column!")
-            print("✅ All existing users set to 'Free' plan\n")
-            
-            # Verify the change
-            cursor.execute("PRAGMA table_info(users)")
-            new_columns = [column[1] for column in cursor.fetchall()]
-            print(f"📊 Updated columns: {new_columns}\n")
-        
+            print(f"✅ Schema migrated v{before} → v{after}\n")
+
         # Display user data
-        cursor.execute("SELECT id, username, plan FROM users")
-        users = cursor.fetchall()
-        
+        with db_utils.get_db() as conn:
+            users = conn.execute("SELECT id, username, plan FROM users").fetchall()
+
         if users:
             print("👥 Current users in database:")
             print("-" * 70)
@@ -63,16 +48,109 @@ def migrate_database():
             print()
         else:
             print("ℹ️  No users in database yet\n")
-        
+
     except Exception as e:
         print(f"❌ Migration error: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
-    
+
     print("="*70)
     print("✅ MIGRATION COMPLETE")
     print("="*70 + "\n")
 
+def show_status():
+    """Print the current and latest schema versions and any pending steps"""
+    current = db_utils.get_schema_version()
+    print(f"\n📊 Schema version: v{current} (latest v{db_utils.latest_schema_version()})")
+    for version, description, _ in db_utils.MIGRATIONS:
+        marker = "✅" if version <= current else "⏳"
+        print(f"   {marker} v{version}: {description}")
+    print()
+
+# ============================================================================
+# INDEX BENCHMARK
+# ============================================================================
+
+BENCHMARK_QUERIES = [
+    ("get_user_history",
+     "SELECT id, query, confidence, timestamp FROM search_history WHERE user_id = ? ORDER BY timestamp DESC LIMIT 50"),
+    ("get_user_stats (count)",
+     "SELECT COUNT(*) FROM search_history WHERE user_id = ?"),
+]
+
+def _measure(conn, sql: str, user_ids: list) -> tuple:
+    plan = " / ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, (user_ids[0],)))
+    started = time.perf_counter()
+    for user_id in user_ids:
+        conn.execute(sql, (user_id,)).fetchall()
+    avg_ms = (time.perf_counter() - started) * 1000 / len(user_ids)
+    return plan, avg_ms
+
+def benchmark_indexes(rows: int = 1_000_000, users: int = 5000, lookups: int = 20):
+    """Time the hot history queries on synthetic data before and after migration 2"""
+    print("\n" + "="*70)
+    print(f"⏱️  INDEX BENCHMARK - {rows:,} synthetic search_history rows, {users:,} users")
+    print("="*70 + "\n")
+
+    original_path = db_utils.DB_PATH
+    workdir = tempfile.mkdtemp(prefix="infofetch_bench_")
+    db_utils.DB_PATH = os.path.join(workdir, "benchmark.db")
+
+    try:
+        db_utils.run_migrations(target_version=1)
+
+        start_time = datetime(2025, 1, 1)
+        rng = random.Random(42)
+
+        def synthetic_rows():
+            for i in range(rows):
+                yield (
+                    rng.randint(1, users),
+                    f"synthetic query {i}",
+                    "{}",
+                    rng.choice(["high", "medium", "low"]),
+                    (start_time + timedelta(seconds=i * 30)).strftime("%Y-%m-%d %H:%M:%S"),
+                )
+
+        started = time.perf_counter()
+        with db_utils.get_db(write=True) as conn:
+            conn.executemany(
+                "INSERT INTO search_history (user_id, query, result_json, confidence, timestamp) VALUES (?, ?, ?, ?, ?)",
+                synthetic_rows()
+            )
+        print(f"📥 Inserted {rows:,} rows in {time.perf_counter() - started:.1f}s\n")
+
+        sample_users = [rng.randint(1, users) for _ in range(lookups)]
+        conn = db_utils.get_thread_connection()
+
+        before = {name: _measure(conn, sql, sample_users) for name, sql in BENCHMARK_QUERIES}
+
+        started = time.perf_counter()
+        db_utils.run_migrations(target_version=2)
+        print(f"🔨 Built indexes in {time.perf_counter() - started:.1f}s\n")
+
+        after = {name: _measure(conn, sql, sample_users) for name, sql in BENCHMARK_QUERIES}
+
+        for name, _ in BENCHMARK_QUERIES:
+            plan_before, ms_before = before[name]
+            plan_after, ms_after = after[name]
+            speedup = ms_before / ms_after if ms_after else float('inf')
+            print(f"🔎 {name}")
+            print(f"   before: {ms_before:8.2f} ms/query | {plan_before}")
+            print(f"   after:  {ms_after:8.2f} ms/query | {plan_after}")
+            print(f"   speedup: {speedup:,.0f}x\n")
+    finally:
+        db_utils.close_thread_connection()
+        db_utils.DB_PATH = original_path
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print("="*70 + "\n")
+
 if __name__ == "__main__":
-    migrate_database()
\ No newline at end of file
+    configure_logging()
+    if "--benchmark" in sys.argv:
+        index = sys.argv.index("--benchmark")
+        row_count = int(sys.argv[index + 1]) if len(sys.argv) > index + 1 else 1_000_000
+        benchmark_indexes(rows=row_count)
+    elif "--status" in sys.argv:
+        show_status()
+    else:
+        migrate_database()
@@ -0,0 +1,274 @@
+"""
+Query classifier for InfoFetch AI
+
+Decides whether a query is about a company (and which one) and whether it
+is small talk the chatbot can answer directly. All keyword lists are
+compiled once into combined regexes, so one classify() call makes a single
+pass over the query for each group instead of one scan per keyword.
+With the gazetteer disabled, results match the original per-keyword
+loops (see bench_classifier.py). With it enabled, companies outside
+KNOWN_COMPANIES (aliases, misspellings) are recognised too, known names
+must appear as whole words, misspellings are only guessed in a company
+context, and every company query carries a canonical company id.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Optional
+
+from gazetteer import company_slug, get_gazetteer
+
+# ============================================================================
+# KEYWORD LISTS
+# ============================================================================
+
+COMPANY_KEYWORDS = [
+    'company', 'career', 'job', 'hiring', 'work', 'salary', 'interview',
+    'culture', 'benefits', 'openings', 'recruitment', 'intern', 'internship',
+    'fresher', 'graduate', 'placement', 'apply', 'employer', 'organization',
+    'corporation', 'firm', 'startup', 'tech company', 'mnc', 'contact',
+    'address', 'email', 'phone', 'location', 'office', 'headquarters',
+    'founded', 'ceo', 'employees', 'revenue', 'industry'
+]
+
+COMPANY_SUFFIXES = [
+    'inc', 'llc', 'ltd', 'limited', 'corporation', 'corp', 'technologies',
+    'tech', 'systems', 'solutions', 'services', 'group', 'labs', 'software'
+]
+
+KNOWN_COMPANIES = [
+    'google', 'microsoft', 'amazon', 'apple', 'meta', 'facebook', 'netflix',
+    'tesla', 'nvidia', 'intel', 'ibm', 'oracle', 'salesforce', 'adobe',
+    'twitter', 'x corp', 'uber', 'airbnb', 'spotify', 'zoom', 'slack', 'linkedin',
+    'infosys', 'tcs', 'wipro', 'cognizant', 'accenture', 'deloitte',
+    'goldman sachs', 'jp morgan', 'morgan stanley', 'mckinsey', 'bain',
+    'flipkart', 'zomato', 'swiggy', 'paytm', 'ola', 'byju', 'phonepe',
+    'sony', 'samsung', 'dell', 'hp', 'cisco', 'vmware', 'servicenow',
+    'shopify', 'stripe', 'square', 'paypal', 'visa', 'mastercard'
+]
+
+STRICT_COMPANY_PATTERNS = [
+    r'\bcompany\s+(?:named|called|about|info|information|details|contact)',
+    r'\b(?:working|career|job|apply|join)\s+at\s+[A-Z]',
+    r'\b[A-Z][a-zA-Z]+\s+(?:company|corporation|inc|llc|careers|jobs|hiring)',
+    r'\b(?:contact|email|phone|address)\s+(?:for|of)\s+[A-Z]',
+    r'\bcareer\s+(?:at|in|with)\s+[A-Z]',
+    r'\b(?:ceo|founder|headquarters)\s+(?:of|at)\s+[A-Z]',
+]
+
+JOB_KEYWORDS = ['hiring', 'recruitment', 'intern', 'internship', 'placement', 'employer', 'salary', 'interview']
+
+# Tried in order; the first pattern that matches names the company
+COMPANY_NAME_PATTERNS = [
+    r'(?:about|at|for|join|career at|working at)\s+([A-Z][a-zA-Z\s&]+?)(?:\s+company|\s+career|\s+job|\s+salary|$|\.)',
+    r'^([A-Z][a-zA-Z\s&]+?)(?:\s+company|\s+career|\s+job|\s+salary)',
+    r'([A-Z][a-zA-Z\s&]+?)\s+(?:inc|llc|ltd|limited|corp|technologies|tech)'
+]
+
+CHAT_GREETINGS = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'greetings', 'howdy', 'sup', "what's up"]
+CHAT_SOCIAL = ['thank', 'thanks', 'bye', 'goodbye', 'see you', 'appreciate']
+CHAT_META = ['help', 'how to use', 'what can you do', 'features', 'about you']
+CHAT_SIMPLE_PATTERNS = [
+    r'^who is (the )?(ceo|founder|president|owner) of',
+    r'^when (was|did) .{1,30} (founded|started|created|established)',
+    r'^where is .{1,30} (located|based|headquartered)',
+    r'^what (is|does) [A-Z]\w+ (do|make|sell)',
+    r'^how (many|much) (employees|people work|revenue)',
+]
+RESEARCH_TRIGGERS = [
+    'tell me about', 'research', 'detailed', 'comprehensive',
+    'contact information', 'email', 'phone number', 'address',
+    'career opportunities', 'job openings', 'hiring',
+    'salary range', 'benefits', 'work culture',
+    'compare', 'analyze', 'latest trends', 'overview'
+]
+CHAT_MAX_WORDS = 8
+
+# Canned chatbot replies, checked in this order
+CANNED_GREETING = ['hello', 'hi ', 'hey ', 'good morning', 'good afternoon']
+CANNED_THANKS = ['thank you', 'thanks', 'appreciate']
+CANNED_HELP = ['help', 'what can you do', 'how do i', 'how to use']
+CANNED_CONTACT = ['email', 'phone', 'contact', 'address', 'reach', 'call']
+CANNED_CAREERS = ['job', 'career', 'hiring', 'work at', 'salary', 'opening']
+
+# ============================================================================
+# COMPILED PATTERNS
+# ============================================================================
+
+def _alternation(words: list) -> str:
+    return '|'.join(re.escape(word) for word in words)
+
+def _first_char_alternation(words: list) -> str:
+    """Alternation factored on the first character, keeping list order within each branch"""
+    branches = {}
+    for word in words:
+        branches.setdefault(word[0], []).append(re.escape(word[1:]))
+    return '|'.join(f"{re.escape(first)}(?:{'|'.join(rests)})" for first, rests in branches.items())
+
+# A zero-width lookahead reports a match at every position, including
+# overlapping ones, and at each position the alternation picks the earliest
+# listed company, so the lowest list index over all hits is the same company
+# the original "first in KNOWN_COMPANIES order" loop returned. The plain
+# search is a cheaper first check for the common no-company case.
+_KNOWN_COMPANY_ANY_RE = re.compile(_first_char_alternation(KNOWN_COMPANIES))
+_KNOWN_COMPANY_RE = re.compile(f"(?=({_first_char_alternation(KNOWN_COMPANIES)}))")
+_COMPANY_RANK = {company: rank for rank, company in enumerate(KNOWN_COMPANIES)}
+
+_COMPANY_SHAPE_RE = re.compile('|'.join(
+    [rf"\b[A-Z][a-zA-Z]*\s+(?:{_alternation(COMPANY_SUFFIXES)})\b"] +
+    [f"(?:{pattern})" for pattern in STRICT_COMPANY_PATTERNS]
+))
+_JOB_KEYWORD_RE = re.compile(_alternation(JOB_KEYWORDS))
+_COMPANY_NAME_RES = [re.compile(pattern, re.IGNORECASE) for pattern in COMPANY_NAME_PATTERNS]
+
+_CHAT_GREETING_RE = re.compile(_alternation(CHAT_GREETINGS))
+_CHAT_SMALL_TALK_RE = re.compile(_alternation(CHAT_SOCIAL + CHAT_META))
+_CHAT_SIMPLE_RE = re.compile('|'.join(f"(?:{pattern})" for pattern in CHAT_SIMPLE_PATTERNS))
+_RESEARCH_TRIGGER_RE = re.compile(_alternation(RESEARCH_TRIGGERS))
+
+_CANNED_RES = [
+    ('greeting', re.compile(_alternation(CANNED_GREETING))),
+    ('thanks', re.compile(_alternation(CANNED_THANKS))),
+    ('help', re.compile(_alternation(CANNED_HELP))),
+]
+_CANNED_COMPANY_RES = [
+    ('contact', re.compile(_alternation(CANNED_CONTACT))),
+    ('careers', re.compile(_alternation(CANNED_CAREERS))),
+]
+
+# A misspelt name is only guessed at when the query has a company-ish word,
+# or is a single word on its own, so "tomato soup recipe" is not Zomato
+_FUZZY_CONTEXT_RE = re.compile(_alternation(COMPANY_KEYWORDS))
+
+# ============================================================================
+# CLASSIFIER
+# ============================================================================
+
+# Set through use_gazetteer(); off gives the built-in list behaviour only
+USE_GAZETTEER = True
+
+def use_gazetteer(enabled: bool):
+    """Turn gazetteer lookups on or off (clears the classification cache)"""
+    global USE_GAZETTEER
+    USE_GAZETTEER = enabled
+    _classify.cache_clear()
+
+def _known_company(query_lower: str) -> Optional[str]:
+    if _KNOWN_COMPANY_ANY_RE.search(query_lower) is None:
+        return None
+    best = None
+    for match in _KNOWN_COMPANY_RE.finditer(query_lower):
+        company = match.group(1)
+        if best is None or _COMPANY_RANK[company] < _COMPANY_RANK[best]:
+            best = company
+            if _COMPANY_RANK[best] == 0:
+                break
+    return best
+
+def _capitalised_word_near_job_keyword(query: str) -> bool:
+    words = query.split()
+    for i, word in enumerate(words):
+        if _JOB_KEYWORD_RE.search(word.lower()):
+            for j in range(max(0, i - 3), min(len(words), i + 4)):
+                if len(words[j]) > 2 and words[j][0].isupper():
+                    return True
+    return False
+
+def _whole_word(known: str, query_lower: str) -> bool:
+    return re.search(rf"\b{re.escape(known)}\b", query_lower) is not None
+
+def _gazetteer_entity(query: str, query_lower: str, known: Optional[str]) -> Optional[Dict]:
+    if not USE_GAZETTEER:
+        return None
+    gazetteer = get_gazetteer()
+    if known is not None:
+        return gazetteer.lookup(known)
+    fuzzy = len(query.split()) == 1 or _FUZZY_CONTEXT_RE.search(query_lower) is not None
+    return gazetteer.resolve(query, fuzzy=fuzzy)
+
+def _is_company(query: str, known: Optional[str], entity: Optional[Dict]) -> bool:
+    return (
+        known is not None
+        or entity is not None
+        or _COMPANY_SHAPE_RE.search(query) is not None
+        or _capitalised_word_near_job_keyword(query)
+    )
+
+def _company_name(query: str, known: Optional[str], entity: Optional[Dict] = None) -> str:
+    if known is not None:
+        return known.title()
+    if entity is not None:
+        return entity['name']
+    for pattern in _COMPANY_NAME_RES:
+        match = pattern.search(query)
+        if match:
+            return match.group(1).strip()
+    for word in query.split():
+        if len(word) > 2 and word[0].isupper():
+            return word
+    return "Company"
+
+def _is_chat(query: str, query_lower: str) -> bool:
+    if _CHAT_GREETING_RE.match(query_lower):
+        return True
+    if _CHAT_SMALL_TALK_RE.search(query_lower):
+        return True
+    if _CHAT_SIMPLE_RE.search(query_lower):
+        return True
+    if _RESEARCH_TRIGGER_RE.search(query_lower):
+        return False
+    return len(query.split()) <= CHAT_MAX_WORDS
+
+def _chat_intent(query_lower: str, is_company: bool) -> Optional[str]:
+    for intent, pattern in _CANNED_RES:
+        if pattern.search(query_lower):
+            return intent
+    if is_company:
+        for intent, pattern in _CANNED_COMPANY_RES:
+            if pattern.search(query_lower):
+                return intent
+    return None
+
+@lru_cache(maxsize=4096)
+def _classify(query: str) -> tuple:
+    query_lower = query.lower()
+    known = _known_company(query_lower)
+    if USE_GAZETTEER and known is not None and not _whole_word(known, query_lower):
+        # "striped" is not Stripe; the gazetteer still catches real aliases like "byjus"
+        known = None
+    entity = _gazetteer_entity(query, query_lower, known)
+    is_company = _is_company(query, known, entity)
+    company = _company_name(query, known, entity) if is_company else None
+    company_id = (entity['id'] if entity else company_slug(company)) if is_company else None
+    return (
+        'company' if is_company else 'general',
+        company,
+        _is_chat(query, query_lower),
+        _chat_intent(query_lower, is_company),
+        company_id,
+    )
+
+def classify(query: str) -> Dict:
+    """
+    Everything the app needs to route a query, in one call:
+    {'type': 'company' | 'general', 'company': name or None,
+     'company_id': canonical gazetteer id or None, 'is_chat': bool,
+     'chat_intent': 'greeting' | 'thanks' | 'help' | 'contact' | 'careers' | None}
+    """
+    query_type, company, is_chat, chat_intent, company_id = _classify(query)
+    return {
+        'type': query_type, 'company': company, 'company_id': company_id,
+        'is_chat': is_chat, 'chat_intent': chat_intent
+    }
+
+def is_company_query(query: str) -> bool:
+    return _classify(query)[0] == 'company'
+
+def extract_company_name(query: str) -> str:
+    """Company named in the query, also for queries not classified as company queries"""
+    company = _classify(query)[1]
+    if company is not None:
+        return company
+    return _company_name(query, _known_company(query.lower()))
+
+def is_chat_query(query: str) -> bool:
+    return _classify(query)[2]
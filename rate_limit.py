@@ -0,0 +1,329 @@
+"""
+Client-side rate limiting for InfoFetch AI's upstream APIs
+
+One limiter per upstream (OpenAI, SerpAPI) for the whole process, so every
+Streamlit session, research job and bulk run draws from the same budget
+instead of each retrying on its own and hitting 429s together.
+
+  - token buckets for requests/min and, for OpenAI, tokens/min
+  - priority lanes: 'interactive' callers are admitted before 'background'
+    ones (bulk runs, cache refreshes, chat summaries)
+  - retries with jittered exponential backoff; a Retry-After from the
+    upstream pauses the whole limiter, and every 429 halves the request
+    rate until calls succeed again
+  - counters for requests, retries, 429s and time spent waiting
+
+    result = call_with_backoff(get_limiter('serpapi'), lambda: search.run(q))
+    with lane('background'):
+        ...   # calls made here queue behind interactive ones
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Optional
+
+from telemetry import get_logger
+
+# Lower number = served first
+LANES = {'interactive': 0, 'background': 1}
+
+# Burst allowance: a bucket holds this many seconds' worth of its rate
+BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "10"))
+MAX_ATTEMPTS = int(os.getenv("RATE_LIMIT_MAX_ATTEMPTS", "4"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_CAP_SECONDS = 30.0
+# Retry-After values above this are treated as a hard failure, not waited out
+MAX_RETRY_AFTER_SECONDS = 60.0
+# A 429 halves the request rate; each success wins back this share of it
+THROTTLE_FACTOR = 0.5
+RECOVERY_STEP = 0.05
+MIN_RATE_SHARE = 0.1
+
+UPSTREAM_LIMITS = {
+    'openai': {
+        'requests_per_minute': float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500")),
+        'tokens_per_minute': float(os.getenv("OPENAI_TOKENS_PER_MINUTE", "160000")),
+    },
+    'serpapi': {
+        'requests_per_minute': float(os.getenv("SERPAPI_SEARCHES_PER_MINUTE", "60")),
+        'tokens_per_minute': 0,
+    },
+}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+# Transport-level errors from openai / requests that are worth retrying
+RETRYABLE_ERRORS = {'APITimeoutError', 'APIConnectionError', 'RateLimitError', 'InternalServerError',
+                    'Timeout', 'ConnectTimeout', 'ReadTimeout', 'ConnectionError'}
+
+log = get_logger("rate_limit")
+
+# ============================================================================
+# LANES
+# ============================================================================
+
+_current_lane = contextvars.ContextVar('rate_limit_lane', default='interactive')
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+@contextmanager
+def lane(name: str):
+    """Run the block's upstream calls in the given lane ('interactive' or 'background')"""
+    if name not in LANES:
+        raise ValueError(f"Unknown rate-limit lane: {name}")
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+# ============================================================================
+# LIMITER
+# ============================================================================
+
+class TokenBucket:
+    """Refills continuously at per_minute / 60 per second up to capacity. Not thread-safe on its own."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        self.per_minute = per_minute
+        self.capacity = max(1.0, per_minute / 60 * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.per_minute / 60)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until amount (at most one full bucket) can be taken"""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.level
+        return missing * 60 / self.per_minute if missing > 0 else 0.0
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Token buckets for one upstream, handed out in lane-priority then arrival order"""
+
+    def __init__(self, name: str, requests_per_minute: float, tokens_per_minute: float = 0):
+        self.name = name
+        self.max_requests_per_minute = requests_per_minute
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+        self._cond = threading.Condition()
+        self._queue = []
+        self._arrivals = itertools.count()
+        self._paused_until = 0.0
+        self._counters = {'retries': 0, 'throttled': 0, 'failures': 0, 'backoff_seconds': 0.0}
+        self._lanes = {name: {'requests': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0} for name in LANES}
+
+    def acquire(self, tokens: float = 0, lane_name: Optional[str] = None) -> float:
+        """Block until one request (plus tokens) fits the budget; returns the seconds waited"""
+        lane_name = lane_name or current_lane()
+        ticket = (LANES[lane_name], next(self._arrivals))
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if self._queue[0] != ticket:
+                        # Whoever is at the head wakes us when it leaves
+                        self._cond.wait()
+                        continue
+                    now = time.monotonic()
+                    delay = max(
+                        self._paused_until - now,
+                        self.requests.delay(1, now),
+                        self.tokens.delay(tokens, now) if self.tokens else 0.0,
+                    )
+                    if delay <= 0:
+                        break
+                    self._cond.wait(delay)
+                self.requests.take(1, now)
+                if self.tokens:
+                    self.tokens.take(tokens, now)
+            finally:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            stats = self._lanes[lane_name]
+            stats['requests'] += 1
+            stats['wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+        return waited
+
+    def pause(self, seconds: float):
+        """Hold every caller back for seconds (an upstream Retry-After)"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record_success(self):
+        with self._cond:
+            if self.requests.per_minute < self.max_requests_per_minute:
+                self.requests.per_minute = min(self.max_requests_per_minute,
+                                               self.requests.per_minute + self.max_requests_per_minute * RECOVERY_STEP)
+
+    def record_retry(self, throttled: bool, delay: float):
+        with self._cond:
+            self._counters['retries'] += 1
+            self._counters['backoff_seconds'] += delay
+            if throttled:
+                self._counters['throttled'] += 1
+                self.requests.per_minute = max(self.max_requests_per_minute * MIN_RATE_SHARE,
+                                               self.requests.per_minute * THROTTLE_FACTOR)
+
+    def record_failure(self):
+        with self._cond:
+            self._counters['failures'] += 1
+
+    def stats(self) -> Dict:
+        """Requests, retries, 429s, failures, current rate, backoff time and queue wait per lane"""
+        with self._cond:
+            lanes = {name: dict(values) for name, values in self._lanes.items()}
+            counters = dict(self._counters)
+            counters['backoff_seconds'] = round(counters['backoff_seconds'], 3)
+            counters['queued'] = len(self._queue)
+            counters['requests_per_minute'] = round(self.requests.per_minute, 1)
+        for values in lanes.values():
+            values['avg_wait_ms'] = round(values['wait_seconds'] / values['requests'] * 1000, 1) if values['requests'] else 0.0
+            values['wait_seconds'] = round(values['wait_seconds'], 3)
+            values['max_wait_seconds'] = round(values['max_wait_seconds'], 3)
+        counters['requests'] = sum(v['requests'] for v in lanes.values())
+        counters['wait_seconds'] = round(sum(v['wait_seconds'] for v in lanes.values()), 3)
+        counters['lanes'] = lanes
+        return counters
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(name: str) -> RateLimiter:
+    """Process-wide limiter for an upstream in UPSTREAM_LIMITS"""
+    if name in _limiters:
+        return _limiters[name]
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, **UPSTREAM_LIMITS[name])
+    return _limiters[name]
+
+def rate_limit_stats() -> Dict[str, Dict]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+# ============================================================================
+# RETRIES
+# ============================================================================
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+def is_retryable(error: Exception) -> bool:
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    if any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__):
+        return True
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message or 'too many requests' in message
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Retry-After (or OpenAI's retry-after-ms) from the error's HTTP response, if any"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000
+        value = headers.get('retry-after')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given 0-based retry"""
+    return random.uniform(0, min(BACKOFF_CAP_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+def _retry_delay(limiter: RateLimiter, error: Exception, attempt: int, attempts: int) -> Optional[float]:
+    """Seconds to sleep before the next attempt, or None if the error should be raised"""
+    if attempt + 1 >= attempts or not is_retryable(error):
+        limiter.record_failure()
+        return None
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None and retry_after > MAX_RETRY_AFTER_SECONDS:
+        limiter.record_failure()
+        return None
+    if retry_after is not None:
+        # The whole upstream is told to wait, not just this caller
+        limiter.pause(retry_after)
+        delay = retry_after + random.uniform(0, BACKOFF_BASE_SECONDS)
+    else:
+        delay = backoff_delay(attempt)
+    limiter.record_retry(_status_code(error) == 429 or type(error).__name__ == 'RateLimitError', delay)
+    log.warning(f"⏳ {limiter.name} call failed ({type(error).__name__}), retry {attempt + 1} in {delay:.1f}s")
+    return delay
+
+def call_with_backoff(limiter: RateLimiter, fn: Callable, tokens: float = 0, attempts: int = MAX_ATTEMPTS):
+    """fn() once the limiter admits it, retried on 429 / 5xx / timeouts"""
+    for attempt in range(attempts):
+        limiter.acquire(tokens)
+        try:
+            result = fn()
+        except Exception as e:
+            delay = _retry_delay(limiter, e, attempt, attempts)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            continue
+        limiter.record_success()
+        return result
+
+def stream_with_backoff(limiter: RateLimiter, make_stream: Callable[[], Iterator], tokens: float = 0,
+                        attempts: int = MAX_ATTEMPTS) -> Iterator:
+    """
+    Items of make_stream() once the limiter admits it. Only failures before
+    the first item are retried; after that the error is raised, since the
+    caller has already consumed part of the output.
+    """
+    for attempt in range(attempts):
+        limiter.acquire(tokens)
+        stream = make_stream()
+        started = False
+        try:
+            for item in stream:
+                started = True
+                yield item
+        except Exception as e:
+            delay = None if started else _retry_delay(limiter, e, attempt, attempts)
+            if delay is None:
+                if started:
+                    limiter.record_failure()
+                raise
+            time.sleep(delay)
+            continue
+        finally:
+            close = getattr(stream, 'close', None)
+            if close is not None:
+                close()
+        limiter.record_success()
+        return
@@ -1,10 +1,11 @@
 """
 Razorpay Payment Integration for InfoFetch AI
 """
-import razorpay
+import importlib.util
 import os
 import hashlib
 import hmac
+import threading
 from typing import Dict, Optional
 from dotenv import load_dotenv
 
@@ -15,15 +16,31 @@ load_dotenv("api.env")
 RAZORPAY_KEY_ID = os.getenv("RAZORPAY_KEY_ID", "rzp_test_YOUR_KEY_ID")
 RAZORPAY_KEY_SECRET = os.getenv("RAZORPAY_KEY_SECRET", "YOUR_KEY_SECRET")
 
-# Initialize Razorpay client
-try:
-    razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
-    RAZORPAY_AVAILABLE = True
-    print("✅ Razorpay client initialized successfully")
-except Exception as e:
-    razorpay_client = None
-    RAZORPAY_AVAILABLE = False
-    print(f"⚠️ Razorpay initialization failed: {e}")
+# The SDK (and its requests stack) is only imported when a payment is made
+RAZORPAY_AVAILABLE = importlib.util.find_spec("razorpay") is not None
+
+_razorpay_client = None
+_client_lock = threading.Lock()
+
+def get_razorpay_client():
+    """Razorpay client, built on first use; None if it cannot be created"""
+    global _razorpay_client, RAZORPAY_AVAILABLE
+    if _razorpay_client is not None or not RAZORPAY_AVAILABLE:
+        return _razorpay_client
+    with _client_lock:
+        if _razorpay_client is None and RAZORPAY_AVAILABLE:
+            try:
+                import razorpay
+                _razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
+                print("✅ Razorpay client initialized successfully")
+            except Exception as e:
+                RAZORPAY_AVAILABLE = False
+                print(f"⚠️ Razorpay initialization failed: {e}")
+    return _razorpay_client
+
+def razorpay_available() -> bool:
+    """True when payments can be taken; builds the client on first call"""
+    return get_razorpay_client() is not None
 
 # Plan pricing (in paise - INR smallest unit)
 PLAN_PRICING = {
@@ -51,7 +68,8 @@ def create_razorpay_order(plan_name: str, user_id: int, username: str) -> Option
     Returns:
         Dict with order details or None if failed
     """
-    if not RAZORPAY_AVAILABLE or razorpay_client is None:
+    razorpay_client = get_razorpay_client()
+    if razorpay_client is None:
         print("❌ Razorpay client not available")
         return None
     
@@ -138,7 +156,8 @@ def get_payment_details(payment_id: str) -> Optional[Dict]:
     Returns:
         Dict with payment details or None if failed
     """
-    if not RAZORPAY_AVAILABLE or razorpay_client is None:
+    razorpay_client = get_razorpay_client()
+    if razorpay_client is None:
         return None
     
     try:
@@ -154,5 +173,5 @@ if __name__ == "__main__":
     print("🧪 TESTING RAZORPAY CONFIGURATION")
     print("="*70)
     print(f"Key ID: {RAZORPAY_KEY_ID[:20]}..." if len(RAZORPAY_KEY_ID) > 20 else RAZORPAY_KEY_ID)
-    print(f"Client Available: {RAZORPAY_AVAILABLE}")
+    print(f"Client Available: {get_razorpay_client() is not None}")
     print("="*70 + "\n")
\ No newline at end of file
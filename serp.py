@@ -5,177 +5,220 @@ from dotenv import load_dotenv
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 load_dotenv(os.path.join(BASE_DIR, "api.env"), override=True)
 
-from langchain_openai import ChatOpenAI
-from langchain_community.utilities import SerpAPIWrapper
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from concurrent.futures import ThreadPoolExecutor, wait
+import contextvars
 import json
+import logging
 import re
+import threading
+import time
 
-print(f"\n{'='*70}")
-print("🚀 INFOFETCH AI - INITIALIZING ENHANCED BACKEND v2.0")
-print(f"{'='*70}")
+from cache_utils import SingleFlight, TieredCache
+from db_utils import bootstrap_db
+from rate_limit import call_with_backoff, current_lane, get_limiter, lane, stream_with_backoff
+from chat_context import CHAT_CONTEXT_TOKENS, pack_turns, refresh_summary
+from telemetry import configure_logging, current_span, get_logger, span, span_iter, traced
+from text_utils import count_tokens, dedupe_search_sets, pack_search_sets, log_packing_report, truncate_to_tokens
+from text_utils import SEARCH_FAILED_PREFIX, SEARCH_TIMED_OUT, SEARCH_UNAVAILABLE
 
-try:
-    search = SerpAPIWrapper()
-    print("✅ SerpAPI: CONNECTED")
-except Exception as e:
-    print(f"❌ SerpAPI: FAILED - {e}")
-    search = None
+log = get_logger("serp")
 
-def web_search(query: str) -> str:
-    if search is None:
-        return "Search service unavailable."
-    try:
-        result = search.run(query)
-        print(f"   ✓ Search returned {len(result)} characters")
-        return result
-    except Exception as e:
-        print(f"   ✗ Search error: {str(e)}")
-        return f"Search failed: {str(e)}"
+# ============================================================================
+# LAZY CLIENTS
+# ============================================================================
 
-try:
-    research_llm = ChatOpenAI(
+# SerpAPI and the OpenAI clients (and langchain_openai itself, the bulk of
+# serp's import time) are only loaded on first use or by init_backend(), so
+# importing serp - in Streamlit or any new worker process - stays cheap.
+OPENAI_AVAILABLE = bool(os.getenv("OPENAI_API_KEY"))
+SERPAPI_AVAILABLE = bool(os.getenv("SERPAPI_API_KEY"))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def _lazy_client(name: str, factory):
+    if name in _clients:
+        return _clients[name]
+    with _clients_lock:
+        if name not in _clients:
+            try:
+                _clients[name] = factory()
+                log.info(f"✅ {name}: CONNECTED")
+            except Exception as e:
+                log.error(f"❌ {name}: FAILED - {e}")
+                _clients[name] = None
+    return _clients[name]
+
+def _build_search():
+    from langchain_community.utilities import SerpAPIWrapper
+    return SerpAPIWrapper()
+
+def _build_research_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
         model="gpt-3.5-turbo-1106",
         temperature=0.1,
         max_tokens=2500,
         timeout=60,
-        max_retries=3,
+        max_retries=0,
         model_kwargs={"response_format": {"type": "json_object"}}
     )
-    print("✅ Research LLM: CONNECTED (JSON mode, T=0.1)")
 
-    chat_llm = ChatOpenAI(
+def _build_chat_llm():
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
         model="gpt-3.5-turbo",
         temperature=0.7,
         max_tokens=400,
         timeout=30,
-        max_retries=2
+        max_retries=0
     )
-    print("✅ Chat LLM: CONNECTED (Conversational mode, T=0.7)")
 
-    llm = research_llm
+def get_search():
+    """SerpAPIWrapper, or None if it cannot be configured"""
+    return _lazy_client("SerpAPI", _build_search)
+
+def get_research_llm():
+    """JSON-mode research model (T=0.1), or None if OpenAI is not configured"""
+    return _lazy_client("Research LLM", _build_research_llm)
+
+def get_chat_llm():
+    """Conversational chat model (T=0.7), or None if OpenAI is not configured"""
+    return _lazy_client("Chat LLM", _build_chat_llm)
+
+# Retries are handled by rate_limit (shared budget, Retry-After, backoff), so
+# the clients above are built with max_retries=0 and called through these.
+# Each call is a span (stage = research_llm / chat_llm / summary_llm) with its token counts.
+def _prompt_tokens(messages: list) -> int:
+    return sum(count_tokens(str(m.content)) for m in messages)
+
+def _rate_limit_tokens(llm, prompt_tokens: int) -> int:
+    """What OpenAI charges against tokens/min for a request: prompt plus max_tokens"""
+    return prompt_tokens + (getattr(llm, 'max_tokens', None) or 0)
+
+def invoke_llm(llm, messages: list, stage: str = 'research_llm'):
+    prompt_tokens = _prompt_tokens(messages)
+    with span(stage, model=getattr(llm, 'model_name', ''), prompt_tokens=prompt_tokens) as s:
+        response = call_with_backoff(get_limiter('openai'), lambda: llm.invoke(messages),
+                                     tokens=_rate_limit_tokens(llm, prompt_tokens))
+        s.set(completion_tokens=count_tokens(response.content or ""))
+    return response
+
+def _counted_chunks(llm, messages: list, prompt_tokens: int):
+    completion_tokens = 0
+    try:
+        for chunk in stream_with_backoff(get_limiter('openai'), lambda: llm.stream(messages),
+                                         tokens=_rate_limit_tokens(llm, prompt_tokens)):
+            if chunk.content:
+                completion_tokens += count_tokens(chunk.content)
+            yield chunk
+    finally:
+        current_span().set(completion_tokens=completion_tokens)
+
+def stream_llm(llm, messages: list, stage: str = 'research_llm'):
+    prompt_tokens = _prompt_tokens(messages)
+    return span_iter(stage, _counted_chunks(llm, messages, prompt_tokens),
+                     model=getattr(llm, 'model_name', ''), prompt_tokens=prompt_tokens, streaming=True)
+
+# Identical query strings (same company, same targeted query) are served
+# from here instead of spending SerpAPI quota again.
+search_cache = TieredCache(
+    "serpapi",
+    ttl_seconds=int(os.getenv("SEARCH_CACHE_TTL", str(6 * 3600))),
+    max_memory_entries=512,
+    max_disk_entries=20000,
+)
+
+# Cache misses for the same query string that overlap in time (two sessions
+# researching the same company) share one SerpAPI call.
+search_flight = SingleFlight("serpapi")
+
+def _search_upstream(search, query: str) -> str:
+    result = call_with_backoff(get_limiter('serpapi'), lambda: search.run(query))
+    if result:
+        search_cache.set(query, result)
+    return result
+
+@traced('web_search')
+def web_search(query: str) -> str:
+    search = get_search()
+    if search is None:
+        return SEARCH_UNAVAILABLE
+    with span('search_cache') as s:
+        cached = search_cache.get(query)
+        s.set(hit=cached is not None)
+    if cached is not None:
+        log.info(f"⚡ Search cache hit ({len(cached)} characters)")
+        return cached
+    try:
+        with span('serpapi') as s:
+            result, shared = search_flight.do(query, _search_upstream, search, query)
+            s.set(shared=shared, chars=len(result))
+        if shared:
+            log.info(f"🔗 Joined in-flight search ({len(result)} characters)")
+        else:
+            log.info(f"✓ Search returned {len(result)} characters")
+        return result
+    except Exception as e:
+        log.warning(f"✗ Search error: {str(e)}")
+        return f"{SEARCH_FAILED_PREFIX}{str(e)}"
+
+# ============================================================================
+# CONCURRENT SEARCH FAN-OUT
+# ============================================================================
 
-except Exception as e:
-    print(f"❌ OpenAI: FAILED - {e}")
-    research_llm = None
-    chat_llm = None
-    llm = None
+# One pool per rate-limit lane for the whole process, so the cap holds
+# across every Streamlit session instead of each research run spawning its
+# own threads. Searches wait for the limiter on a pool thread; with a
+# separate pool, background searches (bulk runs, refreshes) queued behind
+# the limiter never hold the threads interactive searches need.
+SEARCH_MAX_WORKERS = int(os.getenv("SEARCH_MAX_WORKERS", "8"))
+SEARCH_BACKGROUND_WORKERS = int(os.getenv("SEARCH_BACKGROUND_WORKERS", "4"))
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "20"))
+
+search_executors = {
+    'interactive': ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS, thread_name_prefix="serp-search"),
+    'background': ThreadPoolExecutor(max_workers=SEARCH_BACKGROUND_WORKERS, thread_name_prefix="serp-search-bg"),
+}
 
-print(f"{'='*70}\n")
+def run_searches_concurrently(queries: list, timeout: float = SEARCH_TIMEOUT_SECONDS) -> list:
+    """
+    Runs web_search for every query on the caller's lane pool and returns the
+    results in the same order as the queries. A query that fails or is
+    still running when the timeout expires yields a short placeholder so
+    the remaining results are still usable.
+    """
+    started = time.monotonic()
+    # Each search runs in a copy of the caller's context, so it keeps the caller's rate-limit lane
+    executor = search_executors[current_lane()]
+    futures = [executor.submit(contextvars.copy_context().run, web_search, query) for query in queries]
+    done, not_done = wait(futures, timeout=timeout)
+
+    results = []
+    for i, future in enumerate(futures, 1):
+        if future in not_done:
+            future.cancel()
+            log.warning(f"⏱️ [{i}/{len(queries)}] Search timed out after {timeout:.0f}s")
+            results.append(SEARCH_TIMED_OUT)
+            continue
+        try:
+            results.append(future.result())
+        except Exception as e:
+            log.warning(f"✗ [{i}/{len(queries)}] Search failed: {e}")
+            results.append("")
+
+    log.info(f"⚡ {len(done)}/{len(queries)} searches finished in {time.monotonic() - started:.1f}s")
+    return results
 
 # ============================================================================
 # COMPANY DETECTION
 # ============================================================================
 
-COMPANY_KEYWORDS = [
-    'company', 'career', 'job', 'hiring', 'work', 'salary', 'interview',
-    'culture', 'benefits', 'openings', 'recruitment', 'intern', 'internship',
-    'fresher', 'graduate', 'placement', 'apply', 'employer', 'organization',
-    'corporation', 'firm', 'startup', 'tech company', 'mnc', 'contact',
-    'address', 'email', 'phone', 'location', 'office', 'headquarters',
-    'founded', 'ceo', 'employees', 'revenue', 'industry'
-]
-
-COMPANY_SUFFIXES = [
-    'inc', 'llc', 'ltd', 'limited', 'corporation', 'corp', 'technologies',
-    'tech', 'systems', 'solutions', 'services', 'group', 'labs', 'software'
-]
-
-KNOWN_COMPANIES = [
-    'google', 'microsoft', 'amazon', 'apple', 'meta', 'facebook', 'netflix',
-    'tesla', 'nvidia', 'intel', 'ibm', 'oracle', 'salesforce', 'adobe',
-    'twitter', 'x corp', 'uber', 'airbnb', 'spotify', 'zoom', 'slack', 'linkedin',
-    'infosys', 'tcs', 'wipro', 'cognizant', 'accenture', 'deloitte',
-    'goldman sachs', 'jp morgan', 'morgan stanley', 'mckinsey', 'bain',
-    'flipkart', 'zomato', 'swiggy', 'paytm', 'ola', 'byju', 'phonepe',
-    'sony', 'samsung', 'dell', 'hp', 'cisco', 'vmware', 'servicenow',
-    'shopify', 'stripe', 'square', 'paypal', 'visa', 'mastercard'
-]
-
-def is_company_query(query: str) -> bool:
-    query_lower = query.lower()
-    if any(company in query_lower for company in KNOWN_COMPANIES):
-        return True
-    for suffix in COMPANY_SUFFIXES:
-        pattern = rf'\b[A-Z][a-zA-Z]*\s+{suffix}\b'
-        if re.search(pattern, query):
-            return True
-    strict_company_patterns = [
-        r'\bcompany\s+(?:named|called|about|info|information|details|contact)',
-        r'\b(?:working|career|job|apply|join)\s+at\s+[A-Z]',
-        r'\b[A-Z][a-zA-Z]+\s+(?:company|corporation|inc|llc|careers|jobs|hiring)',
-        r'\b(?:contact|email|phone|address)\s+(?:for|of)\s+[A-Z]',
-        r'\bcareer\s+(?:at|in|with)\s+[A-Z]',
-        r'\b(?:ceo|founder|headquarters)\s+(?:of|at)\s+[A-Z]',
-    ]
-    for pattern in strict_company_patterns:
-        if re.search(pattern, query):
-            return True
-    job_keywords = ['hiring', 'recruitment', 'intern', 'internship', 'placement', 'employer', 'salary', 'interview']
-    for keyword in job_keywords:
-        if keyword in query_lower:
-            words = query.split()
-            for i, word in enumerate(words):
-                if keyword in word.lower():
-                    for j in range(max(0, i-3), min(len(words), i+4)):
-                        if len(words[j]) > 2 and words[j][0].isupper():
-                            return True
-    return False
-
-def extract_company_name(query: str) -> str:
-    query_lower = query.lower()
-    for company in KNOWN_COMPANIES:
-        if company in query_lower:
-            return company.title()
-    patterns = [
-        r'(?:about|at|for|join|career at|working at)\s+([A-Z][a-zA-Z\s&]+?)(?:\s+company|\s+career|\s+job|\s+salary|$|\.)',
-        r'^([A-Z][a-zA-Z\s&]+?)(?:\s+company|\s+career|\s+job|\s+salary)',
-        r'([A-Z][a-zA-Z\s&]+?)\s+(?:inc|llc|ltd|limited|corp|technologies|tech)'
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, query, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-    words = query.split()
-    for word in words:
-        if len(word) > 2 and word[0].isupper():
-            return word
-    return "Company"
-
-def is_chat_query(query: str) -> bool:
-    query_lower = query.lower()
-    greetings = ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening', 'greetings', 'howdy', 'sup', "what's up"]
-    if any(query_lower.startswith(g) for g in greetings):
-        return True
-    social = ['thank', 'thanks', 'bye', 'goodbye', 'see you', 'appreciate']
-    if any(word in query_lower for word in social):
-        return True
-    meta = ['help', 'how to use', 'what can you do', 'features', 'about you']
-    if any(phrase in query_lower for phrase in meta):
-        return True
-    simple_patterns = [
-        r'^who is (the )?(ceo|founder|president|owner) of',
-        r'^when (was|did) .{1,30} (founded|started|created|established)',
-        r'^where is .{1,30} (located|based|headquartered)',
-        r'^what (is|does) [A-Z]\w+ (do|make|sell)',
-        r'^how (many|much) (employees|people work|revenue)',
-    ]
-    for pattern in simple_patterns:
-        if re.search(pattern, query_lower):
-            return True
-    research_triggers = [
-        'tell me about', 'research', 'detailed', 'comprehensive',
-        'contact information', 'email', 'phone number', 'address',
-        'career opportunities', 'job openings', 'hiring',
-        'salary range', 'benefits', 'work culture',
-        'compare', 'analyze', 'latest trends', 'overview'
-    ]
-    if any(trigger in query_lower for trigger in research_triggers):
-        return False
-    word_count = len(query.split())
-    if word_count <= 8:
-        return True
-    return False
+# Keyword lists and the compiled classifier live in query_classifier
+from query_classifier import (
+    COMPANY_KEYWORDS, COMPANY_SUFFIXES, KNOWN_COMPANIES,
+    classify, is_company_query, extract_company_name, is_chat_query
+)
 
 # ============================================================================
 # 🔥 IMPROVED PROMPTS — MINIMISE "Unknown" FIELDS
@@ -197,14 +240,6 @@ REQUIRED JSON FORMAT:
 {
   "company_name": "Full Official Company Name",
   "company_type": "e.g. Multinational Technology Corporation",
-  "contact_info": {
-    "email": "official contact or press email address",
-    "phone": "main headquarters phone number",
-    "address": "full street address of headquarters",
-    "website": "https://official-website.com",
-    "careers_page": "https://careers.company.com or equivalent",
-    "linkedin": "https://www.linkedin.com/company/company-name"
-  },
   "basic_info": {
     "description": "3-4 sentence description covering what the company does, its products/services, market position, and why it matters",
     "founded": "year",
@@ -214,6 +249,14 @@ REQUIRED JSON FORMAT:
     "revenue": "annual revenue e.g. $280 billion (2023)",
     "industry": "primary industry"
   },
+  "contact_info": {
+    "email": "official contact or press email address",
+    "phone": "main headquarters phone number",
+    "address": "full street address of headquarters",
+    "website": "https://official-website.com",
+    "careers_page": "https://careers.company.com or equivalent",
+    "linkedin": "https://www.linkedin.com/company/company-name"
+  },
   "careers": {
     "entry_roles": ["Specific role 1", "Specific role 2", "Specific role 3", "Specific role 4", "Specific role 5"],
     "key_skills": ["Skill 1", "Skill 2", "Skill 3", "Skill 4", "Skill 5"],
@@ -298,12 +341,10 @@ BOUNDARIES:
 # JSON PARSING
 # ============================================================================
 
+@traced('parse_json')
 def extract_and_parse_json(text: str) -> dict:
-    print(f"\n{'='*70}")
-    print("📥 RAW LLM RESPONSE:")
-    print(f"{'='*70}")
-    print(text[:400] + "..." if len(text) > 400 else text)
-    print(f"{'='*70}\n")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("📥 Raw LLM response: " + (text[:400] + "..." if len(text) > 400 else text))
 
     if "```json" in text:
         text = text.split("```json")[1].split("```")[0]
@@ -315,35 +356,101 @@ def extract_and_parse_json(text: str) -> dict:
     start = text.find('{')
     end = text.rfind('}')
     if start == -1 or end == -1:
-        print("❌ No JSON object found!")
+        log.error("❌ No JSON object found!")
         return None
 
     text = text[start:end+1].strip()
 
     try:
         parsed = json.loads(text)
-        print("✅ JSON PARSED SUCCESSFULLY!")
+        log.debug("✅ JSON PARSED SUCCESSFULLY!")
         return parsed if isinstance(parsed, dict) else None
     except json.JSONDecodeError as e:
-        print(f"❌ JSON DECODE ERROR: {e}")
+        log.warning(f"⚠️ JSON DECODE ERROR: {e} - trying fixes")
+        with span('json_repair') as s:
+            try:
+                fixed = text.replace("'", '"')
+                fixed = re.sub(r',(\s*[}\]])', r'\1', fixed)
+                parsed = json.loads(fixed)
+                log.info("✅ JSON FIXED AND PARSED!")
+                s.set(repaired=True)
+                return parsed
+            except:
+                log.error("❌ FIXES FAILED - returning None")
+                s.set(repaired=False)
+                return None
+
+class IncrementalJSONParser:
+    """
+    Parses a JSON object as it streams in. Every time a top-level field is
+    complete (the tokenizer sees a ',' or the closing '}' at depth 1) the
+    buffer up to that point is closed off and parsed, so callers receive a
+    growing dict field by field instead of waiting for the whole response.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._last_safe = -1
+        self._parsed_safe = -1
+        self.snapshot = {}
+
+    def feed(self, chunk: str):
+        """Add streamed text; returns the updated dict when a new field completed, else None"""
+        self.buffer += chunk
+        text = self.buffer
+        while self._pos < len(text):
+            ch = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                if self._depth == 1:
+                    self._last_safe = self._pos
+                self._depth -= 1
+            elif ch == ',' and self._depth == 1:
+                self._last_safe = self._pos
+            self._pos += 1
+
+        if self._last_safe <= self._parsed_safe:
+            return None
+        self._parsed_safe = self._last_safe
+
+        start = text.find('{')
+        if start == -1 or start > self._last_safe:
+            return None
         try:
-            fixed = text.replace("'", '"')
-            fixed = re.sub(r',(\s*[}\]])', r'\1', fixed)
-            parsed = json.loads(fixed)
-            print("✅ JSON FIXED AND PARSED!")
-            return parsed
-        except:
-            print("❌ FIXES FAILED - returning None")
+            parsed = json.loads(text[start:self._last_safe] + "}")
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(parsed, dict):
             return None
+        self.snapshot = parsed
+        return parsed
 
 # ============================================================================
 # 🔥 IMPROVED SEARCH QUERIES — TARGETED TO FILL EVERY FIELD
 # ============================================================================
 
-def research_company(user_query: str, company_name: str) -> dict:
+# Prompt tokens for the packed search results (previously ~7000 / 6000 characters)
+COMPANY_CONTEXT_TOKENS = int(os.getenv("COMPANY_CONTEXT_TOKENS", "1800"))
+GENERAL_CONTEXT_TOKENS = int(os.getenv("GENERAL_CONTEXT_TOKENS", "1500"))
+
+def prepare_company_research(user_query: str, company_name: str):
     """
     Runs 5 highly targeted searches so every field in the result card
-    has real data instead of 'Unknown'.
+    has real data instead of 'Unknown'. Returns (messages, combined, company_slug).
     """
 
     company_slug = company_name.lower().replace(' ', '')
@@ -365,30 +472,35 @@ def research_company(user_query: str, company_name: str) -> dict:
         f"{company_name} salary range entry level work culture benefits perks glassdoor 2025",
     ]
 
-    print(f"🔍 Running {len(search_queries)} targeted searches for {company_name}...\n")
-
-    all_results = []
+    log.info(f"🔍 Running {len(search_queries)} targeted searches for {company_name}...")
     for i, query in enumerate(search_queries, 1):
-        print(f"  [{i}/{len(search_queries)}] {query}")
-        try:
-            result = web_search(query)
-            all_results.append(result)
-        except Exception as e:
-            print(f"  ✗ Search failed: {e}")
-            all_results.append("")
+        log.debug(f"[{i}/{len(search_queries)}] {query}")
+
+    with span('searches', count=len(search_queries)):
+        all_results = run_searches_concurrently(search_queries)
+
+    with span('prompt_build') as s:
+        messages, combined = _build_company_prompt(user_query, company_name, company_slug, all_results)
+        s.set(context_tokens=count_tokens(combined))
+
+    log.info(f"📊 Total content: {len(combined)} characters")
+    log.info(f"🤖 Sending to Research LLM for extraction...")
+    return messages, combined, company_slug
 
-    combined = "\n\n--- SEARCH RESULT SET {} ---\n\n".join([""] * (len(all_results) + 1)).strip()
-    combined = ""
-    for idx, r in enumerate(all_results, 1):
-        combined += f"\n\n=== SEARCH SET {idx} ===\n{r}"
 
-    max_chars = 7000
-    if len(combined) > max_chars:
-        combined = combined[:max_chars] + "\n\n[Results truncated...]"
+def _build_company_prompt(user_query: str, company_name: str, company_slug: str, all_results: list):
+    # The targeted queries overlap (LinkedIn and overview snippets recur), so
+    # duplicates are dropped before the token budget is shared out
+    all_results, dedup = dedupe_search_sets(all_results)
+    log.info(f"🧹 Removed {dedup['duplicates']}/{dedup['snippets']} duplicate snippets ({dedup['duplicate_bytes']:,} bytes)")
 
-    print(f"\n📊 Total content: {len(combined)} characters")
-    print(f"🤖 Sending to Research LLM for extraction...\n")
+    # Every set gets a fair share of the budget, so a long first result can
+    # no longer push the salary/culture set out of the prompt
+    packed = pack_search_sets(all_results, COMPANY_CONTEXT_TOKENS)
+    log_packing_report(packed, COMPANY_CONTEXT_TOKENS)
+    combined = packed['text']
 
+    from langchain_core.messages import HumanMessage, SystemMessage
     messages = [
         SystemMessage(content=COMPANY_RESEARCH_PROMPT),
         HumanMessage(content=f"""COMPANY NAME: {company_name}
@@ -404,33 +516,43 @@ SEARCH RESULTS:
 
 Return complete JSON with ALL fields populated.""")
     ]
+    return messages, combined
 
-    try:
-        print("⏳ Waiting for Research LLM response...")
-        response = research_llm.invoke(messages)
-        response_text = response.content
-        print(f"✅ Research LLM responded ({len(response_text)} chars)\n")
 
-        parsed_data = extract_and_parse_json(response_text)
+def finalize_company_research(user_query: str, company_name: str, company_slug: str,
+                              response_text: str, combined: str) -> dict:
+    parsed_data = extract_and_parse_json(response_text)
+
+    if parsed_data is None:
+        log.warning("⚠️ JSON PARSING FAILED - USING INTELLIGENT FALLBACK")
+        return create_smart_fallback_company(user_query, company_name, response_text, combined)
+
+    # Post-process: fill in any remaining "Unknown" fields using known patterns
+    parsed_data = fill_known_fields(parsed_data, company_name, company_slug)
+
+    parsed_data['query_type'] = 'company'
+    parsed_data['original_query'] = user_query
 
-        if parsed_data is None:
-            print("\n⚠️ JSON PARSING FAILED - USING INTELLIGENT FALLBACK\n")
-            return create_smart_fallback_company(user_query, company_name, response_text, combined)
+    log.info(f"✅ COMPANY RESEARCH COMPLETE - Confidence: {parsed_data.get('confidence', 'unknown')}")
+    return parsed_data
 
-        # Post-process: fill in any remaining "Unknown" fields using known patterns
-        parsed_data = fill_known_fields(parsed_data, company_name, company_slug)
 
-        parsed_data['query_type'] = 'company'
-        parsed_data['original_query'] = user_query
+def research_company(user_query: str, company_name: str) -> dict:
+    messages, combined, company_slug = prepare_company_research(user_query, company_name)
 
-        print(f"✅ COMPANY RESEARCH COMPLETE - Confidence: {parsed_data.get('confidence', 'unknown')}\n")
-        return parsed_data
+    try:
+        log.info("⏳ Waiting for Research LLM response...")
+        response = invoke_llm(get_research_llm(), messages)
+        response_text = response.content
+        log.info(f"✅ Research LLM responded ({len(response_text)} chars)")
+        return finalize_company_research(user_query, company_name, company_slug, response_text, combined)
 
     except Exception as e:
-        print(f"\n❌ LLM ERROR: {e}\n")
+        log.error(f"❌ LLM ERROR: {e}")
         return create_smart_fallback_company(user_query, company_name, str(e), combined)
 
 
+@traced('fill_known_fields')
 def fill_known_fields(data: dict, company_name: str, company_slug: str) -> dict:
     """
     Post-processing pass — fills any remaining Unknown/empty fields
@@ -485,20 +607,31 @@ def fill_known_fields(data: dict, company_name: str, company_slug: str) -> dict:
     return data
 
 
-def research_general(user_query: str) -> dict:
-    print("🔍 Searching for comprehensive information...")
-    try:
-        search_results = web_search(user_query)
-        print(f"✓ Search complete ({len(search_results)} chars)\n")
-    except Exception as e:
-        return create_error_response(user_query, f"Search failed: {str(e)}")
+def prepare_general_research(user_query: str):
+    """Runs the topic search and builds the prompt. Returns (messages, search_results)."""
+    log.info("🔍 Searching for comprehensive information...")
+    search_results = web_search(user_query)
+    log.info(f"✓ Search complete ({len(search_results)} chars)")
+
+    with span('prompt_build') as s:
+        messages, search_results = _build_general_prompt(user_query, search_results)
+        s.set(context_tokens=count_tokens(search_results))
+    log.info("🤖 Analyzing with Research LLM...")
+    return messages, search_results
 
-    max_chars = 6000
-    if len(search_results) > max_chars:
-        search_results = search_results[:max_chars] + "\n[Truncated...]"
 
-    print("🤖 Analyzing with Research LLM...\n")
+def _build_general_prompt(user_query: str, search_results: str):
+    deduped, dedup = dedupe_search_sets([search_results])
+    if dedup['duplicates']:
+        search_results = deduped[0]
+        log.info(f"🧹 Removed {dedup['duplicates']}/{dedup['snippets']} duplicate snippets ({dedup['duplicate_bytes']:,} bytes)")
 
+    search_results, dropped = truncate_to_tokens(search_results, GENERAL_CONTEXT_TOKENS)
+    if dropped:
+        search_results = search_results.rstrip() + " [...]"
+        log.info(f"📦 Search results trimmed to {GENERAL_CONTEXT_TOKENS} tokens ({dropped} dropped)")
+
+    from langchain_core.messages import HumanMessage, SystemMessage
     messages = [
         SystemMessage(content=RESEARCH_SYSTEM_PROMPT),
         HumanMessage(content=f"""USER QUERY: {user_query}
@@ -508,68 +641,300 @@ SEARCH RESULTS:
 
 Create a comprehensive, detailed research response. Output ONLY valid JSON.""")
     ]
+    return messages, search_results
 
-    try:
-        print("⏳ Waiting for Research LLM response...")
-        response = research_llm.invoke(messages)
-        response_text = response.content
-        print(f"✅ Research LLM responded ({len(response_text)} chars)\n")
 
-        parsed_data = extract_and_parse_json(response_text)
+def finalize_general_research(user_query: str, response_text: str, search_results: str) -> dict:
+    parsed_data = extract_and_parse_json(response_text)
+
+    if parsed_data is None:
+        log.warning("⚠️ JSON PARSING FAILED - Using smart fallback")
+        return create_smart_fallback_general(user_query, response_text, search_results)
 
-        if parsed_data is None:
-            print("⚠️ JSON PARSING FAILED - Using smart fallback\n")
-            return create_smart_fallback_general(user_query, response_text, search_results)
+    parsed_data['query_type'] = 'general'
+    parsed_data['original_query'] = user_query
+    log.info(f"✅ GENERAL RESEARCH COMPLETE - Confidence: {parsed_data.get('confidence', 'unknown')}")
+    return parsed_data
 
-        parsed_data['query_type'] = 'general'
-        parsed_data['original_query'] = user_query
-        print(f"✅ GENERAL RESEARCH COMPLETE - Confidence: {parsed_data.get('confidence', 'unknown')}\n")
-        return parsed_data
 
+def research_general(user_query: str) -> dict:
+    try:
+        messages, search_results = prepare_general_research(user_query)
     except Exception as e:
-        print(f"❌ LLM ERROR: {e}\n")
+        return create_error_response(user_query, f"Search failed: {str(e)}")
+
+    try:
+        log.info("⏳ Waiting for Research LLM response...")
+        response = invoke_llm(get_research_llm(), messages)
+        response_text = response.content
+        log.info(f"✅ Research LLM responded ({len(response_text)} chars)")
+        return finalize_general_research(user_query, response_text, search_results)
+
+    except Exception as e:
+        log.error(f"❌ LLM ERROR: {e}")
         return create_smart_fallback_general(user_query, str(e), search_results)
 
 
-def run_research_agent(user_query: str) -> dict:
-    print(f"\n{'='*70}")
-    print(f"🔍 NEW RESEARCH QUERY: {user_query}")
-    print(f"{'='*70}\n")
+# ============================================================================
+# RESEARCH RESULT CACHE
+# ============================================================================
 
-    if research_llm is None:
-        return create_error_response(user_query, "OpenAI API not configured")
-    if search is None:
-        return create_error_response(user_query, "SerpAPI not configured")
+# A finished research dict is reused for RESEARCH_FRESH_SECONDS; after that
+# it is still served instantly but refreshed in the background, until it
+# drops out of the cache entirely after RESEARCH_STALE_SECONDS.
+RESEARCH_FRESH_SECONDS = int(os.getenv("RESEARCH_FRESH_SECONDS", str(12 * 3600)))
+RESEARCH_STALE_SECONDS = int(os.getenv("RESEARCH_STALE_SECONDS", str(7 * 24 * 3600)))
+
+research_cache = TieredCache(
+    "research",
+    ttl_seconds=RESEARCH_STALE_SECONDS,
+    max_memory_entries=128,
+    max_disk_entries=5000,
+)
+
+# Background refreshes get their own small pool: they submit searches to
+# search_executors and wait on them, so they must not occupy their workers.
+background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="research-refresh")
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# Identical research requests (same research_cache_key) that arrive while one
+# is running wait for it instead of repeating its searches and LLM call.
+research_flight = SingleFlight("research")
+
+def research_cache_key(user_query: str) -> str:
+    """Cache key from the classifier output: canonical company id for company queries, query text otherwise"""
+    route = classify(user_query)
+    if route['type'] == 'company':
+        return f"company:{route['company_id']}"
+    return f"general:{user_query}"
+
+def is_cacheable_result(result: dict) -> bool:
+    """Only complete LLM extractions are worth sharing between users"""
+    return bool(result) and not result.get('error') and not result.get('fallback_reason')
+
+def serve_cached_result(cached: dict, user_query: str) -> dict:
+    result = dict(cached)
+    result['original_query'] = user_query
+    return result
+
+def peek_research_cache(user_query: str) -> dict:
+    """Fresh cached result for this query, without running or refreshing anything"""
+    entry = research_cache.get_entry(research_cache_key(user_query))
+    if entry is None or entry[1] > RESEARCH_FRESH_SECONDS:
+        return None
+    return serve_cached_result(entry[0], user_query)
+
+def _refresh_research(cache_key: str, user_query: str):
+    try:
+        with lane('background'):
+            result, _ = research_flight.do(cache_key, _research_and_cache, cache_key, user_query)
+        if is_cacheable_result(result):
+            log.info(f"🔄 Research cache refreshed: {cache_key}")
+    except Exception as e:
+        log.warning(f"⚠️ Background refresh failed for {cache_key}: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+
+def schedule_research_refresh(cache_key: str, user_query: str):
+    """Queue one background refresh per key; repeat requests while it runs are ignored"""
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+    background_executor.submit(_refresh_research, cache_key, user_query)
 
+
+def run_research_uncached(user_query: str) -> dict:
     is_company = is_company_query(user_query)
 
     if is_company:
-        print("✓ Detected: COMPANY RESEARCH")
+        log.info("✓ Detected: COMPANY RESEARCH")
         company_name = extract_company_name(user_query)
-        print(f"✓ Company: {company_name}\n")
+        log.info(f"✓ Company: {company_name}")
         return research_company(user_query, company_name)
     else:
-        print("✓ Detected: GENERAL RESEARCH\n")
+        log.info("✓ Detected: GENERAL RESEARCH")
         return research_general(user_query)
 
+
+def _research_and_cache(cache_key: str, user_query: str) -> dict:
+    result = run_research_uncached(user_query)
+    if is_cacheable_result(result):
+        research_cache.set(cache_key, result)
+    return result
+
+
+def coalescing_stats() -> dict:
+    """Single-flight counters; 'coalesced' is the number of upstream calls saved"""
+    return {'research': research_flight.stats(), 'search': search_flight.stats()}
+
+
+def _research_preflight(user_query: str, use_cache: bool) -> tuple:
+    """
+    Shared start of run_research_agent and stream_research_agent. Returns
+    (early_result, cache_key): early_result is a configuration error or a
+    cached result to serve (a stale one also schedules a background
+    refresh), or None when the research has to run.
+    """
+    if get_research_llm() is None:
+        return create_error_response(user_query, "OpenAI API not configured"), None
+    if get_search() is None:
+        return create_error_response(user_query, "SerpAPI not configured"), None
+
+    with span('classify'):
+        cache_key = research_cache_key(user_query)
+
+    if use_cache:
+        entry = research_cache.get_entry(cache_key)
+        if entry is not None:
+            cached, age = entry
+            if age > RESEARCH_FRESH_SECONDS:
+                log.info(f"⚡ Serving stale cached research ({age / 3600:.1f}h old) - refreshing in background")
+                schedule_research_refresh(cache_key, user_query)
+            else:
+                log.info(f"⚡ Serving cached research ({age / 60:.0f} min old)")
+            return serve_cached_result(cached, user_query), cache_key
+    return None, cache_key
+
+@traced('research')
+def run_research_agent(user_query: str, use_cache: bool = True) -> dict:
+    log.info(f"🔍 NEW RESEARCH QUERY: {user_query}")
+
+    early, cache_key = _research_preflight(user_query, use_cache)
+    if early is not None:
+        return early
+
+    result, shared = research_flight.do(cache_key, _research_and_cache, cache_key, user_query)
+    if shared:
+        log.info("🔗 Joined identical in-flight research")
+        return serve_cached_result(result, user_query)
+    return result
+
 # ============================================================================
-# CHATBOT
+# STREAMING RESEARCH
 # ============================================================================
 
-def get_chat_response(user_message: str, chat_history: list) -> str:
-    if chat_llm is None:
-        return "⚠️ Chatbot unavailable. Please check OPENAI_API_KEY in api.env"
+def _stream_llm_fields(messages: list, base: dict):
+    """Yields (partial_result, None) per completed top-level field, then (None, full_text)"""
+    parser = IncrementalJSONParser()
+    for chunk in stream_llm(get_research_llm(), messages):
+        if not chunk.content:
+            continue
+        parsed = parser.feed(chunk.content)
+        if parsed is not None:
+            partial = dict(parsed)
+            partial.update(base)
+            yield partial, None
+    yield None, parser.buffer
+
+
+@traced('research')
+def stream_research_agent(user_query: str, use_cache: bool = True):
+    """
+    Streaming variant of run_research_agent. Yields progressively more
+    complete result dicts as the research LLM streams its JSON; the last
+    item yielded is the final, post-processed result.
+    """
+    log.info(f"🔍 NEW STREAMING RESEARCH QUERY: {user_query}")
 
-    print(f"\n{'='*50}")
-    print(f"💬 CHATBOT QUERY: {user_message}")
-    print(f"{'='*50}\n")
+    early, cache_key = _research_preflight(user_query, use_cache)
+    if early is not None:
+        yield early
+        return
 
-    user_lower = user_message.lower()
+    flight, leader = research_flight.begin(cache_key)
+    if not leader:
+        log.info("🔗 Waiting for identical in-flight research")
+        try:
+            yield serve_cached_result(flight.wait(), user_query)
+            return
+        except Exception as e:
+            # The leader failed or its stream was abandoned; run our own
+            log.warning(f"⚠️ Shared research unavailable ({e}) - running it separately")
+            for result, _ in _stream_research_steps(user_query):
+                yield result
+            return
+
+    published = False
+    try:
+        for result, final in _stream_research_steps(user_query):
+            if final:
+                # Publish before handing the result on, so followers are
+                # released even if our consumer stops at this item
+                if is_cacheable_result(result):
+                    research_cache.set(cache_key, result)
+                research_flight.finish(cache_key, flight, result)
+                published = True
+            yield result
+    finally:
+        if not published:
+            research_flight.finish(cache_key, flight, error=RuntimeError("research stream was abandoned"))
+
+
+def _stream_research_steps(user_query: str):
+    """(result, final) pairs: partial dicts as the LLM streams, then the final result"""
+    if is_company_query(user_query):
+        company_name = extract_company_name(user_query)
+        log.info(f"✓ Detected: COMPANY RESEARCH - {company_name}")
+        base = {'query_type': 'company', 'original_query': user_query, 'company_name': company_name}
+        yield dict(base), False
+
+        messages, combined, company_slug = prepare_company_research(user_query, company_name)
+        try:
+            response_text = ""
+            for partial, full_text in _stream_llm_fields(messages, base):
+                if partial is not None:
+                    yield partial, False
+                else:
+                    response_text = full_text
+            log.info(f"✅ Research LLM stream finished ({len(response_text)} chars)")
+            result = finalize_company_research(user_query, company_name, company_slug, response_text, combined)
+        except Exception as e:
+            log.error(f"❌ LLM ERROR: {e}")
+            result = create_smart_fallback_company(user_query, company_name, str(e), combined)
+    else:
+        log.info("✓ Detected: GENERAL RESEARCH")
+        base = {'query_type': 'general', 'original_query': user_query}
+        yield dict(base, topic=user_query.title()), False
 
-    if any(word in user_lower for word in ['hello', 'hi ', 'hey ', 'good morning', 'good afternoon']):
+        try:
+            messages, search_results = prepare_general_research(user_query)
+        except Exception as e:
+            yield create_error_response(user_query, f"Search failed: {str(e)}"), True
+            return
+        try:
+            response_text = ""
+            for partial, full_text in _stream_llm_fields(messages, base):
+                if partial is not None:
+                    yield partial, False
+                else:
+                    response_text = full_text
+            log.info(f"✅ Research LLM stream finished ({len(response_text)} chars)")
+            result = finalize_general_research(user_query, response_text, search_results)
+        except Exception as e:
+            log.error(f"❌ LLM ERROR: {e}")
+            result = create_smart_fallback_general(user_query, str(e), search_results)
+
+    yield result, True
+
+# ============================================================================
+# CHATBOT
+# ============================================================================
+
+# Replies are cut off at this many tokens while streaming
+CHAT_MAX_RESPONSE_TOKENS = int(os.getenv("CHAT_MAX_RESPONSE_TOKENS", "160"))
+
+def get_canned_chat_response(user_message: str) -> str:
+    """Answers that never need the LLM (greetings, help, research redirects); None otherwise"""
+    route = classify(user_message)
+    intent = route['chat_intent']
+
+    if intent == 'greeting':
         return "👋 Hello! I'm InfoFetch AI, your intelligent research assistant. I can answer quick questions about companies, help you understand topics, or run deep research. What would you like to know?"
 
-    if any(word in user_lower for word in ['thank you', 'thanks', 'appreciate']):
+    if intent == 'thanks':
         import random
         return random.choice([
             "You're very welcome! Happy to help anytime! 😊",
@@ -577,7 +942,7 @@ def get_chat_response(user_message: str, chat_history: list) -> str:
             "Glad I could help! Feel free to ask more questions."
         ])
 
-    if any(phrase in user_lower for phrase in ['help', 'what can you do', 'how do i', 'how to use']):
+    if intent == 'help':
         return """I can help you in two ways:
 
 **💬 Quick Answers (Chat):** Ask me simple questions and I'll answer immediately.
@@ -592,10 +957,9 @@ def get_chat_response(user_message: str, chat_history: list) -> str:
 
 What would you like to know?"""
 
-    if is_company_query(user_message):
-        company = extract_company_name(user_message)
-        contact_keywords = ['email', 'phone', 'contact', 'address', 'reach', 'call']
-        if any(keyword in user_lower for keyword in contact_keywords):
+    if route['type'] == 'company':
+        company = route['company']
+        if intent == 'contact':
             return f"""For **{company}** contact information (email, phone, address), please use the **🔍 Research** feature on the Home page.
 
 The Research feature will find:
@@ -606,32 +970,115 @@ The Research feature will find:
 
 I can answer quick questions about {company} if you have any!"""
 
-        career_keywords = ['job', 'career', 'hiring', 'work at', 'salary', 'opening']
-        if any(keyword in user_lower for keyword in career_keywords):
+        if intent == 'careers':
             return f"""For comprehensive career information at **{company}** including job openings, salary ranges, and benefits, use the **🔍 Research** feature.
 
 If you have a quick question about {company}, feel free to ask and I'll help!"""
 
+    return None
+
+
+def build_chat_messages(user_message: str, chat_history: list, summary: str = "") -> list:
+    """System prompt, rolling summary, then as many recent turns as fit in CHAT_CONTEXT_TOKENS"""
+    from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
     messages = [SystemMessage(content=INTELLIGENT_CHATBOT_PROMPT)]
-    recent_history = chat_history[-10:] if len(chat_history) > 10 else chat_history
+    if summary:
+        messages.append(SystemMessage(content=f"Summary of the earlier conversation:\n{summary}"))
+    recent_history, _ = pack_turns(chat_history, max(CHAT_CONTEXT_TOKENS - count_tokens(summary), 0))
     for msg in recent_history:
         if msg['role'] == 'user':
             messages.append(HumanMessage(content=msg['content']))
         elif msg['role'] == 'assistant':
             messages.append(AIMessage(content=msg['content']))
     messages.append(HumanMessage(content=user_message))
+    return messages
+
+
+@traced('chat')
+def stream_chat_response(user_message: str, chat_history: list, summary: str = ""):
+    """
+    Yields the chatbot reply in pieces as the model produces them. The reply
+    is stopped (and the upstream stream closed) once CHAT_MAX_RESPONSE_TOKENS
+    have been emitted. summary is the rolling summary of older turns.
+    """
+    chat_llm = get_chat_llm()
+    if chat_llm is None:
+        yield "⚠️ Chatbot unavailable. Please check OPENAI_API_KEY in api.env"
+        return
+
+    log.info(f"💬 CHATBOT QUERY: {user_message}")
+
+    canned = get_canned_chat_response(user_message)
+    if canned is not None:
+        yield canned
+        return
+
+    messages = build_chat_messages(user_message, chat_history, summary)
+
+    used_tokens = 0
+    try:
+        log.info("🤖 Streaming Chat LLM...")
+        for chunk in stream_llm(chat_llm, messages, stage='chat_llm'):
+            text = chunk.content
+            if not text:
+                continue
+            if used_tokens == 0:
+                text = text.lstrip()
+            used_tokens += count_tokens(text)
+            if used_tokens > CHAT_MAX_RESPONSE_TOKENS:
+                yield "..."
+                log.info(f"✂️ Chat reply cut at {CHAT_MAX_RESPONSE_TOKENS} tokens")
+                return
+            yield text
+        log.info(f"✅ Chat LLM finished ({used_tokens} tokens)")
+    except Exception as e:
+        log.error(f"❌ Chat LLM error: {e}")
+        if used_tokens == 0:
+            yield fallback_chat_response(user_message, chat_history)
+
+
+def get_chat_response(user_message: str, chat_history: list, summary: str = "") -> str:
+    return "".join(stream_chat_response(user_message, chat_history, summary)).strip()
 
+
+CHAT_SUMMARY_PROMPT = """Update the running summary of a conversation between a user and InfoFetch AI.
+Keep names, companies, roles, numbers and preferences the user mentioned, and any open questions.
+Write at most 120 words of plain prose. Return only the summary."""
+
+def summarize_chat_turns(previous_summary: str, turns: list) -> str:
+    """New rolling summary covering previous_summary plus turns"""
+    chat_llm = get_chat_llm()
+    if chat_llm is None:
+        return ""
+    from langchain_core.messages import HumanMessage, SystemMessage
+    transcript = "\n".join(f"{t['role'].title()}: {t['content']}" for t in turns)
+    messages = [
+        SystemMessage(content=CHAT_SUMMARY_PROMPT),
+        HumanMessage(content=f"Current summary:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}")
+    ]
+    return invoke_llm(chat_llm, messages, stage='summary_llm').content
+
+def _refresh_chat_summary(user_id: int):
+    key = f"chat-summary:{user_id}"
     try:
-        print("🤖 Calling Chat LLM...")
-        response = chat_llm.invoke(messages)
-        answer = response.content.strip()
-        print(f"✅ Chat LLM responded ({len(answer)} chars)\n")
-        if len(answer) > 600:
-            answer = answer[:600] + "..."
-        return answer
+        with lane('background'):
+            refresh_summary(user_id, summarize_chat_turns)
     except Exception as e:
-        print(f"❌ Chat LLM error: {e}\n")
-        return fallback_chat_response(user_message, chat_history)
+        log.warning(f"⚠️ Chat summary refresh failed for user {user_id}: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
+
+def schedule_chat_summary(user_id: int):
+    """Fold old turns into the summary off the request path; one job per user at a time"""
+    if not user_id or not OPENAI_AVAILABLE:
+        return
+    key = f"chat-summary:{user_id}"
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    background_executor.submit(_refresh_chat_summary, user_id)
 
 
 def fallback_chat_response(user_message: str, chat_history: list) -> str:
@@ -669,9 +1116,7 @@ def get_basic_company_info(company_name: str) -> str:
 # ============================================================================
 
 def create_smart_fallback_company(query: str, company_name: str, error_info: str, search_results: str) -> dict:
-    print(f"\n{'='*70}")
-    print("🔧 CREATING SMART FALLBACK (COMPANY)")
-    print(f"{'='*70}\n")
+    log.info("🔧 CREATING SMART FALLBACK (COMPANY)")
 
     company_slug = company_name.lower().replace(' ', '')
     email = extract_email(search_results)
@@ -1005,13 +1450,28 @@ def display_results(result: dict, st_module):
 # INIT CHECK
 # ============================================================================
 
-OPENAI_AVAILABLE = os.getenv("OPENAI_API_KEY") is not None and research_llm is not None
-SERPAPI_AVAILABLE = os.getenv("SERPAPI_API_KEY") is not None and search is not None
+def _warm_clients() -> dict:
+    status = {
+        'research_llm': get_research_llm() is not None,
+        'chat_llm': get_chat_llm() is not None,
+        'serpapi': get_search() is not None,
+    }
+
+    ready = {True: '✅ Ready', False: '❌ Not Configured'}
+    log.info(f"✅ ENHANCED INITIALIZATION COMPLETE - Research LLM: {ready[status['research_llm']]}, "
+             f"Chat LLM: {ready[status['chat_llm']]}, SerpAPI: {ready[status['serpapi']]}")
+    return status
 
-print(f"\n{'='*70}")
-print("✅ ENHANCED INITIALIZATION COMPLETE")
-print(f"{'='*70}")
-print(f"Research LLM: {'✅ Ready' if OPENAI_AVAILABLE else '❌ Not Configured'}")
-print(f"Chat LLM:     {'✅ Ready' if chat_llm is not None else '❌ Not Configured'}")
-print(f"SerpAPI:      {'✅ Ready' if SERPAPI_AVAILABLE else '❌ Not Configured'}")
-print(f"{'='*70}\n")
\ No newline at end of file
+def init_backend(background: bool = False) -> dict:
+    """
+    One-time backend start-up: bootstrap the database, then build the API
+    clients (on background_executor when background=True, so a page can
+    render meanwhile). Idempotent and thread-safe, so it can back a
+    st.cache_resource hook. Returns which clients are ready ({} if deferred).
+    """
+    configure_logging()
+    bootstrap_db()
+    if background:
+        background_executor.submit(_warm_clients)
+        return {}
+    return _warm_clients()
@@ -0,0 +1,339 @@
+"""
+Tracing, metrics and logging for InfoFetch AI
+
+Spans time each stage of the research and chat pipelines: classify, each
+web_search, prompt build, LLM calls (with token counts), JSON parse/repair,
+fill_known_fields and database saves. A span opened while another is active
+in the same context joins its trace; the search fan-out threads run in a
+copy of the caller's context, so their spans join it too.
+
+    with span('web_search', cache='miss') as s:
+        result = ...
+        s.set(chars=len(result))
+
+Generators use span_iter() (or @traced), which makes the span current only
+while the generator runs, not in the consumer's context between items.
+
+Finished spans feed a window of recent durations per stage (p50 / p95 in
+metrics_snapshot()) and the last TRACE_HISTORY traces. Log records are
+handed to a queue and written by a listener thread, so the calling thread
+never waits on the output stream. INFOFETCH_LOG_LEVEL and
+INFOFETCH_LOG_FORMAT ('text' or 'json') control the output.
+"""
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+LOG_LEVEL = os.getenv("INFOFETCH_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("INFOFETCH_LOG_FORMAT", "text")
+ROOT_LOGGER = "infofetch"
+
+# Durations kept per stage for the percentiles, and finished traces kept
+METRICS_WINDOW = int(os.getenv("METRICS_WINDOW", "1000"))
+TRACE_HISTORY = int(os.getenv("TRACE_HISTORY", "50"))
+MAX_SPANS_PER_TRACE = 200
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'taskName'}
+
+class StructuredFormatter(logging.Formatter):
+    """One line per record: readable text, or a JSON object per line. Fields passed in extra= are appended."""
+
+    def __init__(self, output: str = "text"):
+        super().__init__()
+        self.output = output
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {k: v for k, v in vars(record).items() if k not in _STANDARD_ATTRS}
+        if self.output == "json":
+            entry = {
+                'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+                'level': record.levelname,
+                'logger': record.name,
+                'msg': record.getMessage(),
+            }
+            entry.update(fields)
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} {record.name.rsplit('.', 1)[-1]:<10} {record.getMessage()}"
+        if fields:
+            line += "  " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class _TraceFilter(logging.Filter):
+    """Tags records with the current trace id; runs in the thread that logs, before the queue"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        current = _current_span.get()
+        if current is not None:
+            record.trace = current.trace['id']
+        return True
+
+
+_listener = None
+_logging_lock = threading.Lock()
+
+def get_logger(name: str) -> logging.Logger:
+    """Module logger under the 'infofetch' hierarchy"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+def configure_logging(level: Optional[str] = None, output: Optional[str] = None):
+    """Route 'infofetch' records through the queue to stderr. Safe to call repeatedly."""
+    global _listener
+    from logging.handlers import QueueHandler, QueueListener
+    logger = logging.getLogger(ROOT_LOGGER)
+    with _logging_lock:
+        logger.setLevel((level or LOG_LEVEL).upper())
+        if _listener is not None:
+            return
+        records = queue.SimpleQueue()
+        handler = QueueHandler(records)
+        handler.addFilter(_TraceFilter())
+        stream = logging.StreamHandler()
+        stream.setFormatter(StructuredFormatter(output or LOG_FORMAT))
+        _listener = QueueListener(records, stream, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        logger.addHandler(handler)
+        logger.propagate = False
+
+def set_log_level(level: str):
+    logging.getLogger(ROOT_LOGGER).setLevel(level.upper())
+
+def get_log_level() -> str:
+    return logging.getLevelName(logging.getLogger(ROOT_LOGGER).getEffectiveLevel())
+
+log = get_logger("telemetry")
+
+# ============================================================================
+# SPANS
+# ============================================================================
+
+class Span:
+    """One timed stage; set() adds attributes (token counts, cache outcome, sizes)"""
+
+    __slots__ = ('stage', 'attrs', 'parent', 'trace', 'offset_ms', 'started', 'ms', 'error')
+
+    def __init__(self, stage: str, attrs: Dict, parent: Optional['Span']):
+        self.stage = stage
+        self.attrs = attrs
+        self.parent = parent
+        self.ms = None
+        self.error = None
+        if parent is None:
+            self.trace = {'id': os.urandom(6).hex(), 'root': stage, 'started': time.time(),
+                          't0': time.perf_counter(), 'spans': []}
+        else:
+            self.trace = parent.trace
+        self.started = time.perf_counter()
+        self.offset_ms = (self.started - self.trace['t0']) * 1000
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+_current_span = contextvars.ContextVar('telemetry_span', default=None)
+
+_metrics_lock = threading.Lock()
+_stages: Dict[str, Dict] = {}
+_traces = deque(maxlen=TRACE_HISTORY)
+_started_at = time.time()
+
+def _stage_stats(stage: str) -> Dict:
+    stats = _stages.get(stage)
+    if stats is None:
+        stats = {'count': 0, 'errors': 0, 'in_flight': 0, 'durations': deque(maxlen=METRICS_WINDOW), 'tokens': {}}
+        _stages[stage] = stats
+    return stats
+
+def _finish(s: Span):
+    entry = {
+        'stage': s.stage,
+        'parent': s.parent.stage if s.parent is not None else None,
+        'offset_ms': round(s.offset_ms, 1),
+        'ms': round(s.ms, 1),
+        'error': s.error,
+        'attrs': dict(s.attrs),
+    }
+    with _metrics_lock:
+        stats = _stage_stats(s.stage)
+        stats['in_flight'] -= 1
+        stats['count'] += 1
+        stats['durations'].append(s.ms)
+        if s.error:
+            stats['errors'] += 1
+        for key, value in s.attrs.items():
+            if key.endswith('_tokens') and isinstance(value, (int, float)):
+                stats['tokens'][key] = stats['tokens'].get(key, 0) + value
+        if len(s.trace['spans']) < MAX_SPANS_PER_TRACE:
+            s.trace['spans'].append(entry)
+        if s.parent is None:
+            s.trace['ms'] = entry['ms']
+            s.trace['error'] = s.error
+            _traces.appendleft(s.trace)
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(f"⏱️ {s.stage} {s.ms:.1f} ms", extra={'span': entry})
+
+def _open_span(stage: str, attrs: Dict) -> Span:
+    s = Span(stage, attrs, _current_span.get())
+    with _metrics_lock:
+        _stage_stats(stage)['in_flight'] += 1
+    return s
+
+def _close_span(s: Span):
+    s.ms = (time.perf_counter() - s.started) * 1000
+    _finish(s)
+
+@contextmanager
+def span(stage: str, **attrs):
+    """
+    Time the block as one stage of the current trace (a new trace if none is active).
+    Not for blocks that yield to a consumer; wrap the generator in span_iter() instead.
+    """
+    s = _open_span(stage, attrs)
+    token = _current_span.set(s)
+    try:
+        yield s
+    except Exception as e:
+        s.error = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        _close_span(s)
+
+def span_iter(stage: str, generator, **attrs):
+    """
+    Yield from generator inside one span covering its whole iteration. The
+    span is current only while the generator runs, never in the consumer's
+    context between items, so the consumer's own spans do not nest under it.
+    """
+    s = _open_span(stage, attrs)
+    try:
+        method, arg = generator.send, None
+        while True:
+            token = _current_span.set(s)
+            try:
+                item = method(arg)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                _current_span.reset(token)
+            try:
+                method, arg = generator.send, (yield item)
+            except GeneratorExit:
+                raise
+            except BaseException as e:
+                method, arg = generator.throw, e
+    except Exception as e:
+        s.error = type(e).__name__
+        raise
+    finally:
+        token = _current_span.set(s)
+        try:
+            generator.close()
+        finally:
+            _current_span.reset(token)
+            _close_span(s)
+
+def traced(stage: str):
+    """Decorator: run each call of a function (or each iteration of a generator) in a span"""
+    def decorator(fn):
+        # Only modules that decorate pay for importing inspect
+        import inspect
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(*args, **kwargs):
+                return span_iter(stage, fn(*args, **kwargs))
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace['id'] if current is not None else None
+
+# ============================================================================
+# METRICS SNAPSHOT
+# ============================================================================
+
+def _percentile(ordered: List[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def metrics_snapshot() -> Dict:
+    """Per-stage count, errors, in-flight and p50 / p95 / max latency over the last METRICS_WINDOW spans"""
+    with _metrics_lock:
+        copied = {stage: dict(stats, durations=sorted(stats['durations']), tokens=dict(stats['tokens']))
+                  for stage, stats in _stages.items()}
+    stages = {}
+    for stage, stats in sorted(copied.items()):
+        ordered = stats['durations']
+        stages[stage] = {
+            'count': stats['count'],
+            'errors': stats['errors'],
+            'in_flight': stats['in_flight'],
+            'p50_ms': round(_percentile(ordered, 0.5), 1),
+            'p95_ms': round(_percentile(ordered, 0.95), 1),
+            'max_ms': round(ordered[-1], 1) if ordered else 0.0,
+            'window': len(ordered),
+            **stats['tokens'],
+        }
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'uptime_seconds': round(time.time() - _started_at),
+        'in_flight': sum(s['in_flight'] for s in stages.values()),
+        'stages': stages,
+    }
+
+def recent_traces(limit: int = TRACE_HISTORY) -> List[Dict]:
+    """Newest first: trace id, root stage, total ms and its spans in start order"""
+    with _metrics_lock:
+        traces = list(_traces)[:limit]
+    return [{
+        'id': t['id'],
+        'root': t['root'],
+        'started': datetime.fromtimestamp(t['started']).isoformat(timespec='seconds'),
+        'ms': t.get('ms'),
+        'error': t.get('error'),
+        'spans': sorted(t['spans'], key=lambda e: e['offset_ms']),
+    } for t in traces]
+
+def export_metrics(extra: Optional[Dict] = None) -> str:
+    """JSON document with the metrics snapshot, recent traces and any extra sections"""
+    document = {'metrics': metrics_snapshot(), 'traces': recent_traces()}
+    document.update(extra or {})
+    return json.dumps(document, indent=2, ensure_ascii=False, default=str)
+
+def reset_metrics():
+    """Drop recorded durations and traces; stages with spans still running keep their in-flight count"""
+    with _metrics_lock:
+        for stage in list(_stages):
+            in_flight = _stages[stage]['in_flight']
+            del _stages[stage]
+            if in_flight:
+                _stage_stats(stage)['in_flight'] = in_flight
+        _traces.clear()
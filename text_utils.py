@@ -0,0 +1,219 @@
+"""
+Token counting and prompt packing helpers for InfoFetch AI
+"""
+import ast
+import hashlib
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from telemetry import get_logger
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+log = get_logger("text")
+
+TOKEN_ENCODING = "cl100k_base"
+
+@lru_cache(maxsize=1)
+def get_encoding():
+    """Load the tiktoken encoding once; None if tiktoken is unavailable"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKEN_ENCODING)
+    except Exception as e:
+        log.warning(f"⚠️ tiktoken unavailable, estimating tokens from length: {e}")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Number of tokens the OpenAI chat models will see for this text"""
+    if not text:
+        return 0
+    encoding = get_encoding()
+    if encoding is None:
+        return max(1, len(text) // 4)
+    return len(encoding.encode(text, disallowed_special=()))
+
+def truncate_to_tokens(text: str, max_tokens: int) -> Tuple[str, int]:
+    """Cut text to at most max_tokens tokens; returns (text, tokens dropped)"""
+    if not text:
+        return "", 0
+    if max_tokens <= 0:
+        return "", count_tokens(text)
+    encoding = get_encoding()
+    if encoding is None:
+        total = count_tokens(text)
+        if total <= max_tokens:
+            return text, 0
+        return text[:max_tokens * 4], total - max_tokens
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text, 0
+    return encoding.decode(tokens[:max_tokens]), len(tokens) - max_tokens
+
+def allocate_token_budget(sizes: List[int], budget: int) -> List[int]:
+    """
+    Max-min fair split of budget across sets of the given token sizes:
+    sets smaller than an equal share keep everything and the rest of the
+    budget is shared among the larger ones.
+    """
+    allocation = [0] * len(sizes)
+    remaining = max(budget, 0)
+    pending = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    while pending:
+        share = remaining // len(pending)
+        smallest = pending[0]
+        if sizes[smallest] <= share:
+            allocation[smallest] = sizes[smallest]
+            remaining -= sizes[smallest]
+            pending.pop(0)
+            continue
+        extra = remaining - share * len(pending)
+        for rank, i in enumerate(pending):
+            allocation[i] = share + (1 if rank < extra else 0)
+        break
+    return allocation
+
+def pack_search_sets(sets: List[str], budget: int, labels: Optional[List[str]] = None) -> Dict:
+    """
+    Fit several search result sets into one prompt section of at most
+    budget tokens, trimming each set to its fair share rather than cutting
+    the concatenation at the tail. Returns {'text', 'tokens', 'dropped',
+    'sets': [{'label', 'tokens', 'kept', 'dropped'}]}.
+    """
+    labels = labels or [f"=== SEARCH SET {i} ===" for i in range(1, len(sets) + 1)]
+    header_tokens = sum(count_tokens(label) + 2 for label in labels)
+    sizes = [count_tokens(text) for text in sets]
+    allocation = allocate_token_budget(sizes, budget - header_tokens)
+
+    sections = []
+    report = []
+    for label, text, size, allowed in zip(labels, sets, sizes, allocation):
+        kept_text, dropped = truncate_to_tokens(text, allowed)
+        if dropped:
+            kept_text = kept_text.rstrip() + " [...]"
+        sections.append(f"{label}\n{kept_text}")
+        report.append({'label': label, 'tokens': size, 'kept': size - dropped, 'dropped': dropped})
+
+    packed = "\n\n" + "\n\n".join(sections) if sections else ""
+    return {
+        'text': packed,
+        'tokens': header_tokens + sum(r['kept'] for r in report),
+        'dropped': sum(r['dropped'] for r in report),
+        'sets': report
+    }
+
+def log_packing_report(packed: Dict, budget: int):
+    log.info(f"📦 Packed {packed['tokens']}/{budget} prompt tokens ({packed['dropped']} dropped)")
+    for entry in packed['sets']:
+        note = f", {entry['dropped']} dropped" if entry['dropped'] else ""
+        log.debug(f"{entry['label']} {entry['kept']}/{entry['tokens']} tokens{note}")
+
+# ============================================================================
+# SNIPPET DEDUPLICATION
+# ============================================================================
+
+# Snippets whose word-bigram sets overlap at least this much (Jaccard) are
+# treated as the same evidence. One edited word changes two bigrams, so a
+# typical 20+ word snippet that differs only in "400,000" vs "400,001"
+# followers scores about 0.84; short snippets need to match more closely.
+NEAR_DUPLICATE_JACCARD = 0.75
+SHINGLE_WORDS = 2
+
+# What web_search / run_searches_concurrently return instead of results.
+# These pass through dedup untouched, so every failed set still tells the
+# model its search failed rather than turning into an empty section.
+SEARCH_UNAVAILABLE = "Search service unavailable."
+SEARCH_TIMED_OUT = "Search timed out."
+SEARCH_FAILED_PREFIX = "Search failed: "
+
+def is_search_placeholder(result: str) -> bool:
+    text = (result or "").strip()
+    return text in (SEARCH_UNAVAILABLE, SEARCH_TIMED_OUT) or text.startswith(SEARCH_FAILED_PREFIX)
+
+def hash64(text: str) -> int:
+    if xxhash is not None:
+        return xxhash.xxh64_intdigest(text.encode('utf-8'))
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def split_snippets(result: str) -> List[str]:
+    """
+    SerpAPIWrapper.run returns str(list_of_snippets) for organic results and
+    plain text for answer boxes; both become a list of snippet strings.
+    """
+    text = (result or "").strip()
+    if text.startswith('[') and text.endswith(']'):
+        try:
+            items = ast.literal_eval(text)
+            if isinstance(items, list):
+                return [str(item).strip() for item in items if str(item).strip()]
+        except (ValueError, SyntaxError):
+            pass
+    return [line.strip() for line in re.split(r'\n+', text) if line.strip()]
+
+def _words(snippet: str) -> List[str]:
+    return re.findall(r'\w+', snippet.lower())
+
+def shingles(snippet: str) -> frozenset:
+    """Hashed word shingles of a snippet"""
+    words = _words(snippet)
+    if len(words) < SHINGLE_WORDS:
+        return frozenset(hash64(w) for w in words)
+    return frozenset(hash64(' '.join(words[i:i + SHINGLE_WORDS])) for i in range(len(words) - SHINGLE_WORDS + 1))
+
+def dedupe_search_sets(sets: List[str]) -> Tuple[List[str], Dict]:
+    """
+    Drop exact and near-duplicate snippets across all sets, keeping the first
+    occurrence. Exact copies are caught by an xxhash of the normalized text;
+    near copies by shingle Jaccard similarity, comparing only against kept
+    snippets that share at least one shingle. Search failure placeholders
+    are passed through unchanged and not counted. Returns (sets, {'snippets',
+    'duplicates', 'duplicate_bytes', 'bytes_before', 'bytes_after', 'bytes_saved'}):
+    duplicate_bytes counts only the dropped snippets, while bytes_saved also
+    includes the reformatting into "- " bullet lines (and can be negative).
+    """
+    seen_exact = set()
+    kept_shingles = []
+    index = {}
+    deduped = []
+    total = duplicates = duplicate_bytes = 0
+    bytes_before = sum(len(r.encode('utf-8')) for r in sets)
+
+    for result in sets:
+        if is_search_placeholder(result):
+            deduped.append(result)
+            continue
+        kept = []
+        for snippet in split_snippets(result):
+            total += 1
+            exact = hash64(' '.join(_words(snippet)))
+            if exact in seen_exact:
+                duplicates += 1
+                duplicate_bytes += len(snippet.encode('utf-8'))
+                continue
+            current = shingles(snippet)
+            candidates = {i for shingle in current for i in index.get(shingle, ())}
+            if any(len(current & kept_shingles[i]) / len(current | kept_shingles[i]) >= NEAR_DUPLICATE_JACCARD
+                   for i in candidates):
+                duplicates += 1
+                duplicate_bytes += len(snippet.encode('utf-8'))
+                continue
+            seen_exact.add(exact)
+            for shingle in current:
+                index.setdefault(shingle, []).append(len(kept_shingles))
+            kept_shingles.append(current)
+            kept.append(snippet)
+        deduped.append('\n'.join(f"- {snippet}" for snippet in kept))
+
+    bytes_after = sum(len(r.encode('utf-8')) for r in deduped)
+    return deduped, {
+        'snippets': total,
+        'duplicates': duplicates,
+        'duplicate_bytes': duplicate_bytes,
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after
+    }
@@ -0,0 +1,73 @@
+"""
+Theme and static assets for InfoFetch AI
+
+The stylesheet lives in static/theme.css and is served by Streamlit's static
+file server (server.enableStaticServing in .streamlit/config.toml). Each
+rerun then only sends a <link> tag whose URL carries a hash of the file's
+content, instead of the whole stylesheet. Small HTML pieces repeated across
+pages are built here from classes in that stylesheet, not inline styles.
+"""
+import hashlib
+import html
+import os
+from functools import lru_cache
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+# Where Streamlit serves STATIC_DIR, relative to the app URL
+STATIC_URL = "app/static"
+THEME_CSS = "theme.css"
+
+PLAN_BADGE_CLASSES = {'Free': 'plan-free', 'Plus': 'plan-plus', 'Premium': 'plan-premium'}
+
+# ============================================================================
+# STATIC ASSETS
+# ============================================================================
+
+@lru_cache(maxsize=32)
+def _read_asset(path: str, mtime_ns: int) -> bytes:
+    # mtime_ns is part of the cache key, so an edited file is re-read
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _asset_bytes(name: str) -> bytes:
+    path = os.path.join(STATIC_DIR, name)
+    return _read_asset(path, os.stat(path).st_mtime_ns)
+
+def asset_version(name: str) -> str:
+    """Short content hash of a static file, used to bust browser caches on change"""
+    return hashlib.sha256(_asset_bytes(name)).hexdigest()[:12]
+
+def asset_url(name: str) -> str:
+    return f"{STATIC_URL}/{name}?v={asset_version(name)}"
+
+def theme_html(static_serving: bool = True) -> str:
+    """
+    Markup that applies the theme: a <link> to the served stylesheet, or the
+    stylesheet inlined in a <style> tag when static serving is turned off.
+    """
+    if static_serving:
+        return f'<link rel="stylesheet" href="{asset_url(THEME_CSS)}">'
+    return f"<style>\n{_asset_bytes(THEME_CSS).decode('utf-8')}</style>"
+
+# ============================================================================
+# COMPONENTS
+# ============================================================================
+
+def logo_html(variant: str = "") -> str:
+    """InfoFetch AI logo; variant is '', 'lg' (app navbar) or 'footer'"""
+    modifier = f" logo-{variant}" if variant else ""
+    return (
+        f'<div class="logo-pro{modifier}"><span class="logo-icon">🔍</span> '
+        f'<span class="logo-text">InfoFetch AI</span></div>'
+    )
+
+def plan_badge_html(username: str, plan: str) -> str:
+    plan_class = PLAN_BADGE_CLASSES.get(plan, "")
+    return (
+        f'<div class="plan-badge-pro {plan_class}">'
+        f'👤 {html.escape(str(username))} ({html.escape(str(plan))})</div>'
+    )
+
+def nudge_html(large: bool = False) -> str:
+    """Empty block with a negative top margin that pulls the next block up"""
+    return f'<div class="{"nudge-up-lg" if large else "nudge-up"}"></div>'